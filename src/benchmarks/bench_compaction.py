@@ -0,0 +1,207 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+"""
+End-to-end benchmark of ``A0.run`` and ``A1xx.run`` on synthetic STLs, with the ``StubZoixInvoker`` in place of
+VCS/Z01X. Measures the construction (assembly parsing) time, the initial run, the iterations per second of the
+compaction loop, the time spent parsing fault reports and the peak memory.
+
+Each (algorithm, size) pair runs in its own interpreter, since the compaction algorithms are singletons and so that
+the peak memory of each run is isolated.
+
+Usage: ``python3 bench_compaction.py -n 1000 10000 100000 -i 20``
+"""
+
+try:
+
+    from testcrush import a0, a1xx, stub, zoix
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import a0, a1xx, stub, zoix
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pathlib
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ISA = pathlib.Path(__file__).resolve().parents[2] / "langs" / "riscv.isa"
+
+
+def settings(workdir: pathlib.Path, algorithm: str, ordering: bool = False) -> dict:
+    """The settings of the algorithm, as parsed from a TOML configuration file."""
+
+    common = {
+        "compaction_policy": "Maximize",
+        "assembly_compilation_instructions": ["true"],
+        "vcs_compilation_instructions": [],
+        "vcs_logic_simulation_instructions": ["lsim"],
+        "vcs_logic_simulation_control": {
+            "timeout": 60.0,
+            "simulation_ok_regex": re.compile(r"EXIT\sSUCCESS", re.DOTALL),
+            "test_application_time_regex": re.compile(r"test application time = ([0-9]+)", re.DOTALL),
+            "test_application_time_regex_group_no": 1
+        },
+        "zoix_fault_simulation_instructions": ["fsim"],
+        "zoix_fault_simulation_control": {"timeout": 360.0},
+        "fsim_report": str(workdir / "fsim_attr"),
+        "coverage_formula": "Fault Coverage"
+    }
+
+    if algorithm == "A1xx":
+        common |= {"a1xx_segment_dimension": 10, "a1xx_policy": "B"}
+
+    if ordering:
+        common |= {"candidate_ordering": {"enabled": True}}
+
+    return common
+
+
+def single_run(algorithm: str, lines: int, iterations: int, seed: int, ordering: bool = False) -> dict:
+    """
+    Benchmarks a single (algorithm, size) pair in the current interpreter.
+
+    Returns:
+        dict: The measurements.
+    """
+
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix="testcrush_bench_") as tmp:
+
+        workdir = pathlib.Path(tmp) / "run"
+        workdir.mkdir()
+        os.chdir(workdir)  # Statistics are written in the cwd and backups in its parent
+
+        try:
+            return _single_run(algorithm, lines, iterations, seed, ordering, workdir)
+        finally:
+            os.chdir(cwd)
+
+
+def _single_run(algorithm: str, lines: int, iterations: int, seed: int, ordering: bool,
+                workdir: pathlib.Path) -> dict:
+
+    stl = stub.generate_stl(lines, seed)
+    source = workdir / "test.S"
+    source.write_text(".section .text\n.global _start\n_start:\n" + '\n'.join(f"    {line}" for line in stl) + "\n")
+
+    model = stub.SyntheticFaultModel(stl, seed=seed)
+    results = {"algorithm": algorithm, "lines": lines}
+
+    # Time spent in the stub and in parsing fault reports
+    timers = {"stub": 0.0, "report": 0.0}
+
+    def timed(timer: str, function: callable) -> callable:
+
+        def wrapper(*args, **kwargs):
+
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timers[timer] += time.perf_counter() - start
+
+        return wrapper
+
+    zoix.TxtFaultReport.compute_coverage = timed("report", zoix.TxtFaultReport.compute_coverage)
+
+    start = time.perf_counter()
+    if algorithm == "A0":
+        algo = a0.A0(ISA, [str(source)], settings(workdir, algorithm, ordering))
+    else:
+        algo = a1xx.A1xx(ISA, [str(source)], settings(workdir, algorithm))
+    results["construction_s"] = time.perf_counter() - start
+
+    algo.vc_zoix = stub.StubZoixInvoker(model, [source], workdir / "fsim_attr")
+    algo.vc_zoix._lsim = timed("stub", algo.vc_zoix._lsim)
+    algo.vc_zoix._fsim = timed("stub", algo.vc_zoix._fsim)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+
+        start = time.perf_counter()
+        initial_stats = algo.pre_run()
+        results["pre_run_s"] = time.perf_counter() - start
+
+        if algorithm == "A0" and algo.candidate_ordering:
+            algo.order_candidates()
+
+        # Only a random sample of candidates is evaluated
+        rng = random.Random(seed)
+        if algorithm == "A0":
+            algo.all_instructions = rng.sample(algo.all_instructions, min(iterations, len(algo.all_instructions)))
+        else:
+            algo.all_code_chunks = rng.sample(algo.all_code_chunks, min(iterations, len(algo.all_code_chunks)))
+
+        timers = dict.fromkeys(timers, 0.0)
+
+        start = time.perf_counter()
+        algo.run(initial_stats, times_to_shuffle=1)
+        elapsed = time.perf_counter() - start
+
+    # Every iteration which compiles is logic simulated, including the initial one of pre_run
+    results["iterations"] = algo.vc_zoix.invocations["lsim"] - 1
+    results["run_s"] = elapsed
+    results["iterations_per_s"] = results["iterations"] / elapsed if elapsed else 0.0
+    results["report_parse_s_per_iteration"] = timers["report"] / max(results["iterations"], 1)
+    results["stub_s_per_iteration"] = timers["stub"] / max(results["iterations"], 1)
+    results["accepted"] = len(stl) - len(algo.vc_zoix.model.present(source))
+    results["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    return results
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="End-to-end compaction benchmark with a stub simulator.")
+    parser.add_argument("-n", "--lines", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="STL sizes (number of instructions).")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=["A0", "A1xx"], choices=["A0", "A1xx"],
+                        help="Compaction algorithms.")
+    parser.add_argument("-i", "--iterations", type=int, default=20, help="Iterations of the compaction loop per run.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed of the STL and fault model generators.")
+    parser.add_argument("--ordering", action="store_true", help="A0 only. Enable the candidate ordering.")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(single_run(args.algorithms[0], args.lines[0], args.iterations, args.seed,
+                                    args.ordering)))
+        return
+
+    header = f"{'algorithm':>9} {'lines':>8} {'construct':>10} {'pre_run':>8} {'iter/s':>8} {'parse/it':>9} " \
+             f"{'stub/it':>8} {'accepted':>8} {'max RSS':>9}"
+    print(header)
+
+    for algorithm in args.algorithms:
+
+        for lines in args.lines:
+
+            process = subprocess.run([sys.executable, __file__, "--single", "-a", algorithm, "-n", str(lines),
+                                      "-i", str(args.iterations), "-s", str(args.seed)] +
+                                     (["--ordering"] if args.ordering else []),
+                                     capture_output=True, text=True)
+
+            if process.returncode:
+                print(f"{algorithm:>9} {lines:>8} FAILED\n{process.stderr}")
+                continue
+
+            r = json.loads(process.stdout.splitlines()[-1])
+            print(f"{r['algorithm']:>9} {r['lines']:>8} {r['construction_s']:>9.3f}s {r['pre_run_s']:>7.3f}s "
+                  f"{r['iterations_per_s']:>8.2f} {r['report_parse_s_per_iteration']:>8.3f}s "
+                  f"{r['stub_s_per_iteration']:>7.3f}s {r['accepted']:>8} {r['max_rss_mb']:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
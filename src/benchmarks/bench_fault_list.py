@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+"""
+Compares the lark grammar against the regex fast path when parsing the ``FaultList`` section of a large, synthetic
+Z01X txt fault report.
+
+Usage: ``python3 bench_fault_list.py -n 100000``
+"""
+
+try:
+
+    from testcrush.grammars import transformers
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush.grammars import transformers
+
+import argparse
+import random
+import time
+
+
+def generate_fault_list(faults: int, seed: int = 0) -> str:
+    """
+    Generates a synthetic ``FaultList`` section with a mix of prime faults with and without attributes, equivalent
+    faults, timing information and multi-site faults.
+
+    Args:
+        faults (int): Number of fault lines to generate.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        str: The ``FaultList`` section.
+    """
+    rng = random.Random(seed)
+
+    lines = ["FaultList SAF {"]
+
+    for i in range(faults):
+
+        site = f'{{PORT "tb_top.wrapper_i.top_i.core_i.ex_stage_i.mult_i.U{i}.A{rng.randint(1, 4)}"}}'
+        fault_type = rng.choice("01")
+
+        if i and rng.random() < 0.4:
+            lines.append(f"          -- {fault_type} {site}")
+            continue
+
+        status = rng.choice(["ON", "ON", "ON", "NN", "NC", "NO"])
+
+        if rng.random() < 0.05:
+            site = f'{site} + {{WIRE "tb_top.wrapper_i.top_i.core_i.n{i}[3:0]"}}'
+
+        timing = f" ({rng.randint(1, 9)}.{rng.randint(100, 999)}ns)" if rng.random() < 0.1 else ""
+
+        attributes = ""
+        if status == "ON":
+            pc = rng.randrange(0x100, 0x4000, 2)
+            attributes = (f'(* "test1"->INSTR=3cb3079a; "test1"->PC_ID={pc:08x}; '
+                          f'"test1"->sim_time="{rng.randint(10, 99999):>7}ns"; *)')
+
+        lines.append(f"    <  1> {status} {fault_type}{timing} {site}{attributes}")
+
+    lines.append("}")
+
+    return '\n'.join(lines)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="FaultList parsing benchmark: lark grammar vs regex fast path.")
+    parser.add_argument("-n", "--faults", type=int, default=100_000, help="Number of fault lines to generate.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of timed runs per parser.")
+    args = parser.parse_args()
+
+    fault_list = generate_fault_list(args.faults)
+    factory = transformers.FaultReportTransformerFactory()
+
+    results = dict()
+    for name, fast in [("lark", False), ("fast", True)]:
+
+        timings = list()
+        for _ in range(args.repeat):
+
+            parser = factory("FaultList", fast=fast)
+
+            start = time.perf_counter()
+            faults = parser.parse(fault_list)
+            timings.append(time.perf_counter() - start)
+
+        results[name] = (min(timings), faults)
+        print(f"{name:>5}: {min(timings):.3f}s ({args.faults / min(timings):,.0f} lines/s)")
+
+    assert results["lark"][1] == results["fast"][1], "Fast path and lark grammar disagree!"
+    print(f"Speedup: {results['lark'][0] / results['fast'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+"""
+Measures the process start-up overhead of the instructions executed in each iteration of the compaction loop, i.e., the
+time to start and wait for a trivial program when it is wrapped in ``/bin/bash -c`` (as all instructions used to be),
+when it is executed directly with ``utils.spawn()`` (``posix_spawn``) and when it is invoked through a ``make -C``
+target, which adds the start-up and the dependency scanning of ``make``.
+
+Usage: ``python3 bench_spawn.py -n 1000``
+"""
+
+try:
+
+    from testcrush import utils
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import utils
+
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+
+
+def bash(command: str) -> subprocess.Popen:
+    """Starts a command the way it used to be, with ``/bin/bash -c``."""
+
+    return subprocess.Popen(["/bin/bash", "-c", command], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, text=True)
+
+
+def timed(start: callable, command: str, runs: int) -> float:
+    """Returns the mean time in milliseconds to start ``command`` and wait for it."""
+
+    begin = time.perf_counter()
+    for _ in range(runs):
+
+        with start(command) as process:
+            process.communicate()
+
+    return (time.perf_counter() - begin) / runs * 1e3
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Process start-up overhead benchmark.")
+    parser.add_argument("-n", "--runs", type=int, default=1000, help="Number of runs per mode.")
+    args = parser.parse_args()
+
+    program = shutil.which("true")
+    modes = [("bash -c", bash, program), ("posix_spawn", utils.spawn, utils.Command(program))]
+
+    with tempfile.TemporaryDirectory(prefix="testcrush_bench_") as tmp:
+
+        if shutil.which("make"):
+
+            with open(f"{tmp}/Makefile", "w") as makefile:
+                makefile.write(f"all:\n\t@{program}\n")
+
+            modes += [("bash -c make -C", bash, f"make -C {tmp} all"),
+                      ("posix_spawn make -C", utils.spawn, utils.Command(f"make -C {tmp} all"))]
+
+        print(f"{'mode':>20} {'ms/command':>11}")
+
+        for name, start, command in modes:
+            print(f"{name:>20} {timed(start, command, args.runs):>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+"""
+Measures the throughput of every registered trace tokenizer, including the plugged-in ones, on a synthetic trace made
+of the repeated entries of its own ``sample``. The throughput is compared against a plain read of the trace file and,
+for the processors which have one, against the lark transformer.
+
+With ``--bandwidth``, the trace is also stored compressed in each supported format and the time to read it over a
+storage link of that bandwidth (e.g., network storage) is estimated as the transfer time of the file plus the time to
+decompress it, as measured. Synthetic traces are far more repetitive than real ones, hence a real trace can be given
+with ``--trace`` for this comparison.
+
+Usage: ``python3 bench_trace.py -n 100000 [--bandwidth 100 [--trace trace.log]]``
+"""
+
+try:
+
+    from testcrush.grammars import transformers
+    from testcrush import preprocessor
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush.grammars import transformers
+    from testcrush import preprocessor
+
+import argparse
+import bz2
+import collections
+import gzip
+import importlib.util
+import itertools
+import lzma
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+
+
+def generate_trace(sample: str, entries: int) -> str:
+    """
+    Generates a synthetic trace by repeating the entries of a sample trace.
+
+    Args:
+        sample (str): The sample trace, including its header.
+        entries (int): Number of entries to generate.
+
+    Returns:
+        str: The trace.
+    """
+
+    header, *body = [line for line in sample.splitlines() if line.strip()]
+
+    return '\n'.join([header] + list(itertools.islice(itertools.cycle(body), entries))) + '\n'
+
+
+def timed(function: callable, repeat: int) -> float:
+    """Returns the best time of ``repeat`` calls of ``function``."""
+
+    timings = list()
+    for _ in range(repeat):
+
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def compressors() -> dict[str, callable]:
+    """The supported compression formats which are available."""
+
+    formats = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+    if importlib.util.find_spec("zstandard"):
+
+        import zstandard
+        formats["zstd"] = zstandard.ZstdCompressor().compress
+
+    return formats
+
+
+def compressed_io(trace: pathlib.Path, bandwidth: float, repeat: int) -> None:
+    """
+    Prints the size of the trace in each compression format and the estimated time to read it from a storage link of
+    ``bandwidth`` MB/s.
+    """
+
+    plain = trace.read_bytes()
+
+    print(f"{'format':>8} {'MB':>7} {'ratio':>6} {'decompress s':>13} {f'read s @ {bandwidth:g}MB/s':>18}")
+
+    for name, compress in [("plain", None)] + list(compressors().items()):
+
+        path = trace.with_suffix(f".{name}")
+        path.write_bytes(compress(plain) if compress else plain)
+        size = os.path.getsize(path) / 2**20
+
+        def read():
+            with preprocessor.open_trace(path) as src:
+                collections.deque(src, maxlen=0)
+
+        decompress_s = timed(read, repeat)
+
+        print(f"{name:>8} {size:>7.1f} {len(plain) / 2**20 / size:>6.1f} {decompress_s:>13.2f} "
+              f"{size / bandwidth + decompress_s:>18.2f}")
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Trace tokenizer throughput benchmark.")
+    parser.add_argument("-n", "--entries", type=int, default=100_000, help="Number of trace entries to generate.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of timed runs per tokenizer.")
+    parser.add_argument("--no-lark", action="store_true", help="Skip the (slow) lark transformers.")
+    parser.add_argument("--bandwidth", type=float, default=None,
+                        help="Bandwidth of the storage in MB/s. Compares the compressed trace formats.")
+    parser.add_argument("--trace", type=pathlib.Path, default=None,
+                        help="With --bandwidth. A real, uncompressed trace to compare the compressed formats on.")
+    args = parser.parse_args()
+
+    print(f"{'processor':>12} {'MB':>7} {'read MB/s':>10} {'tokenizer MB/s':>15} {'lark MB/s':>10}")
+
+    for processor, tokenizer in transformers.TraceTokenizerFactory.available().items():
+
+        tokenizer = tokenizer()
+
+        with tempfile.TemporaryDirectory(prefix="testcrush_bench_") as tmp:
+
+            trace = pathlib.Path(tmp) / "trace.log"
+            trace.write_text(generate_trace(tokenizer.sample, args.entries))
+            size = os.path.getsize(trace) / 2**20
+
+            def read():
+                with open(trace) as src:
+                    collections.deque(src, maxlen=0)
+
+            def tokenize():
+                with open(trace) as src:
+                    collections.deque(tokenizer.tokenize(src), maxlen=0)
+
+            read_s = timed(read, args.repeat)
+            tokenize_s = timed(tokenize, args.repeat)
+
+            lark = "n/a"
+            if not args.no_lark and processor in transformers.TraceTransformerFactory._transformers:
+
+                lark_parser = transformers.TraceTransformerFactory()(processor)
+                lark = f"{size / timed(lambda: lark_parser.parse(trace.read_text()), 1):>10.2f}"
+
+            print(f"{processor:>12} {size:>7.1f} {size / read_s:>10.2f} {size / tokenize_s:>15.2f} {lark:>10}")
+
+            if args.bandwidth and not args.trace:
+                compressed_io(trace, args.bandwidth, args.repeat)
+
+    if args.bandwidth and args.trace:
+
+        with tempfile.TemporaryDirectory(prefix="testcrush_bench_") as tmp:
+
+            trace = pathlib.Path(tmp) / "trace.log"
+            shutil.copyfile(args.trace, trace)
+            compressed_io(trace, args.bandwidth, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
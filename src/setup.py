@@ -5,7 +5,8 @@ setup(
     description="An assembly-STL compaction toolkit based on VCS-Z01X.",
     version="0.5.0",
     packages=find_packages(),
-    install_requires=['toml', 'lark', 'pyelftools', 'psutil'],
+    install_requires=['toml', 'lark', 'pyelftools', 'psutil', 'numpy'],
+    extras_require={'zstd': ['zstandard']},
     url="https://github.com/cad-polito-it/testcrush",
     licence="MIT",
     author="Nick Deligiannis",
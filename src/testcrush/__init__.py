@@ -2,6 +2,9 @@ from testcrush import utils
 from testcrush import config
 from testcrush import asm
 from testcrush import zoix
+from testcrush import build
+from testcrush import distributed
+from testcrush import ordering
 from testcrush import a0
 from testcrush import a1xx
 from testcrush.grammars import transformers
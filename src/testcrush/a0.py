@@ -5,11 +5,13 @@ import pathlib
 import re
 import random
 import csv
+import collections
 import time
 import os
 
-from testcrush.utils import get_logger, compile_assembly, zip_archive, Singleton, addr2line, reap_process_tree
-from testcrush import asm, zoix, preprocessor
+from testcrush.utils import get_logger, compile_assembly, zip_archive, Singleton, addr2line_table, \
+    reap_process_tree, run_steps, PRE_RUN_DEPENDENCIES
+from testcrush import asm, zoix, preprocessor, build, distributed, ordering
 from typing import Any
 
 log = get_logger()
@@ -42,57 +44,41 @@ class PreprocessorA0(preprocessor.Preprocessor):
 
         Takes as input the list of ``Codeline`` objects of A0. This list will be modified in-place by identifying the
         relevance of each codeline towards fault detection. The fault attributes of simulation time and program counter
-        are accumulated for each prime fault. Then, a query is performed on the trace database for each <time,pc> pair
-        in order to extract a window of program counters (i.e., instruction sequences). Then, thes program counters are
-        associated with line numbers in the assembly sources and are ommitted from the search space. That is, they are
-        removed from the ``candidates`` list which is modified in place.
+        are accumulated for each prime fault. Then, the window of ``history`` program counters (i.e., instruction
+        sequences) up to each <time,pc> pair is extracted from the trace (see ``query_trace_windows()``). Then, the
+        distinct program counters are associated with line numbers in the assembly sources and are ommitted from the
+        search space. That is, they are removed from the ``candidates`` list which is modified in place.
 
         Args:
             candidates (list[asm.Codeline]): Reference to the list of candidates of A0. To be modified **in-place**.
             mapping (dict[str, str]): A mapping of Z01X fault attributes to Trace column names.
 
         """
-        # 1. Gather attribute pairs
-        attributes = list()
-        for fault in self.fault_list:
+        # 1. Gather attribute pairs. Duplicates are merged by query_trace_windows()
+        attributes = [{self.zoix2trace[k]: fault.fault_attributes[k] for k in self.zoix2trace.keys()}
+                      for fault in self.fault_list if hasattr(fault, "fault_attributes")]
 
-            if hasattr(fault, "fault_attributes"):
-
-                entry = {self.zoix2trace[k]: fault.fault_attributes[k] for k in self.zoix2trace.keys()}
-                if entry not in attributes:
-
-                    attributes.append(entry)
-
-        # 2. Query the database for PC windows
-        # TODO: How to specify the column name of the trace? ask explicitly for PC?
-        pcs = list()
-        for entry in attributes:
-            try:
-                window = [pc for (pc,) in self.query_trace_db(select="PC", where=entry, history=4)]
-            except ValueError:
-                continue
-
-            if window not in pcs:
-                pcs.append(window)
-
-        # Flatten the list
-        pcs = [pc for window in pcs for pc in window]
+        # 2. Extract the PC windows from the trace
+        pcs = sorted(self.query_trace_windows(attributes))
 
         # 3. Find the asm source and line numbers and filter out the candidates
+        lines = self.line_table()
+
         removed = list()
         for pc in pcs:
 
-            asm_file, lineno = addr2line(self.elf, pc)
+            asm_file, lineno = lines.get(pc, (None, None))
 
             if lineno in removed:
                 log.warning(f"Line {lineno} has already been removed. Skipping.")
                 continue
 
             if not asm_file:
-                log.warning(f"Program counter {pc} not found in {self.elf}")
+                log.warning(f"Program counter {pc:#010x} not found in {self.elf}")
 
             if asm_file not in mapping:
-                log.warning(f"PC value {pc} maps to line {lineno} of {asm_file} which isn't in asm sources. Skipping.")
+                log.warning(f"PC value {pc:#010x} maps to line {lineno} of {asm_file} which isn't in asm sources. \
+Skipping.")
                 continue
 
             before = len(candidates)
@@ -128,6 +114,27 @@ class A0(metaclass=Singleton):
 
         self.assembly_compilation_instructions: list[str] = a0_settings.get("assembly_compilation_instructions")
 
+        self.incremental_compiler: build.IncrementalCompiler | None = None
+        incremental_compilation = a0_settings.get("incremental_compilation")
+        if incremental_compilation and incremental_compilation.get("enabled"):
+            self.incremental_compiler = build.IncrementalCompiler.from_settings(a0_asm_sources, incremental_compilation)
+            log.debug(f"Incremental compilation of assembly sources enabled with {incremental_compilation}")
+
+        self.elf_patcher: build.ElfPatcher | None = None
+        elf_patching = a0_settings.get("elf_patching")
+        if elf_patching and elf_patching.get("enabled"):
+            self.elf_patcher = build.ElfPatcher.from_settings(elf_patching)
+            log.debug(f"ELF patching enabled with {elf_patching}")
+
+        self.memory_image: build.MemoryImage | None = None
+        memory_image = a0_settings.get("memory_image")
+        if memory_image and memory_image.get("enabled"):
+            self.memory_image = build.MemoryImage.from_settings(memory_image)
+            log.debug(f"Memory image generation enabled with {memory_image}")
+
+        # Lines of each assembly source present when the ELF was last built. Empty if the ELF is stale
+        self._elf_snapshots: dict[int, bytes] = dict()
+
         self.zoix_compilation_args: list[str] = a0_settings.get("vcs_compilation_instructions")
         log.debug(f"VCS compilation instructions for HDL sources set to {self.zoix_compilation_args}")
 
@@ -137,6 +144,10 @@ class A0(metaclass=Singleton):
             {k: v for k, v in a0_settings.get("vcs_logic_simulation_control").items()}
         log.debug(f"VCS logic simulation control parameters are: {self.zoix_lsim_kwargs}")
 
+        self.pre_run_dependencies: dict[str, list[str]] = \
+            PRE_RUN_DEPENDENCIES | (a0_settings.get("pre_run_dependencies") or dict())
+        log.debug(f"Dependencies of the initial run steps are {self.pre_run_dependencies}")
+
         self.zoix_fsim_args: list[str] = a0_settings.get("zoix_fault_simulation_instructions")
         self.zoix_fsim_kwargs: dict[str, float] = \
             {k: v for k, v in a0_settings.get("zoix_fault_simulation_control").items()}
@@ -149,7 +160,36 @@ class A0(metaclass=Singleton):
         self.compaction_policy = a0_settings.get("compaction_policy")
         log.debug(f"The compaction policy that will be used is: {self.compaction_policy}")
 
-        self.vc_zoix: zoix.ZoixInvoker = zoix.ZoixInvoker()
+        zoix_scheduler = a0_settings.get("zoix_scheduler")
+        if zoix_scheduler:
+            log.debug(f"VCS/Z01X job scheduling parameters are: {zoix_scheduler}")
+
+        zoix_sessions = a0_settings.get("zoix_sessions") or dict()
+        if zoix_sessions:
+            log.debug(f"VCS/Z01X simulator sessions are: {zoix_sessions}")
+
+        self.vc_zoix: zoix.ZoixInvoker = zoix.ZoixInvoker(zoix.JobScheduler.from_settings(zoix_scheduler)
+                                                          if zoix_scheduler else None,
+                                                          {kind: zoix.SimulatorSession.from_settings(session)
+                                                           for kind, session in zoix_sessions.items()})
+
+        self.candidate_ordering: dict[str, Any] | None = None
+        candidate_ordering = a0_settings.get("candidate_ordering")
+        if candidate_ordering and candidate_ordering.get("enabled"):
+            self.candidate_ordering = candidate_ordering
+            log.debug(f"Candidate ordering enabled with {candidate_ordering}")
+
+        # Set by order_candidates()
+        self.ranker: ordering.CandidateRanker | None = None
+        self._signatures: dict[tuple[int, int], ordering.Signature] = dict()
+
+        # Set by profile_candidates(). Execution count and cycles per candidate
+        self.profile: dict[tuple[int, int], tuple[int, int]] = dict()
+        self.order_by_tat: bool = False
+        self.remove_unexecuted: bool = False
+
+        # Set by attribute_candidates(). Attributed and uniquely detected faults per candidate
+        self.attribution: dict[tuple[int, int], tuple[int, int]] = dict()
 
     @staticmethod
     def evaluate(previous_result: tuple[int, float],
@@ -172,6 +212,27 @@ class A0(metaclass=Singleton):
 
         return (new_tat <= old_tat) and (new_coverage >= old_coverage)
 
+    def accept(self, previous_result: tuple[int, float], new_result: tuple[int, float]) -> tuple[int, float]:
+        """
+        Returns the reference stats after a removal has been accepted, according to the compaction policy.
+
+        Args:
+            previous_result (tuple[int, float]): the old tat value (int) and coverage (float) values.
+            new_result (tuple[int, float]): the new tat value (int) and coverage values.
+
+        Returns:
+            tuple[int, float]: The stats against which the next removals are evaluated.
+        """
+
+        if (self.compaction_policy == "Maximize"):
+            return new_result
+        elif self.compaction_policy == "Threshold":
+            # We want to minimize TaT remaining over the initial faults coverage
+            return (new_result[0], previous_result[1])
+        else:
+            log.critical("Unknown compaction policy!")
+            exit(1)
+
     def _coverage(self, precision: int = 4) -> float:
         """
         Args:
@@ -187,12 +248,75 @@ class A0(metaclass=Singleton):
         coverage_formula = self.coverage_formula
         return self.fsim_report.compute_coverage(requested_formula=coverage_formula, precision=precision)
 
-    def pre_run(self) -> tuple[int, float]:
+    def _compile_assembly(self, *changed: pathlib.Path) -> bool:
+        """
+        Cross-compiles the assembly sources. Incrementally if enabled, otherwise by executing the user-defined
+        cross-compilation instructions. Then, writes the memory image of the STL, if enabled.
+
+        Args:
+            changed (pathlib.Path): A variadic number of assembly sources modified since the last compilation.
+
+        Returns:
+            bool: True if the compilation succeeded. False otherwise.
+        """
+
+        if self.incremental_compiler:
+            compiled = self.incremental_compiler.compile(*changed)
+        else:
+            compiled = compile_assembly(*self.assembly_compilation_instructions)
+
+        if compiled and self.memory_image:
+            self.memory_image.write()
+
+        return compiled
+
+    def _elf_built(self) -> None:
+        """Marks the ELF as built from the current state of the assembly sources."""
+
+        self.elf_patcher.load()
+        self._elf_snapshots = {asm_id: handler.snapshot() for asm_id, handler in enumerate(self.assembly_sources)}
+
+    def _patch_elf(self, asm_id: int, codeline: asm.Codeline) -> bool:
+        """
+        Replaces the instructions of a (removed) codeline with nops directly in the ELF, if ELF patching is enabled.
+
+        Args:
+            asm_id (int): The identifier of the assembly source.
+            codeline (asm.Codeline): The codeline.
+
+        Returns:
+            bool: True if the ELF was patched. False if the codeline must be evaluated by re-compiling the sources.
+        """
+
+        if not self.elf_patcher or not self._elf_snapshots:
+            return False
+
+        handler = self.assembly_sources[asm_id]
+        lineno = handler.get_lineno_at(codeline, self._elf_snapshots[asm_id])
+
+        patched = self.elf_patcher.patch(handler.get_asm_source(), lineno + 1)
+
+        if patched and self.memory_image:
+            self.memory_image.write()
+
+        return patched
+
+    def pre_run(self, after_lsim: callable = None) -> tuple[int, float]:
         """
         Extracts the initial test application time and coverage of the STL.
 
         The test application time is extracted by a logic simulation of the STL
-        whereas the coverage is computed by performing a fault simulation.
+        whereas the coverage is computed by performing a fault simulation. By
+        default, the STL is cross-compiled, the HDL sources are compiled, and
+        the logic and fault simulations are performed strictly in sequence.
+        Steps which do not depend on each other, as declared in the
+        ``[pre_run]`` dependencies, run concurrently instead.
+
+        Args:
+            after_lsim (callable, optional): Called once the STL is compiled and
+                logic simulated, before the fault simulation starts. That is, as
+                soon as the ELF file and the execution trace of the STL exist
+                e.g., to build the preprocessor in the background.
 
         Returns:
             tuple[int, float]: The test application time (index 0) and the
@@ -207,9 +331,428 @@ class A0(metaclass=Singleton):
 
         test_application_time = list()
 
-        compile_assembly(*self.assembly_compilation_instructions)
+        def cross_compilation():
+
+            if compile_assembly(*self.assembly_compilation_instructions) and self.memory_image:
+                self.memory_image.write()
+
+        def vcs_hdl_compilation():
+
+            if self.zoix_compilation_args:
+
+                comp = vc_zoix.compile_sources(*self.zoix_compilation_args)
+
+                if comp == zoix.Compilation.ERROR:
+
+                    log.critical("Unable to compile HDL sources!")
+                    exit(1)
+
+        def vcs_logic_simulation():
+
+            print("Initial logic simulation for TaT computation.")
+            try:
+
+                lsim = vc_zoix.logic_simulate(*self.zoix_lsim_args,
+                                              **self.zoix_lsim_kwargs,
+                                              tat_value=test_application_time)
+
+            except zoix.LogicSimulationException:
+
+                log.critical("Unable to perform logic simulation for TaT computation")
+                exit(1)
 
-        if self.zoix_compilation_args:
+            if lsim != zoix.LogicSimulation.SUCCESS:
+
+                log.critical("Error during initial logic simulation! Check the debug log!")
+                exit(1)
+
+            if after_lsim:
+                after_lsim()
+
+        def zoix_fault_simulation():
+
+            print("Initial fault simulation for coverage computation.")
+
+            fsim = vc_zoix.fault_simulate(*self.zoix_fsim_args, **self.zoix_fsim_kwargs)
+
+            if fsim != zoix.FaultSimulation.SUCCESS:
+
+                log.critical("Error during initial fault simulation! Check the debug log!")
+                exit(1)
+
+        # Independent steps run concurrently, as declared in the [pre_run] section
+        run_steps({"cross_compilation": cross_compilation,
+                   "vcs_hdl_compilation": vcs_hdl_compilation,
+                   "vcs_logic_simulation": vcs_logic_simulation,
+                   "zoix_fault_simulation": zoix_fault_simulation}, self.pre_run_dependencies)
+
+        coverage = self._coverage()
+
+        return (test_application_time.pop(), coverage)
+
+    def _key(self, asm_id: int, codeline: asm.Codeline) -> tuple[int, int]:
+        """Identifies a candidate by its assembly source and original line number, which are unaffected by removals."""
+
+        return (asm_id, self.assembly_sources[asm_id].get_original_lineno(codeline))
+
+    def profile_candidates(self, profile: dict[tuple[str, int], tuple[int, int]], order_by_tat: bool = False,
+                           remove_unexecuted: bool = False) -> None:
+        """
+        Attaches the execution count and cycle contribution of the golden run to each candidate.
+
+        Args:
+            profile (dict[tuple[str, int], tuple[int, int]]): The execution count and cycles per assembly source name
+                                                               and 1-based line number, as returned by
+                                                               ``Preprocessor.line_profile()``.
+            order_by_tat (bool, optional): Whether to evaluate the candidates with the highest cycle contribution
+                                           first. Defaults to False.
+            remove_unexecuted (bool, optional): Whether to remove the never-executed candidates as a batch at the
+                                                beginning of the run. Defaults to False.
+
+        Returns:
+            None
+        """
+
+        self.profile = dict()
+        for asm_id, codeline in self.all_instructions:
+
+            key = self._key(asm_id, codeline)
+            source = self.assembly_sources[asm_id].get_asm_source().name
+
+            self.profile[key] = profile.get((source, key[1] + 1), (0, 0))
+
+        self.order_by_tat = order_by_tat
+        self.remove_unexecuted = remove_unexecuted
+
+        executed = len([count for count, _ in self.profile.values() if count])
+        log.debug(f"{executed} out of {len(self.profile)} candidates are executed in the golden run")
+
+    def attribute_candidates(self, attribution: dict[tuple[str, int], tuple[int, int]],
+                             max_unique_faults: int | None = None) -> None:
+        """
+        Attaches the faults attributed to each candidate in the golden run. Candidates without any attributed faults
+        are evaluated first and candidates which uniquely detect more than ``max_unique_faults`` faults are dropped.
+
+        Args:
+            attribution (dict[tuple[str, int], tuple[int, int]]): The attributed and uniquely detected faults per
+                                                                   assembly source name and 1-based line number, as
+                                                                   returned by ``Preprocessor.fault_attribution()``.
+            max_unique_faults (int | None, optional): The maximum number of uniquely detected faults of a candidate.
+                                                      Defaults to None i.e., no candidate is dropped.
+
+        Returns:
+            None
+        """
+
+        self.attribution = dict()
+        for asm_id, codeline in self.all_instructions:
+
+            key = self._key(asm_id, codeline)
+            source = self.assembly_sources[asm_id].get_asm_source().name
+
+            self.attribution[key] = attribution.get((source, key[1] + 1), (0, 0))
+
+        if max_unique_faults is not None:
+
+            before = len(self.all_instructions)
+            self.all_instructions = [candidate for candidate in self.all_instructions
+                                     if self.attribution[self._key(*candidate)][1] <= max_unique_faults]
+
+            log.debug(f"Dropped {before - len(self.all_instructions)} candidates which uniquely detect more than "
+                      f"{max_unique_faults} faults")
+
+        unattributed = len([faults for faults, _ in self.attribution.values() if not faults])
+        log.debug(f"{unattributed} out of {len(self.attribution)} candidates have no attributed faults")
+
+    def _prioritize(self) -> None:
+        """
+        Sorts the candidates in place by the execution profile and the fault attribution, if any. The current (e.g.,
+        shuffled) order breaks the ties.
+
+        Returns:
+            None
+        """
+
+        # The hottest lines first
+        if self.order_by_tat:
+            self.all_instructions.sort(key=lambda candidate: -self.profile.get(self._key(*candidate), (0, 0))[1])
+
+        # Lines without any attributed faults first
+        if self.attribution:
+            self.all_instructions.sort(key=lambda candidate: bool(self.attribution.get(self._key(*candidate),
+                                                                                       (0, 0))[0]))
+
+    def _remove_dead_code(self, stl_stats: tuple[int, float], stats: CSVCompactionStatistics) -> tuple[int, float]:
+        """
+        Removes the candidates which are never executed in the golden run (see ``profile_candidates()``) as a batch
+        i.e., with a single evaluation of the STL. If the batch is rejected, it is bisected until every removable
+        part of it is gone. Each evaluation is logged to the statistics with a ``BatchProceed`` or ``BatchRestore``
+        verdict. The removed candidates, as well as single candidates which have been evaluated, are dropped from the
+        candidates.
+
+        Args:
+            stl_stats (tuple[int, float]): The test application time (int) and coverage (float) of the STL.
+            stats (CSVCompactionStatistics): The statistics.
+
+        Returns:
+            tuple[int, float]: The stats of the STL after the removals, as per the compaction policy.
+        """
+
+        unexecuted = [(asm_id, codeline) for asm_id, codeline in self.all_instructions
+                      if not self.profile.get(self._key(asm_id, codeline), (0, 0))[0]]
+
+        if not unexecuted:
+            return stl_stats
+
+        print(f"Removing {len(unexecuted)} never-executed lines as a batch")
+
+        evaluated = set()
+        compiled = True
+
+        def attempt(batch: list[tuple[int, asm.Codeline]]) -> bool:
+
+            nonlocal stl_stats, stats, compiled
+
+            iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
+            iteration_stats["asm_source"] = ", ".join(sorted({self.assembly_sources[asm_id].get_asm_source().name
+                                                             for asm_id, _ in batch}))
+            iteration_stats["removed_codeline"] = f"BATCH[{len(batch)}]: " + \
+                " ".join(f"#{codeline.lineno}" for _, codeline in batch)
+
+            # Assembly source identifier -> number of removed codelines
+            changed = dict()
+            for asm_id, handler in enumerate(self.assembly_sources):
+
+                codelines = [codeline for i, codeline in batch if i == asm_id]
+
+                if codelines:
+
+                    with handler.edit() as transaction:
+                        transaction.remove(*codelines)
+
+                    changed[asm_id] = len(codelines)
+
+            print(f"\tRemoving a batch of {len(batch)} never-executed lines")
+            new_stl_stats = self._simulate(next(iter(changed)), f"{len(batch)} never-executed lines", False,
+                                           iteration_stats,
+                                           changed=[self.assembly_sources[i].get_asm_source() for i in changed])
+
+            accepted = bool(new_stl_stats) and self.evaluate(stl_stats, new_stl_stats)
+
+            if accepted:
+
+                print(f"\tBatch accepted. New TaT: {new_stl_stats[0]} | New Coverage: {new_stl_stats[1]}")
+                stl_stats = self.accept(stl_stats, new_stl_stats)
+
+            else:
+
+                print("\tBatch rejected. Restoring!")
+                for asm_id, count in changed.items():
+
+                    with self.assembly_sources[asm_id].edit() as transaction:
+                        transaction.restore(count)
+
+            # Whether the compiled STL matches the sources
+            compiled = accepted
+
+            iteration_stats["verdict"] = "BatchProceed" if accepted else "BatchRestore"
+            stats += iteration_stats
+
+            if len(batch) == 1:
+                evaluated.add(id(batch[0][1]))
+
+            return accepted
+
+        removed = preprocessor.bisect_removal(unexecuted, attempt)
+        print(f"Removed {len(removed)} out of {len(unexecuted)} never-executed lines")
+
+        if not compiled:
+            self._compile_assembly(*[handler.get_asm_source() for handler in self.assembly_sources])
+
+        evaluated |= {id(codeline) for _, codeline in removed}
+        self.all_instructions = [(asm_id, codeline) for asm_id, codeline in self.all_instructions
+                                 if id(codeline) not in evaluated]
+
+        return stl_stats
+
+    def order_candidates(self, preprocessor: PreprocessorA0 | None = None) -> None:
+        """
+        Sets up the ordering of the candidates by their likelihood of being removable, as learned online from the
+        verdicts of the compaction. Must be invoked after ``pre_run()``. The features of each candidate are:
+
+        - its mnemonic.
+        - the number of faults whose program counter attribute maps to it in the golden run fault report, if the
+          ``elf_file`` is specified.
+        - its execution count and cycle contribution in the trace of the golden run, if the ``preprocessor`` is given.
+        - its last verdict in the statistics CSV files of previous compactions, if any ``statistics`` are specified.
+          These verdicts also warm-start the model.
+
+        Args:
+            preprocessor (PreprocessorA0 | None, optional): The preprocessor, whose trace DB provides the execution
+                                                            counts. Defaults to None.
+
+        Returns:
+            None
+        """
+
+        settings = self.candidate_ordering
+        pc_attribute = settings.get("fault_pc_attribute") or "PC_ID"
+
+        self.ranker = ordering.CandidateRanker(settings.get("smoothing") or 1.0)
+
+        # Program counter -> (assembly source name, 1-based line number)
+        lines = addr2line_table(settings["elf_file"]) if settings.get("elf_file") else None
+
+        def line_of(pc: str) -> tuple[str, int] | None:
+
+            try:
+                return lines.get(int(pc, 16))
+            except ValueError:
+                return None
+
+        faults = None
+        if lines:
+
+            faults = collections.Counter(line_of(fault.fault_attributes[pc_attribute])
+                                         for fault in self.fsim_report.fault_list
+                                         if pc_attribute in getattr(fault, "fault_attributes", dict()))
+
+        profile = None
+        if preprocessor:
+            profile = preprocessor.line_profile()
+
+        statistics = settings.get("statistics") or list()
+        verdicts = ordering.previous_verdicts(*statistics)
+
+        by_text = dict()
+        for asm_id, codeline in self.all_instructions:
+
+            key = self._key(asm_id, codeline)
+            source = self.assembly_sources[asm_id].get_asm_source().name
+            line = (source, key[1] + 1)
+
+            signature = [("mnemonic", codeline.data.split()[0])]
+
+            if faults is not None:
+                signature.append(("faults", ordering.bucket(faults[line])))
+
+            if profile is not None:
+
+                executions, cycles = profile.get(line, (0, 0))
+                signature.append(("executions", ordering.bucket(executions)))
+                signature.append(("cycles", ordering.bucket(cycles)))
+
+            if statistics:
+                signature.append(("history", verdicts.get((source, codeline.data), [None])[-1]))
+
+            self._signatures[key] = tuple(signature)
+            by_text[(source, codeline.data)] = tuple(signature)
+
+        # Warm start
+        for text, previous in verdicts.items():
+
+            if text in by_text:
+
+                for verdict in previous:
+                    self.ranker.update(by_text[text], verdict == "Proceed")
+
+        log.debug(f"Candidate ordering warm-started with {sum(self.ranker.totals)} verdicts")
+
+    def _remove(self, asm_id: int, codeline: asm.Codeline) -> bool:
+        """
+        Removes a codeline from its assembly source and, if possible, patches it out of the ELF.
+
+        Args:
+            asm_id (int): The identifier of the assembly source.
+            codeline (asm.Codeline): The codeline to be removed.
+
+        Returns:
+            bool: True if the ELF was patched. False if the sources must be re-compiled.
+        """
+
+        self.assembly_sources[asm_id].remove(codeline)
+
+        return self._patch_elf(asm_id, codeline)
+
+    def _restore(self, asm_id: int, patched: bool) -> None:
+        """
+        Restores the last removed codeline of an assembly source.
+
+        Args:
+            asm_id (int): The identifier of the assembly source.
+            patched (bool): Whether the removal was patched out of the ELF.
+
+        Returns:
+            None
+        """
+
+        self.assembly_sources[asm_id].restore()
+
+        if patched:
+
+            self.elf_patcher.unpatch()
+
+            if self.memory_image:
+                self.memory_image.write()
+
+        else:
+            # The ELF still contains the removal
+            self._elf_snapshots = dict()
+
+    def _simulate(self, asm_id: int, codeline: asm.Codeline | str, patched: bool, iteration_stats: dict[str, str],
+                  changed: list[pathlib.Path] | None = None) -> tuple[int, float] | None:
+        """
+        Evaluates the STL after the removal of a codeline. That is, cross-compilation (unless the removal has been
+        patched out of the ELF), logic simulation, fault simulation and coverage computation. The outcome of each step
+        is recorded in ``iteration_stats``.
+
+        Args:
+            asm_id (int): The identifier of the assembly source.
+            codeline (asm.Codeline | str): The removed codeline, or a description of the removed codelines.
+            patched (bool): Whether the removal was patched out of the ELF.
+            iteration_stats (dict[str, str]): The statistics of the current iteration.
+            changed (list[pathlib.Path] | None, optional): The modified assembly sources. Defaults to the assembly
+                                                           source of ``asm_id``.
+
+        Returns:
+            tuple[int, float] | None: The test application time and coverage of the STL. ``None`` if any step failed.
+        """
+
+        handler = self.assembly_sources[asm_id]
+        asm_source_file = handler.get_asm_source().name
+
+        # Z01X alias
+        vc_zoix = self.vc_zoix
+
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        # |A|S|M| |C|O|M|P|I|L|E|
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        compiles = "PATCHED" if patched else "YES"
+
+        if patched:
+
+            print("\tPatched ELF with nops.")
+            asm_compilation = True
+
+        else:
+
+            print("\tCross-compiling assembly sources.")
+            asm_compilation = self._compile_assembly(*(changed or [handler.get_asm_source()]))
+
+            if asm_compilation and self.elf_patcher:
+                self._elf_built()
+
+        if not asm_compilation:
+
+            print(f"\t{asm_source_file} does not compile after the removal of: {codeline}. Restoring!")
+            iteration_stats["compiles"] = "NO"
+            return None
+
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        # |V|C|S| |C|O|M|P|I|L|E|
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        # Not needed when only the memory image read by the testbench changes
+        if self.zoix_compilation_args and not self.memory_image:
 
             comp = vc_zoix.compile_sources(*self.zoix_compilation_args)
 
@@ -218,35 +761,56 @@ class A0(metaclass=Singleton):
                 log.critical("Unable to compile HDL sources!")
                 exit(1)
 
-        print("Initial logic simulation for TaT computation.")
+        # +-+-+-+ +-+-+-+-+
+        # |V|C|S| |L|S|I|M|
+        # +-+-+-+ +-+-+-+-+
+        test_application_time = list()
         try:
-
+            print("\tInitiating logic simulation.")
             lsim = vc_zoix.logic_simulate(*self.zoix_lsim_args,
                                           **self.zoix_lsim_kwargs,
                                           tat_value=test_application_time)
 
         except zoix.LogicSimulationException:
 
-            log.critical("Unable to perform logic simulation for TaT computation")
+            log.critical("Unable to perform logic simulation for TaT computation. Simulation status not set!")
             exit(1)
 
         if lsim != zoix.LogicSimulation.SUCCESS:
 
-            log.critical("Error during initial logic simulation! Check the debug log!")
-            exit(1)
+            print(f"\tLogic simulation of {asm_source_file} resulted in {lsim.value} after removing {codeline}.")
+            print("\tRestoring.")
+            iteration_stats["compiles"] = compiles
+            iteration_stats["lsim_ok"] = f"NO-{lsim.value}"
+            return None
 
-        print("Initial fault simulation for coverage computation.")
+        test_application_time = test_application_time.pop(0)
 
+        # +-+-+-+ +-+-+-+-+
+        # |V|C|S| |F|S|I|M|
+        # +-+-+-+ +-+-+-+-+
+        print("\tInitiating fault simulation.")
         fsim = vc_zoix.fault_simulate(*self.zoix_fsim_args, **self.zoix_fsim_kwargs)
 
         if fsim != zoix.FaultSimulation.SUCCESS:
+            print(f"\tFault simulation of {asm_source_file} resulted in a {fsim.value} after removing {codeline}.")
+            print("\tRestoring.")
+            iteration_stats["compiles"] = compiles
+            iteration_stats["lsim_ok"] = "YES"
+            iteration_stats["tat"] = str(test_application_time)
+            iteration_stats["fsim_ok"] = f"NO-{fsim.value}"
+            return None
 
-            log.critical("Error during initial fault simulation! Check the debug log!")
-            exit(1)
-
+        print("\t\tComputing coverage.")
         coverage = self._coverage()
 
-        return (test_application_time.pop(), coverage)
+        iteration_stats["compiles"] = compiles
+        iteration_stats["lsim_ok"] = "YES"
+        iteration_stats["tat"] = str(test_application_time)
+        iteration_stats["fsim_ok"] = "YES"
+        iteration_stats["coverage"] = str(coverage)
+
+        return (test_application_time, coverage)
 
     def run(self, initial_stl_stats: tuple[int, float], times_to_shuffle: int = 100) -> None:
         """
@@ -270,18 +834,6 @@ class A0(metaclass=Singleton):
         Returns:
             None
         """
-        def _restore(asm_source: int) -> None:
-            """
-            Invokes the ``restore()`` function of a specific assembly handler.
-
-            Args:
-                asm_source (int): The identifier of the assembly source.
-
-            Returns:
-                None
-            """
-            self.assembly_sources[asm_source].restore()
-
         # To be used for generated file suffixes
         unique_id = time.strftime("%d_%b_%H%M", time.gmtime())
 
@@ -289,9 +841,6 @@ class A0(metaclass=Singleton):
         initial_tat, initial_coverage = initial_stl_stats
         log.debug(f"Initial coverage {initial_coverage}, TaT {initial_tat}")
 
-        # Z01X alias
-        vc_zoix = self.vc_zoix
-
         # Statistics
         stats_filename = f"a0_statistics_{unique_id}.csv"
         stats = CSVCompactionStatistics(pathlib.Path(stats_filename))
@@ -300,24 +849,40 @@ class A0(metaclass=Singleton):
         # they will be modified in-place.
         zip_archive(f"../backup_{unique_id}", *[asm.get_asm_source() for asm in self.assembly_sources])
 
+        if self.remove_unexecuted:
+            initial_tat, initial_coverage = self._remove_dead_code((initial_tat, initial_coverage), stats)
+
+        # The ELF has been built from the current sources
+        if self.elf_patcher:
+            self._elf_built()
+
         # Randomize order for Step 2
         for _ in range(times_to_shuffle):
             random.shuffle(self.all_instructions)
 
+        self._prioritize()
+
+        # The shuffled (or prioritized) order breaks the ties of the ranker
+        if self.ranker is not None:
+            for asm_id, codeline in self.all_instructions:
+                self.ranker.push((asm_id, codeline), self._signatures[self._key(asm_id, codeline)])
+
+        candidates = self.ranker if self.ranker is not None else self.all_instructions
+
         iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
 
         iteration_stats["tat"] = initial_tat
         iteration_stats["coverage"] = initial_coverage
 
-        total_iterations = len(self.all_instructions)
+        total_iterations = len(candidates)
 
         # Step 2: Select instructions in a random order
         old_stl_stats = (initial_tat, initial_coverage)
-        while len(self.all_instructions) != 0:
+        while len(candidates) != 0:
 
             print(f"""
 #############
-# ITERATION {total_iterations - len(self.all_instructions) + 1} / {total_iterations}
+# ITERATION {total_iterations - len(candidates) + 1} / {total_iterations}
 #############
 """)
 
@@ -326,7 +891,11 @@ class A0(metaclass=Singleton):
                 stats += iteration_stats
                 iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
 
-            asm_id, codeline = self.all_instructions.pop(0)
+            if self.ranker is not None:
+                (asm_id, codeline), signature = self.ranker.pop()
+            else:
+                asm_id, codeline = self.all_instructions.pop(0)
+
             asm_source_file = self.assembly_sources[asm_id].get_asm_source().name
 
             iteration_stats["asm_source"] = asm_source_file
@@ -334,90 +903,20 @@ class A0(metaclass=Singleton):
 
             print(f"Removing {codeline} of assembly source {asm_source_file}")
             # Step 3: Removal of the selected instruction
-            handler = self.assembly_sources[asm_id]
-            handler.remove(codeline)
-
-            # +-+-+-+ +-+-+-+-+-+-+-+
-            # |A|S|M| |C|O|M|P|I|L|E|
-            # +-+-+-+ +-+-+-+-+-+-+-+
-            print("\tCross-compiling assembly sources.")
-            asm_compilation = compile_assembly(*self.assembly_compilation_instructions)
-
-            if not asm_compilation:
-
-                print(f"\t{asm_source_file} does not compile after the removal of: {codeline}. Restoring!")
-                iteration_stats["compiles"] = "NO"
-                iteration_stats["verdict"] = "Restore"
-                _restore(asm_id)
-                continue
-
-            # +-+-+-+ +-+-+-+-+-+-+-+
-            # |V|C|S| |C|O|M|P|I|L|E|
-            # +-+-+-+ +-+-+-+-+-+-+-+
-            if self.zoix_compilation_args:
-
-                comp = vc_zoix.compile_sources(*self.zoix_compilation_args)
-
-                if comp == zoix.Compilation.ERROR:
-
-                    log.critical("Unable to compile HDL sources!")
-                    exit(1)
+            patched = self._remove(asm_id, codeline)
 
-            # +-+-+-+ +-+-+-+-+
-            # |V|C|S| |L|S|I|M|
-            # +-+-+-+ +-+-+-+-+
-            test_application_time = list()
-            try:
-                print("\tInitiating logic simulation.")
-                lsim = vc_zoix.logic_simulate(*self.zoix_lsim_args,
-                                              **self.zoix_lsim_kwargs,
-                                              tat_value=test_application_time)
+            new_stl_stats = self._simulate(asm_id, codeline, patched, iteration_stats)
 
-            except zoix.LogicSimulationException:
+            if new_stl_stats is None:
 
-                log.critical("Unable to perform logic simulation for TaT computation. Simulation status not set!")
-                exit(1)
-
-            if lsim != zoix.LogicSimulation.SUCCESS:
-
-                print(f"\tLogic simulation of {asm_source_file} resulted in {lsim.value} after removing {codeline}.")
-                print("\tRestoring.")
-                iteration_stats["compiles"] = "YES"
-                iteration_stats["lsim_ok"] = f"NO-{lsim.value}"
                 iteration_stats["verdict"] = "Restore"
-                _restore(asm_id)
-                continue
-
-            test_application_time = test_application_time.pop(0)
+                self._restore(asm_id, patched)
 
-            # +-+-+-+ +-+-+-+-+
-            # |V|C|S| |F|S|I|M|
-            # +-+-+-+ +-+-+-+-+
-            print("\tInitiating fault simulation.")
-            fsim = vc_zoix.fault_simulate(*self.zoix_fsim_args, **self.zoix_fsim_kwargs)
+                if self.ranker is not None:
+                    self.ranker.update(signature, False)
 
-            if fsim != zoix.FaultSimulation.SUCCESS:
-                print(f"\tFault simulation of {asm_source_file} resulted in a {fsim.value} after removing {codeline}.")
-                print("\tRestoring.")
-                iteration_stats["compiles"] = "YES"
-                iteration_stats["lsim_ok"] = "YES"
-                iteration_stats["tat"] = str(test_application_time)
-                iteration_stats["fsim_ok"] = f"NO-{fsim.value}"
-                iteration_stats["verdict"] = "Restore"
-                _restore(asm_id)
                 continue
 
-            print("\t\tComputing coverage.")
-            coverage = self._coverage()
-
-            new_stl_stats = (test_application_time, coverage)
-
-            iteration_stats["compiles"] = "YES"
-            iteration_stats["lsim_ok"] = "YES"
-            iteration_stats["tat"] = str(test_application_time)
-            iteration_stats["fsim_ok"] = "YES"
-            iteration_stats["coverage"] = str(coverage)
-
             # Step 4: Coverage and TaT evaluation.  Wrt
             # the paper the evaluation happens  on  the
             # coverage i.e., new >= old rather than the
@@ -428,14 +927,7 @@ class A0(metaclass=Singleton):
 {old_stl_stats[0]} | Old Coverage: {old_stl_stats[1]}\n\t\tNew TaT: \
 {new_stl_stats[0]} | New Coverage: {new_stl_stats[1]}\n\tProceeding!")
 
-                if (self.compaction_policy == "Maximize"):
-                    old_stl_stats = new_stl_stats
-                elif self.compaction_policy == "Threshold":
-                    # We want to minimize TaT remaining over the initial faults coverage
-                    old_stl_stats = (new_stl_stats[0], old_stl_stats[1])
-                else:
-                    log.critical("Unknown compaction policy!")
-                    exit(1)
+                old_stl_stats = self.accept(old_stl_stats, new_stl_stats)
 
                 iteration_stats["verdict"] = "Proceed"
 
@@ -446,13 +938,148 @@ class A0(metaclass=Singleton):
 {new_stl_stats[0]} | New Coverage: {new_stl_stats[1]}\n\tRestoring!")
 
                 iteration_stats["verdict"] = "Restore"
-                _restore(asm_id)
+                self._restore(asm_id, patched)
+
+            if self.ranker is not None:
+                self.ranker.update(signature, iteration_stats["verdict"] == "Proceed")
 
         # Last iteration updates
         if any(iteration_stats.values()):
             stats += iteration_stats
             iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
 
+    def serve(self, initial_stl_stats: tuple[int, float], address: str, times_to_shuffle: int = 100) -> None:
+        """
+        Distributed counterpart of ``run()``. Serves the candidates to workers (see ``work()``) and applies the
+        accepted removals to the assembly sources once all candidates have been evaluated.
+
+        Args:
+            initial_stl_stats (tuple[int, float]): The test application time (int) and coverage (float) of the original
+                                                   STL
+            address (str): Either ``host:port`` for TCP or the path of a Unix domain socket to listen to.
+            times_to_shuffle (int, optional): Number of times to permutate the assembly candidates. Defaults to 100.
+
+        Returns:
+            None
+        """
+
+        # To be used for generated file suffixes
+        unique_id = time.strftime("%d_%b_%H%M", time.gmtime())
+
+        stats = CSVCompactionStatistics(pathlib.Path(f"a0_statistics_{unique_id}.csv"))
+
+        zip_archive(f"../backup_{unique_id}", *[asm.get_asm_source() for asm in self.assembly_sources])
+
+        for _ in range(times_to_shuffle):
+            random.shuffle(self.all_instructions)
+
+        self._prioritize()
+
+        # Without online updates, since workers evaluate candidates concurrently
+        if self.ranker is not None:
+
+            for asm_id, codeline in self.all_instructions:
+                self.ranker.push((asm_id, codeline), self._signatures[self._key(asm_id, codeline)])
+
+            self.all_instructions = self.ranker.drain()
+
+        # Candidates are identified by their assembly source and original line number
+        codelines = {(asm_id, codeline.lineno): codeline for asm_id, codeline in self.all_instructions}
+
+        def on_verdict(candidate: list[int], verdict: str, worker_stats: dict[str, str]) -> None:
+
+            nonlocal stats
+
+            asm_id, lineno = candidate
+
+            iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
+            iteration_stats.update({k: v for k, v in worker_stats.items() if k in iteration_stats})
+            iteration_stats["asm_source"] = self.assembly_sources[asm_id].get_asm_source().name
+            iteration_stats["removed_codeline"] = codelines[(asm_id, lineno)]
+            iteration_stats["verdict"] = verdict
+
+            stats += iteration_stats
+
+        coordinator = distributed.Coordinator([list(candidate) for candidate in codelines], initial_stl_stats,
+                                              self.evaluate, self.accept, on_verdict=on_verdict)
+
+        print(f"Serving {len(codelines)} candidates at {address}")
+        changelog = coordinator.serve(address)
+        print(f"Accepted {len(changelog)} removals. Final stats: {coordinator.stats}")
+
+        for asm_id, handler in enumerate(self.assembly_sources):
+
+            with handler.edit() as transaction:
+                transaction.remove(*[codelines[(i, lineno)] for i, lineno in changelog if i == asm_id])
+
+    def work(self, address: str) -> int:
+        """
+        Worker of a distributed compaction. Repeatedly pulls a candidate from the coordinator (see ``serve()``),
+        evaluates the STL without it and reports back. The assembly sources are always restored after an
+        evaluation; removals accepted by the coordinator are applied before the next one.
+
+        Args:
+            address (str): The address of the coordinator. Either ``host:port`` for TCP or the path of a Unix domain
+                           socket.
+
+        Returns:
+            int: The number of evaluated candidates.
+        """
+
+        # Before any removal, line numbers are the original ones
+        codelines = {(asm_id, codeline.lineno): codeline for asm_id, codeline in self.all_instructions}
+
+        evaluated = 0
+        version = 0
+
+        with distributed.WorkQueueClient(address) as client:
+
+            while (job := client.get(version)) is not None:
+
+                # Catch up with the removals accepted by the coordinator
+                for asm_id, handler in enumerate(self.assembly_sources):
+
+                    accepted = [codelines[(i, lineno)] for i, lineno in job["changelog"] if i == asm_id]
+
+                    if accepted:
+
+                        with handler.edit() as transaction:
+                            transaction.remove(*accepted)
+
+                        # The ELF does not contain the accepted removals
+                        self._elf_snapshots = dict()
+
+                version = job["version"]
+
+                asm_id, lineno = job["candidate"]
+                codeline = codelines[(asm_id, lineno)]
+
+                print(f"Removing {codeline} of assembly source {self.assembly_sources[asm_id].get_asm_source().name}")
+
+                iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
+
+                patched = self._remove(asm_id, codeline)
+                new_stl_stats = self._simulate(asm_id, codeline, patched, iteration_stats)
+                self._restore(asm_id, patched)
+
+                del iteration_stats["removed_codeline"]
+                verdict = client.report(job["id"], new_stl_stats, iteration_stats)
+                print(f"\tCoordinator verdict: {verdict}")
+
+                evaluated += 1
+
+        return evaluated
+
     def post_run(self) -> None:
-        """ Cleanup any VC-Z01X stopped processes """
+        """
+        Reports the VC-Z01X job scheduling statistics, closes the simulator sessions and cleans up any VC-Z01X stopped
+        processes
+        """
+        for kind, statistics in self.vc_zoix.scheduler.statistics().items():
+
+            if statistics["jobs"]:
+                log.info(f"{kind} jobs: {statistics['jobs']}, license retries: {statistics['retries']}, queue wait: \
+{statistics['wait']:.2f}s, backoff: {statistics['backoff']:.2f}s, longest wait: {statistics['max_wait']:.2f}s")
+
+        self.vc_zoix.close()
         reap_process_tree(os.getpid())
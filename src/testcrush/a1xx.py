@@ -8,8 +8,9 @@ import csv
 import time
 import os
 
-from testcrush.utils import get_logger, compile_assembly, zip_archive, Singleton, reap_process_tree, addr2line
-from testcrush import asm, zoix, preprocessor
+from testcrush.utils import get_logger, compile_assembly, zip_archive, Singleton, reap_process_tree, run_steps, \
+    PRE_RUN_DEPENDENCIES
+from testcrush import asm, zoix, preprocessor, build
 from typing import Any
 
 log = get_logger()
@@ -72,10 +73,10 @@ class PreprocessorA1xx(preprocessor.Preprocessor):
 
         Takes as input the list of ``Codeline`` objects of A1xx. This list will be modified in-place by identifying the
         relevance of each codeline towards fault detection. The fault attributes of simulation time and program counter
-        are accumulated for each prime fault. Then, a query is performed on the trace database for each <time,pc> pair
-        in order to extract a window of program counters (i.e., instruction sequences). Then, thes program counters are
-        associated with line numbers in the assembly sources and are ommitted from the search space. That is, they are
-        removed from the ``candidates`` list which is modified in place.
+        are accumulated for each prime fault. Then, the window of ``history`` program counters (i.e., instruction
+        sequences) up to each <time,pc> pair is extracted from the trace (see ``query_trace_windows()``). Then, the
+        distinct program counters are associated with line numbers in the assembly sources and are ommitted from the
+        search space. That is, they are removed from the ``candidates`` list which is modified in place.
 
         Args:
             candidates (list[tuple[int, asm.Codeline]]): Reference to the list of candidates of A1xx.
@@ -86,47 +87,31 @@ class PreprocessorA1xx(preprocessor.Preprocessor):
         Returns:
             (list[tuple[int, list[asm.Codeline]]]): List of chunks, each associated with its asm_id
         """
-        # 1. Gather attribute pairs
-        attributes = list()
-        for fault in self.fault_list:
+        # 1. Gather attribute pairs. Duplicates are merged by query_trace_windows()
+        attributes = [{self.zoix2trace[k]: fault.fault_attributes[k] for k in self.zoix2trace.keys()}
+                      for fault in self.fault_list if hasattr(fault, "fault_attributes")]
 
-            if hasattr(fault, "fault_attributes"):
-
-                entry = {self.zoix2trace[k]: fault.fault_attributes[k] for k in self.zoix2trace.keys()}
-                if entry not in attributes:
-
-                    attributes.append(entry)
-
-        # 2. Query the database for PC windows
-        # TODO: How to specify the column name of the trace? ask explicitly for PC?
-        pcs = list()
-        for entry in attributes:
-            try:
-                window = [pc for (pc,) in self.query_trace_db(select="PC", where=entry, history=4)]
-            except ValueError:
-                continue
-
-            if window not in pcs:
-                pcs.append(window)
-
-        # Flatten the list
-        pcs = [pc for window in pcs for pc in window]
+        # 2. Extract the PC windows from the trace
+        pcs = sorted(self.query_trace_windows(attributes))
 
         # 3. Find the asm source and line numbers and filter out the candidates
+        lines = self.line_table()
+
         removed = list()
         for pc in pcs:
 
-            asm_file, lineno = addr2line(self.elf, pc)
+            asm_file, lineno = lines.get(pc, (None, None))
 
             if lineno in removed:
                 log.warning(f"Line {lineno} has already been removed. Skipping.")
                 continue
 
             if not asm_file:
-                log.warning(f"Program counter {pc} not found in {self.elf}")
+                log.warning(f"Program counter {pc:#010x} not found in {self.elf}")
 
             if asm_file not in mapping:
-                log.warning(f"PC value {pc} maps to line {lineno} of {asm_file} which isn't in asm sources. Skipping.")
+                log.warning(f"PC value {pc:#010x} maps to line {lineno} of {asm_file} which isn't in asm sources. \
+Skipping.")
                 continue
 
             before = len(candidates)
@@ -158,8 +143,10 @@ class A1xx(metaclass=Singleton):
             for codeline in asm.get_code()
         ]
 
+        # Blocks are consumed during the run. Copy them
+        # to leave the chunks of the handlers intact.
         self.all_code_chunks: list[tuple[int, list[asm.Codeline]]] = [
-            (asm_id, chunk)
+            (asm_id, list(chunk))
             for asm_id, asm in enumerate(self.assembly_sources)
             for chunk in asm.get_code_chunks()
         ]
@@ -168,6 +155,19 @@ class A1xx(metaclass=Singleton):
 
         self.assembly_compilation_instructions: list[str] = a1xx_settings.get("assembly_compilation_instructions")
 
+        self.incremental_compiler: build.IncrementalCompiler | None = None
+        incremental_compilation = a1xx_settings.get("incremental_compilation")
+        if incremental_compilation and incremental_compilation.get("enabled"):
+            self.incremental_compiler = build.IncrementalCompiler.from_settings(a1xx_asm_sources,
+                                                                                incremental_compilation)
+            log.debug(f"Incremental compilation of assembly sources enabled with {incremental_compilation}")
+
+        self.memory_image: build.MemoryImage | None = None
+        memory_image = a1xx_settings.get("memory_image")
+        if memory_image and memory_image.get("enabled"):
+            self.memory_image = build.MemoryImage.from_settings(memory_image)
+            log.debug(f"Memory image generation enabled with {memory_image}")
+
         self.zoix_compilation_args: list[str] = a1xx_settings.get("vcs_compilation_instructions")
         log.debug(f"VCS compilation instructions for HDL sources set to {self.zoix_compilation_args}")
 
@@ -177,6 +177,10 @@ class A1xx(metaclass=Singleton):
             {k: v for k, v in a1xx_settings.get("vcs_logic_simulation_control").items()}
         log.debug(f"VCS logic simulation control parameters are: {self.zoix_lsim_kwargs}")
 
+        self.pre_run_dependencies: dict[str, list[str]] = \
+            PRE_RUN_DEPENDENCIES | (a1xx_settings.get("pre_run_dependencies") or dict())
+        log.debug(f"Dependencies of the initial run steps are {self.pre_run_dependencies}")
+
         self.zoix_fsim_args: list[str] = a1xx_settings.get("zoix_fault_simulation_instructions")
         self.zoix_fsim_kwargs: dict[str, float] = \
             {k: v for k, v in a1xx_settings.get("zoix_fault_simulation_control").items()}
@@ -192,7 +196,22 @@ class A1xx(metaclass=Singleton):
         self.compaction_policy = a1xx_settings.get("compaction_policy")
         log.debug(f"The compaction policy that will be used is: {self.compaction_policy}")
 
-        self.vc_zoix: zoix.ZoixInvoker = zoix.ZoixInvoker()
+        zoix_scheduler = a1xx_settings.get("zoix_scheduler")
+        if zoix_scheduler:
+            log.debug(f"VCS/Z01X job scheduling parameters are: {zoix_scheduler}")
+
+        zoix_sessions = a1xx_settings.get("zoix_sessions") or dict()
+        if zoix_sessions:
+            log.debug(f"VCS/Z01X simulator sessions are: {zoix_sessions}")
+
+        self.vc_zoix: zoix.ZoixInvoker = zoix.ZoixInvoker(zoix.JobScheduler.from_settings(zoix_scheduler)
+                                                          if zoix_scheduler else None,
+                                                          {kind: zoix.SimulatorSession.from_settings(session)
+                                                           for kind, session in zoix_sessions.items()})
+
+        # Execution count and cycles of each candidate in the golden run. See profile_candidates()
+        self.profile: dict[tuple[int, int], tuple[int, int]] = dict()
+        self.remove_unexecuted: bool = False
 
     @staticmethod
     def evaluate(previous_result: tuple[int, float, list[zoix.Fault]],
@@ -216,6 +235,61 @@ class A1xx(metaclass=Singleton):
 
         return (new_tat <= old_tat) and (new_coverage >= old_coverage)
 
+    def accept(self, previous_result: tuple[int, float], new_result: tuple[int, float]) -> tuple[int, float]:
+        """
+        Returns the reference stats after a removal has been accepted, according to the compaction policy.
+
+        Args:
+            previous_result (tuple[int, float]): the old tat value (int) and coverage (float) values.
+            new_result (tuple[int, float]): the new tat value (int) and coverage values.
+
+        Returns:
+            tuple[int, float]: The stats against which the next removals are evaluated.
+        """
+
+        if (self.compaction_policy == "Maximize"):
+            return new_result
+        elif self.compaction_policy == "Threshold":
+            # We want to minimize TaT remaining over the initial faults coverage
+            return (new_result[0], previous_result[1])
+        else:
+            log.critical("Unknown compaction policy!")
+            exit(1)
+
+    def _key(self, asm_id: int, codeline: asm.Codeline) -> tuple[int, int]:
+        """Identifies a candidate by its assembly source and its line number in the original assembly file."""
+
+        return (asm_id, self.assembly_sources[asm_id].get_original_lineno(codeline))
+
+    def profile_candidates(self, profile: dict[tuple[str, int], tuple[int, int]],
+                           remove_unexecuted: bool = False) -> None:
+        """
+        Attaches the execution count and cycle contribution of the golden run to each candidate.
+
+        Args:
+            profile (dict[tuple[str, int], tuple[int, int]]): The execution count and cycles per assembly source name
+                                                               and 1-based line number, as returned by
+                                                               ``Preprocessor.line_profile()``.
+            remove_unexecuted (bool, optional): Whether to remove the never-executed candidates as a batch at the
+                                                beginning of the run. Defaults to False.
+
+        Returns:
+            None
+        """
+
+        self.profile = dict()
+        for asm_id, codeline in self.all_instructions:
+
+            key = self._key(asm_id, codeline)
+            source = self.assembly_sources[asm_id].get_asm_source().name
+
+            self.profile[key] = profile.get((source, key[1] + 1), (0, 0))
+
+        self.remove_unexecuted = remove_unexecuted
+
+        executed = len([count for count, _ in self.profile.values() if count])
+        log.debug(f"{executed} out of {len(self.profile)} candidates are executed in the golden run")
+
     def _coverage(self, precision: int = 4) -> float:
         """
         Args:
@@ -231,29 +305,63 @@ class A1xx(metaclass=Singleton):
         coverage_formula = self.coverage_formula
         return self.fsim_report.compute_coverage(requested_formula=coverage_formula, precision=precision)
 
-    def pre_run(self) -> tuple[int, float]:
+    def _compile_assembly(self, *changed: pathlib.Path) -> bool:
         """
-        Extracts the initial test application time and coverage of the STL.
+        Cross-compiles the assembly sources. Incrementally if enabled, otherwise by executing the user-defined
+        cross-compilation instructions. Then, writes the memory image of the STL, if enabled.
 
-        The test application time is extracted by a logic simulation of the STL
-        whereas the coverage is computed by performing a fault simulation.
+        Args:
+            changed (pathlib.Path): A variadic number of assembly sources modified since the last compilation.
 
         Returns:
-            tuple[int, float]: The test application time (index 0) and the
-            coverage of the STL (index 1)
-        Raises:
-            SystemExit: If HDL sources cannot be compiled (if specified) or
-                        if logic simulation cannot be performed.
-            TimeoutError: if logic or fault simulation timed out.
+            bool: True if the compilation succeeded. False otherwise.
+        """
+
+        if self.incremental_compiler:
+            compiled = self.incremental_compiler.compile(*changed)
+        else:
+            compiled = compile_assembly(*self.assembly_compilation_instructions)
+
+        if compiled and self.memory_image:
+            self.memory_image.write()
+
+        return compiled
+
+    def _simulate(self, changed: list[pathlib.Path], removed_codelines: str,
+                  iteration_stats: dict[str, str]) -> tuple[int, float] | None:
         """
+        Evaluates the STL after the removal of codelines. That is, cross-compilation, logic simulation, fault
+        simulation and coverage computation. The outcome of each step is recorded in ``iteration_stats``.
 
+        Args:
+            changed (list[pathlib.Path]): The modified assembly sources.
+            removed_codelines (str): A description of the removed codelines.
+            iteration_stats (dict[str, str]): The statistics of the current iteration.
+
+        Returns:
+            tuple[int, float] | None: The test application time and coverage of the STL. ``None`` if any step failed.
+        """
+
+        # Z01X alias
         vc_zoix = self.vc_zoix
 
-        test_application_time = list()
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        # |A|S|M| |C|O|M|P|I|L|E|
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        print("\tCross-compiling assembly sources.")
+        asm_compilation = self._compile_assembly(*changed)
+
+        if not asm_compilation:
 
-        compile_assembly(*self.assembly_compilation_instructions)
+            print(f"\tDoes not compile after the removal of: {removed_codelines}. Restoring!")
+            iteration_stats["compiles"] = "NO"
+            return None
 
-        if self.zoix_compilation_args:
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        # |V|C|S| |C|O|M|P|I|L|E|
+        # +-+-+-+ +-+-+-+-+-+-+-+
+        # Not needed when only the memory image read by the testbench changes
+        if self.zoix_compilation_args and not self.memory_image:
 
             comp = vc_zoix.compile_sources(*self.zoix_compilation_args)
 
@@ -262,31 +370,230 @@ class A1xx(metaclass=Singleton):
                 log.critical("Unable to compile HDL sources!")
                 exit(1)
 
-        print("Initial logic simulation for TaT computation.")
+        # +-+-+-+ +-+-+-+-+
+        # |V|C|S| |L|S|I|M|
+        # +-+-+-+ +-+-+-+-+
+        test_application_time = list()
         try:
-
-            lsim = vc_zoix.logic_simulate(*self.zoix_lsim_args,
-                                          **self.zoix_lsim_kwargs,
-                                          tat_value=test_application_time)
+            print("\tInitiating logic simulation.")
+            lsim = vc_zoix.logic_simulate(
+                *self.zoix_lsim_args,
+                **self.zoix_lsim_kwargs,
+                tat_value=test_application_time
+            )
 
         except zoix.LogicSimulationException:
 
-            log.critical("Unable to perform logic simulation for TaT computation")
+            log.critical("Unable to perform logic simulation for TaT computation. Simulation status not set!")
             exit(1)
 
         if lsim != zoix.LogicSimulation.SUCCESS:
 
-            log.critical("Error during initial logic simulation! Check the debug log!")
-            exit(1)
+            print(f"\tLogic simulation resulted in {lsim.value} after removing {removed_codelines}.")
+            print("\tRestoring.")
+            iteration_stats["compiles"] = "YES"
+            iteration_stats["lsim_ok"] = f"NO-{lsim.value}"
+            return None
 
-        print("Initial fault simulation for coverage computation.")
+        test_application_time = test_application_time.pop(0)
 
+        # +-+-+-+ +-+-+-+-+
+        # |V|C|S| |F|S|I|M|
+        # +-+-+-+ +-+-+-+-+
+        print("\tInitiating fault simulation.")
         fsim = vc_zoix.fault_simulate(*self.zoix_fsim_args, **self.zoix_fsim_kwargs)
 
         if fsim != zoix.FaultSimulation.SUCCESS:
+            print(f"\tFault simulation resulted in a {fsim.value} after removing: {removed_codelines}")
+            print("\tRestoring.")
+            iteration_stats["compiles"] = "YES"
+            iteration_stats["lsim_ok"] = "YES"
+            iteration_stats["tat"] = str(test_application_time)
+            iteration_stats["fsim_ok"] = f"NO-{fsim.value}"
+            return None
+
+        print("\t\tComputing coverage.")
+        coverage = self._coverage()
 
-            log.critical("Error during initial fault simulation! Check the debug log!")
-            exit(1)
+        iteration_stats["compiles"] = "YES"
+        iteration_stats["lsim_ok"] = "YES"
+        iteration_stats["tat"] = str(test_application_time)
+        iteration_stats["fsim_ok"] = "YES"
+        iteration_stats["coverage"] = str(coverage)
+
+        return (test_application_time, coverage)
+
+    def _remove_dead_code(self, stl_stats: tuple[int, float], stats: CSVCompactionStatistics) -> tuple[int, float]:
+        """
+        Removes the codelines which are never executed in the golden run (see ``profile_candidates()``) as a batch
+        i.e., with a single evaluation of the STL. If the batch is rejected, it is bisected until every removable
+        part of it is gone. Each evaluation is logged to the statistics with a ``BatchProceed`` or ``BatchRestore``
+        verdict. The removed codelines are dropped from the blocks.
+
+        Args:
+            stl_stats (tuple[int, float]): The test application time (int) and coverage (float) of the STL.
+            stats (CSVCompactionStatistics): The statistics.
+
+        Returns:
+            tuple[int, float]: The stats of the STL after the removals, as per the compaction policy.
+        """
+
+        unexecuted = [(asm_id, codeline) for asm_id, block in self.all_code_chunks for codeline in block
+                      if not self.profile.get(self._key(asm_id, codeline), (0, 0))[0]]
+
+        if not unexecuted:
+            return stl_stats
+
+        print(f"Removing {len(unexecuted)} never-executed lines as a batch")
+
+        compiled = True
+
+        def attempt(batch: list[tuple[int, asm.Codeline]]) -> bool:
+
+            nonlocal stl_stats, stats, compiled
+
+            iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
+            iteration_stats["asm_source"] = ", ".join(sorted({self.assembly_sources[asm_id].get_asm_source().name
+                                                             for asm_id, _ in batch}))
+            iteration_stats["block_index"] = "batch"
+            iteration_stats["removed_codelines"] = "\t".join(str(codeline) for _, codeline in batch)
+
+            # Assembly source identifier -> number of removed codelines
+            changed = dict()
+            for asm_id, handler in enumerate(self.assembly_sources):
+
+                codelines = [codeline for i, codeline in batch if i == asm_id]
+
+                if codelines:
+
+                    with handler.edit() as transaction:
+                        transaction.remove(*codelines)
+
+                    changed[asm_id] = len(codelines)
+
+            print(f"\tRemoving a batch of {len(batch)} never-executed lines")
+            new_stl_stats = self._simulate([self.assembly_sources[i].get_asm_source() for i in changed],
+                                           f"{len(batch)} never-executed lines", iteration_stats)
+
+            accepted = bool(new_stl_stats) and self.evaluate(stl_stats, new_stl_stats)
+
+            if accepted:
+
+                print(f"\tBatch accepted. New TaT: {new_stl_stats[0]} | New Coverage: {new_stl_stats[1]}")
+                stl_stats = self.accept(stl_stats, new_stl_stats)
+
+            else:
+
+                print("\tBatch rejected. Restoring!")
+                for asm_id, count in changed.items():
+
+                    with self.assembly_sources[asm_id].edit() as transaction:
+                        transaction.restore(count)
+
+            # Whether the compiled STL matches the sources
+            compiled = accepted
+
+            iteration_stats["verdict"] = "BatchProceed" if accepted else "BatchRestore"
+            stats += iteration_stats
+
+            return accepted
+
+        removed = {id(codeline) for _, codeline in preprocessor.bisect_removal(unexecuted, attempt)}
+        print(f"Removed {len(removed)} out of {len(unexecuted)} never-executed lines")
+
+        if not compiled:
+            self._compile_assembly(*[handler.get_asm_source() for handler in self.assembly_sources])
+
+        self.all_code_chunks = [(asm_id, [codeline for codeline in block if id(codeline) not in removed])
+                                for asm_id, block in self.all_code_chunks]
+        self.all_code_chunks = [(asm_id, block) for asm_id, block in self.all_code_chunks if block]
+
+        return stl_stats
+
+    def pre_run(self, after_lsim: callable = None) -> tuple[int, float]:
+        """
+        Extracts the initial test application time and coverage of the STL.
+
+        The test application time is extracted by a logic simulation of the STL
+        whereas the coverage is computed by performing a fault simulation. By
+        default, the STL is cross-compiled, the HDL sources are compiled, and
+        the logic and fault simulations are performed strictly in sequence.
+        Steps which do not depend on each other, as declared in the
+        ``[pre_run]`` dependencies, run concurrently instead.
+
+        Args:
+            after_lsim (callable, optional): Called once the STL is compiled and
+                logic simulated, before the fault simulation starts. That is, as
+                soon as the ELF file and the execution trace of the STL exist
+                e.g., to build the preprocessor in the background.
+
+        Returns:
+            tuple[int, float]: The test application time (index 0) and the
+            coverage of the STL (index 1)
+        Raises:
+            SystemExit: If HDL sources cannot be compiled (if specified) or
+                        if logic simulation cannot be performed.
+            TimeoutError: if logic or fault simulation timed out.
+        """
+
+        vc_zoix = self.vc_zoix
+
+        test_application_time = list()
+
+        def cross_compilation():
+
+            if compile_assembly(*self.assembly_compilation_instructions) and self.memory_image:
+                self.memory_image.write()
+
+        def vcs_hdl_compilation():
+
+            if self.zoix_compilation_args:
+
+                comp = vc_zoix.compile_sources(*self.zoix_compilation_args)
+
+                if comp == zoix.Compilation.ERROR:
+
+                    log.critical("Unable to compile HDL sources!")
+                    exit(1)
+
+        def vcs_logic_simulation():
+
+            print("Initial logic simulation for TaT computation.")
+            try:
+
+                lsim = vc_zoix.logic_simulate(*self.zoix_lsim_args,
+                                              **self.zoix_lsim_kwargs,
+                                              tat_value=test_application_time)
+
+            except zoix.LogicSimulationException:
+
+                log.critical("Unable to perform logic simulation for TaT computation")
+                exit(1)
+
+            if lsim != zoix.LogicSimulation.SUCCESS:
+
+                log.critical("Error during initial logic simulation! Check the debug log!")
+                exit(1)
+
+            if after_lsim:
+                after_lsim()
+
+        def zoix_fault_simulation():
+
+            print("Initial fault simulation for coverage computation.")
+
+            fsim = vc_zoix.fault_simulate(*self.zoix_fsim_args, **self.zoix_fsim_kwargs)
+
+            if fsim != zoix.FaultSimulation.SUCCESS:
+
+                log.critical("Error during initial fault simulation! Check the debug log!")
+                exit(1)
+
+        # Independent steps run concurrently, as declared in the [pre_run] section
+        run_steps({"cross_compilation": cross_compilation,
+                   "vcs_hdl_compilation": vcs_hdl_compilation,
+                   "vcs_logic_simulation": vcs_logic_simulation,
+                   "zoix_fault_simulation": zoix_fault_simulation}, self.pre_run_dependencies)
 
         coverage = self._coverage()
 
@@ -339,9 +646,6 @@ class A1xx(metaclass=Singleton):
         initial_tat, initial_coverage = initial_stl_stats
         log.debug(f"Initial coverage {initial_coverage}, TaT {initial_tat}")
 
-        # Z01X alias
-        vc_zoix = self.vc_zoix
-
         # Statistics
         stats_filename = f"a1{self.policy}{self.segment_dimension}_statistics_{unique_id}.csv"
         stats = CSVCompactionStatistics(pathlib.Path(stats_filename))
@@ -350,6 +654,9 @@ class A1xx(metaclass=Singleton):
         # they will be modified in-place.
         zip_archive(f"../backup_{unique_id}", *[asm.get_asm_source() for asm in self.assembly_sources])
 
+        if self.remove_unexecuted:
+            initial_tat, initial_coverage = self._remove_dead_code((initial_tat, initial_coverage), stats)
+
         # Set initial stats
         iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
 
@@ -394,7 +701,10 @@ class A1xx(metaclass=Singleton):
                     exit(1)
 
                 candidate_codelines.append(codeline)
-                handler.remove(codeline)
+
+            # Single rewrite of the assembly source for the whole block
+            with handler.edit() as transaction:
+                transaction.remove(*candidate_codelines)
 
             for _ in range(block_instructions):
 
@@ -411,92 +721,15 @@ class A1xx(metaclass=Singleton):
                 iteration_stats["asm_source"] = assembly_source
                 iteration_stats["removed_codelines"] = "\t".join(str(codeline) for codeline in candidate_codelines)
 
-                # +-+-+-+ +-+-+-+-+-+-+-+
-                # |A|S|M| |C|O|M|P|I|L|E|
-                # +-+-+-+ +-+-+-+-+-+-+-+
-                print("\tCross-compiling assembly sources.")
-                asm_compilation = compile_assembly(*self.assembly_compilation_instructions)
+                new_stl_stats = self._simulate([handler.get_asm_source()], removed_codelines, iteration_stats)
 
-                if not asm_compilation:
+                if not new_stl_stats:
 
-                    print(f"\tDoes not compile after the removal of: {removed_codelines}. Restoring!")
-                    iteration_stats["compiles"] = "NO"
                     iteration_stats["verdict"] = "Restore"
 
                     _restore(asm_id, candidate_codelines)
                     continue
 
-                # +-+-+-+ +-+-+-+-+-+-+-+
-                # |V|C|S| |C|O|M|P|I|L|E|
-                # +-+-+-+ +-+-+-+-+-+-+-+
-                if self.zoix_compilation_args:
-
-                    comp = vc_zoix.compile_sources(*self.zoix_compilation_args)
-
-                    if comp == zoix.Compilation.ERROR:
-
-                        log.critical("Unable to compile HDL sources!")
-                        exit(1)
-
-                # +-+-+-+ +-+-+-+-+
-                # |V|C|S| |L|S|I|M|
-                # +-+-+-+ +-+-+-+-+
-                test_application_time = list()
-                try:
-                    print("\tInitiating logic simulation.")
-                    lsim = vc_zoix.logic_simulate(
-                        *self.zoix_lsim_args,
-                        **self.zoix_lsim_kwargs,
-                        tat_value=test_application_time
-                    )
-
-                except zoix.LogicSimulationException:
-
-                    log.critical("Unable to perform logic simulation for TaT computation. Simulation status not set!")
-                    exit(1)
-
-                if lsim != zoix.LogicSimulation.SUCCESS:
-
-                    print(f"\tLogic simulation resulted in {lsim.value} after removing {removed_codelines}.")
-                    print("\tRestoring.")
-                    iteration_stats["compiles"] = "YES"
-                    iteration_stats["lsim_ok"] = f"NO-{lsim.value}"
-                    iteration_stats["verdict"] = "Restore"
-
-                    _restore(asm_id, candidate_codelines)
-                    continue
-
-                test_application_time = test_application_time.pop(0)
-
-                # +-+-+-+ +-+-+-+-+
-                # |V|C|S| |F|S|I|M|
-                # +-+-+-+ +-+-+-+-+
-                print("\tInitiating fault simulation.")
-                fsim = vc_zoix.fault_simulate(*self.zoix_fsim_args, **self.zoix_fsim_kwargs)
-
-                if fsim != zoix.FaultSimulation.SUCCESS:
-                    print(f"\tFault simulation resulted in a {fsim.value} after removing: {removed_codelines}")
-                    print("\tRestoring.")
-                    iteration_stats["compiles"] = "YES"
-                    iteration_stats["lsim_ok"] = "YES"
-                    iteration_stats["tat"] = str(test_application_time)
-                    iteration_stats["fsim_ok"] = f"NO-{fsim.value}"
-                    iteration_stats["verdict"] = "Restore"
-
-                    _restore(asm_id, candidate_codelines)
-                    continue
-
-                print("\t\tComputing coverage.")
-                coverage = self._coverage()
-
-                new_stl_stats = (test_application_time, coverage)
-
-                iteration_stats["compiles"] = "YES"
-                iteration_stats["lsim_ok"] = "YES"
-                iteration_stats["tat"] = str(test_application_time)
-                iteration_stats["fsim_ok"] = "YES"
-                iteration_stats["coverage"] = str(coverage)
-
                 # Step 7: Coverage and TaT evaluation.  Wrt
                 # the paper the evaluation happens  on  the
                 # coverage i.e., new >= old rather than the
@@ -507,14 +740,7 @@ class A1xx(metaclass=Singleton):
     {old_stl_stats[0]} | Old Coverage: {old_stl_stats[1]}\n\t\tNew TaT: \
     {new_stl_stats[0]} | New Coverage: {new_stl_stats[1]}\n\tProceeding!")
 
-                    if (self.compaction_policy == "Maximize"):
-                        old_stl_stats = new_stl_stats
-                    elif self.compaction_policy == "Threshold":
-                        # We want to minimize TaT remaining over the initial faults coverage
-                        old_stl_stats = (new_stl_stats[0], old_stl_stats[1])
-                    else:
-                        log.critical("Unknown compaction policy!")
-                        exit(1)
+                    old_stl_stats = self.accept(old_stl_stats, new_stl_stats)
 
                     iteration_stats["verdict"] = "Proceed"
                     break
@@ -535,5 +761,15 @@ class A1xx(metaclass=Singleton):
             iteration_stats = dict.fromkeys(CSVCompactionStatistics._header)
 
     def post_run(self) -> None:
-        """ Cleanup any VC-Z01X stopped processes """
+        """
+        Reports the VC-Z01X job scheduling statistics, closes the simulator sessions and cleans up any VC-Z01X stopped
+        processes
+        """
+        for kind, statistics in self.vc_zoix.scheduler.statistics().items():
+
+            if statistics["jobs"]:
+                log.info(f"{kind} jobs: {statistics['jobs']}, license retries: {statistics['retries']}, queue wait: \
+{statistics['wait']:.2f}s, backoff: {statistics['backoff']:.2f}s, longest wait: {statistics['max_wait']:.2f}s")
+
+        self.vc_zoix.close()
         reap_process_tree(os.getpid())
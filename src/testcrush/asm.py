@@ -1,11 +1,14 @@
 #!/usr/bin/python3
 # SPDX-License-Identifier: MIT
 
+import os
 import pathlib
 import re
 import tempfile
 import random
 import shutil
+import stat
+import contextlib
 
 from testcrush.utils import Singleton, get_logger
 from dataclasses import dataclass
@@ -13,11 +16,141 @@ from dataclasses import dataclass
 log = get_logger()
 
 
+class LineIndex:
+    """
+    Fenwick (binary indexed) tree over the physical lines of **one** assembly file.
+
+    Each line of the **original** file is marked as either present or removed. The current (0-based) line number of
+    an original line is the number of present lines that precede it (*rank*) and the original line which currently
+    sits at a given line number is found by a binary descent on the tree (*select*). Removals, restorations, ranks
+    and selects all cost O(log n). Hence, line number shifts never have to be propagated to every ``Codeline``.
+    """
+
+    def __init__(self, lines: int) -> 'LineIndex':
+
+        self.size: int = lines
+        self.present: bytearray = bytearray(b'\x01') * lines
+
+        # All lines are present, so each node
+        # holds the length of the range it covers.
+        self._tree: list[int] = [i & -i for i in range(lines + 1)]
+        self._count: int = lines
+
+    def __len__(self) -> int:
+
+        return self._count
+
+    def _update(self, line: int, delta: int) -> None:
+
+        i = line + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+        self._count += delta
+
+    def rank(self, line: int) -> int:
+        """
+        Returns the number of present lines before the original ``line``.
+
+        Args:
+            line (int): The 0-based original line number.
+
+        Returns:
+            int: The current 0-based line number of ``line``. For a removed line, the line number it would have if
+            restored.
+        """
+
+        total = 0
+        i = min(line, self.size)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+
+        return total
+
+    def select(self, lineno: int) -> int:
+        """
+        Returns the original line which currently sits at ``lineno``.
+
+        Args:
+            lineno (int): The current 0-based line number.
+
+        Returns:
+            int: The 0-based original line number.
+
+        Raises:
+            LookupError: If ``lineno`` is out of range.
+        """
+
+        if not 0 <= lineno < self._count:
+            raise LookupError(f"Requested {lineno=} out of range!")
+
+        position = 0
+        remaining = lineno + 1
+        step = 1 << self.size.bit_length()
+
+        while step:
+
+            candidate = position + step
+
+            if candidate <= self.size and self._tree[candidate] < remaining:
+                position = candidate
+                remaining -= self._tree[candidate]
+
+            step >>= 1
+
+        return position
+
+    def remove(self, line: int) -> None:
+        """Marks the original ``line`` as removed."""
+
+        if self.present[line]:
+            self.present[line] = 0
+            self._update(line, -1)
+
+    def restore(self, line: int) -> None:
+        """Marks the original ``line`` as present."""
+
+        if not self.present[line]:
+            self.present[line] = 1
+            self._update(line, 1)
+
+
+class _LineNumber:
+    """
+    Data descriptor of the ``Codeline.lineno`` attribute.
+
+    A ``Codeline`` constructed by the user stores its line number as-is. A ``Codeline`` managed by an
+    ``AssemblyHandler`` stores its original line number and a reference to the ``LineIndex`` of the handler, from
+    which its current line number is computed upon access.
+    """
+
+    def __get__(self, codeline: 'Codeline', owner: type = None) -> int:
+
+        if codeline is None:
+            raise AttributeError("lineno")  # No default value for the dataclass field
+
+        index = codeline.__dict__.get("_index")
+
+        if index is None:
+            return codeline.__dict__["_lineno"]
+
+        return index.rank(codeline.__dict__["_lineno"])
+
+    def __set__(self, codeline: 'Codeline', value: int) -> None:
+
+        if codeline.__dict__.get("_index") is not None:
+            raise AttributeError("The lineno of a Codeline managed by an AssemblyHandler is read-only")
+
+        codeline.__dict__["_lineno"] = value
+
+
 @dataclass
 class Codeline:
     """Represents a line of assembly code"""
 
-    lineno: int
+    lineno: int = _LineNumber()
     data: str
     valid_insn: bool
 
@@ -165,11 +298,58 @@ class ISA(metaclass=Singleton):
         return potential_instruction in self.mnemonics
 
 
+class AssemblyTransaction:
+    """
+    Batch of edits on the assembly file of an ``AssemblyHandler``. To be used as:
+
+    .. code-block:: python
+
+        with handler.edit() as tx:
+            tx.remove(codeline_a, codeline_b, codeline_c)
+
+    The edits are queued and, upon exiting the ``with`` block, they are applied in order with a **single** rewrite of
+    the assembly file. If an exception is raised within the block, the queued edits are discarded.
+    """
+
+    def __init__(self, handler: 'AssemblyHandler') -> 'AssemblyTransaction':
+
+        self.handler: AssemblyHandler = handler
+        self.edits: list[tuple[str, Codeline | None]] = list()
+
+    def remove(self, *codelines: Codeline) -> None:
+        """
+        Queues the removal of ``codelines`` from the assembly file. Codelines which are already removed when the
+        removal is applied are skipped.
+
+        Args:
+            codelines (Codeline): A variadic number of ``Codeline`` objects to be removed.
+
+        Returns:
+            None
+        """
+
+        self.edits.extend(("remove", codeline) for codeline in codelines)
+
+    def restore(self, count: int = 1) -> None:
+        """
+        Queues the restoration of the ``count`` most recent entries of the changelog.
+
+        Args:
+            count (int, optional): The number of changelog entries to restore. Defaults to 1.
+
+        Returns:
+            None
+        """
+
+        self.edits.extend(("restore", None) for _ in range(count))
+
+
 class AssemblyHandler():
     """
     Manages **one** assembly file.
 
-    It operates on the file by removing/restoring lines of code.
+    It operates on the file by removing/restoring lines of code. The line numbers of the candidates are kept in a
+    ``LineIndex`` hence removals and restorations do not have to shift the ``lineno`` of every candidate.
     """
 
     def __init__(self, isa: ISA, assembly_source: pathlib.Path, chunksize: int = 1) -> 'AssemblyHandler':
@@ -183,6 +363,7 @@ class AssemblyHandler():
 
         try:
             code = list()
+            lines = 0
             with open(assembly_source) as asm_file:
 
                 log.debug(f"Reading from file {assembly_source}")
@@ -190,6 +371,8 @@ class AssemblyHandler():
                 # 0-based indexing for lineno!
                 for lineno, line in enumerate(asm_file, start=0):
 
+                    lines += 1
+
                     # We are currently not interested in the contents
                     # of each line of code. We just want to   extract
                     # the codeline as-is and remove any \s whitespace
@@ -208,11 +391,90 @@ class AssemblyHandler():
             log.fatal(f"Assembly source file {assembly_source} not found! Exiting...")
             exit(1)
 
+        self.index: LineIndex = LineIndex(lines)
+
         self.candidates = [codeline for codeline in code if
                            codeline.valid_insn]
+
+        # Candidates keyed by their original line number.
+        # Insertion order is the order of the file lines.
+        self._lines: dict[int, Codeline] = dict()
+        for codeline in self.candidates:
+            self._lines[codeline.lineno] = codeline
+            self._manage(codeline, codeline.lineno)
+
         self.candidates = [self.candidates[i:i + chunksize]
                            for i in range(0, len(self.candidates), chunksize)]
 
+        self._code: list[Codeline] | None = None
+        self._empty_chunks: int = 0
+
+    def _manage(self, codeline: Codeline, line: int) -> None:
+        """
+        Attaches ``codeline`` to the ``LineIndex`` of the handler.
+
+        Args:
+            codeline (Codeline): The ``Codeline`` to be managed by the handler.
+            line (int): The original line number of ``codeline``.
+        """
+
+        codeline.__dict__["_lineno"] = line
+        codeline.__dict__["_index"] = self.index
+
+    def _original_line(self, codeline: Codeline) -> int:
+        """
+        Returns the original line number of ``codeline``. A ``Codeline`` not managed by the handler is resolved
+        through its current line number and is managed from then on.
+
+        Args:
+            codeline (Codeline): A line of the assembly file.
+
+        Returns:
+            int: The 0-based original line number of ``codeline``.
+        """
+
+        if codeline.__dict__.get("_index") is not self.index:
+            self._manage(codeline, self.index.select(codeline.lineno))
+
+        return codeline.__dict__["_lineno"]
+
+    def get_original_lineno(self, codeline: Codeline) -> int:
+        """
+        Returns the line number ``codeline`` has in the original assembly file, regardless of any removals.
+
+        Args:
+            codeline (Codeline): A line of the assembly file.
+
+        Returns:
+            int: The 0-based original line number of ``codeline``.
+        """
+
+        return self._original_line(codeline)
+
+    def snapshot(self) -> bytes:
+        """
+        Captures which lines of the original assembly file are currently present, e.g., when the STL is compiled.
+
+        Returns:
+            bytes: The snapshot to be passed to ``get_lineno_at()``.
+        """
+
+        return bytes(self.index.present)
+
+    def get_lineno_at(self, codeline: Codeline, snapshot: bytes) -> int:
+        """
+        Returns the line number ``codeline`` had (or would have had if it was removed) when ``snapshot`` was taken.
+
+        Args:
+            codeline (Codeline): A line of the assembly file.
+            snapshot (bytes): A snapshot as returned by ``snapshot()``.
+
+        Returns:
+            int: The 0-based line number of ``codeline`` at the time of the snapshot.
+        """
+
+        return snapshot.count(1, 0, self._original_line(codeline))
+
     def get_asm_source(self) -> pathlib.Path:
         """
         Returns the assembly source file ``pathlib.Path``.
@@ -225,13 +487,16 @@ class AssemblyHandler():
 
     def get_code(self) -> list[Codeline]:
         """
-        Returns the parsed code as a list of ``Codelines``.
+        Returns the parsed code as a list of ``Codelines``. The list is cached until a candidate is popped.
 
         Returns:
             list: A list of ``Codeline`` entries.
         """
 
-        return [codeline for chunk in self.candidates for codeline in chunk]
+        if self._code is None:
+            self._code = [codeline for chunk in self.candidates for codeline in chunk]
+
+        return self._code
 
     def get_code_chunks(self) -> list[list[Codeline]]:
         """
@@ -241,6 +506,8 @@ class AssemblyHandler():
             list[list[Codeline]]: A list of chunks.
         """
 
+        self._compact_chunks()
+
         return self.candidates
 
     def get_candidate(self, lineno: int) -> Codeline:
@@ -257,21 +524,27 @@ class AssemblyHandler():
             LookUpError: If the requested Codeline does not exist
         """
 
-        for chunk in self.candidates:
-
-            for codeline in chunk:
+        try:
+            return self._lines[self.index.select(lineno)]
 
-                if codeline.lineno == lineno:
+        except LookupError:
+            raise LookupError(f"Requested Codeline with {lineno=} not found!")
 
-                    return codeline
+    def _compact_chunks(self) -> None:
+        """Drops the chunks emptied by ``get_random_candidate`` while preserving the order of the rest."""
 
-        raise LookupError(f"Requested Codeline with {lineno=} not found!")
+        if self._empty_chunks:
+            self.candidates[:] = [chunk for chunk in self.candidates if chunk]
+            self._empty_chunks = 0
 
     def get_random_candidate(self, pop_candidate: bool = True) -> Codeline:
         """
         In a uniform random manner selects one ``Codeline`` and returns it while also optionally removing it from
         the ``candidate`` collection.
 
+        Emptied chunks are dropped lazily, once they make up half of the chunks, so that popping does not shift the
+        whole ``candidates`` list every time.
+
         Args:
             pop_candidate (bool): When True, deletes the ``Codeline`` from the collection after identifying it.
 
@@ -279,17 +552,25 @@ class AssemblyHandler():
             Codeline: A random ``Codeline`` from a random ``self.candidates`` chunk.
         """
 
+        if 2 * self._empty_chunks >= len(self.candidates):
+            self._compact_chunks()
+
         random_chunk = random.randint(0, len(self.candidates) - 1)
+        while not self.candidates[random_chunk]:
+            random_chunk = random.randint(0, len(self.candidates) - 1)
+
         random_codeline = random.randint(0, len(self.candidates[random_chunk]) - 1)
 
         # Check if it's the last codeline of the chunk
-        # and delete the chunk after popping it.
+        # and mark the chunk as empty after popping it.
         if pop_candidate:
 
             codeline = self.candidates[random_chunk].pop(random_codeline)
+            self._lines.pop(codeline.__dict__["_lineno"], None)
+            self._code = None
 
             if not self.candidates[random_chunk]:
-                del self.candidates[random_chunk]
+                self._empty_chunks += 1
 
         else:
 
@@ -298,107 +579,161 @@ class AssemblyHandler():
         log.debug(f"Randomly selected {codeline=}")
         return codeline
 
-    def remove(self, codeline: Codeline) -> None:
+    @contextlib.contextmanager
+    def edit(self) -> AssemblyTransaction:
         """
-        Removes the codeline from the assembly file.
+        Opens a transaction to remove and/or restore multiple lines of code with a single rewrite of the assembly file.
 
-        Creates a new assembly file by using the current ``self.asm_code`` as a source and skips the the line which
-        corresponds to ``codeline``'s ``lineno`` attribute. The ``self.candidates`` lineno fields are updated (-1)
-        if >= than the entry which is being restored.
+        Yields:
+            AssemblyTransaction: The transaction on which the edits are queued.
+        """
+
+        transaction = AssemblyTransaction(self)
+
+        yield transaction
+
+        self._commit(transaction)
+
+    def _commit(self, transaction: AssemblyTransaction) -> None:
+        """
+        Applies the edits of a transaction.
+
+        The edits are first replayed on the changelog to find out which lines end up removed from the file and which
+        end up restored to it. Removals of lines which are already removed at that point are skipped. The removed
+        lines are located (current ``lineno``) before the ``LineIndex`` is updated and the restored lines after it.
+        Then, the assembly file is rewritten in a single pass.
 
         Args:
-            codeline (Codeline): The ``Codeline`` to be removed from the assembly file.
+            transaction (AssemblyTransaction): The transaction to be applied.
 
         Returns:
             None
         """
 
-        with open(self.asm_file) as source, tempfile.NamedTemporaryFile('w', delete=False) as new_source:
+        index = self.index
+
+        # Presence of the touched lines. Initially as in
+        # the current file and then replayed edit by edit
+        initially_present: dict[int, bool] = dict()
+        present: dict[int, bool] = dict()
+        restored: dict[int, Codeline] = dict()
 
-            for lineno, line in enumerate(source, start=0):
+        for action, codeline in transaction.edits:
 
-                if codeline == lineno:
+            if action == "remove":
 
-                    log.debug(f"Removing line #{lineno} = {codeline.data}")
+                line = self._original_line(codeline)
 
+                if not present.get(line, index.present[line]):
+                    log.debug(f"Line #{codeline.lineno} = {codeline.data} already removed, nothing to remove")
                     continue
 
-                new_source.write(f"{line}")
+                log.debug(f"Removing line #{codeline.lineno} = {codeline.data}")
+                self.asm_file_changelog.append(codeline)
 
-            new_source.flush()
-            new_file = pathlib.Path(new_source.name)
-            shutil.move(new_file, self.asm_file)
+            else:
 
-        # Update the lineno attribute of every codeline
-        # that is below the just removed codeline.
-        for chunk in self.candidates:
+                if not self.asm_file_changelog:
+                    log.debug(f"{self.asm_file_changelog=}  empty, nothing to restore")
+                    continue
 
-            for chunk_codeline in chunk:
+                codeline = self.asm_file_changelog.pop()
+                line = self._original_line(codeline)
 
-                if chunk_codeline > codeline.lineno:
+                log.debug(f"Restoring {codeline}")
+                restored[line] = codeline
 
-                    chunk_codeline -= 1
+            initially_present.setdefault(line, bool(index.present[line]))
+            present[line] = action != "remove"
 
-        # Updating changelog to keep track of the edits to the asm file
-        self.asm_file_changelog.append(codeline)
-        log.debug(f"Changelog entries are now {self.asm_file_changelog}")
+        removed_linenos = {index.rank(line) for line, is_present in present.items()
+                           if initially_present[line] and not is_present}
 
-    def restore(self) -> None:
-        """
-        Re-enters the last ``Codeline`` from the changelog to the assembly file.
+        # The candidates below the edited lines get their
+        # lineno shifted by -1 (removal) or +1 (restoration)
+        for line, is_present in present.items():
 
-        The ``self.candidates`` lineno fields are updated (+1) if >= than the entry which is being restored.
+            if is_present:
+                index.restore(line)
+            else:
+                index.remove(line)
 
-        Returns:
-            None
-        """
+        restored_lines = {index.rank(line): restored[line].data for line, is_present in present.items()
+                          if not initially_present[line] and is_present}
 
-        if not self.asm_file_changelog:
-            log.debug(f"{self.asm_file_changelog=}  empty, nothing to restore")
+        log.debug(f"Changelog entries are now {self.asm_file_changelog}")
+
+        if not (removed_linenos or restored_lines):
             return
 
-        codeline_to_be_restored: Codeline = self.asm_file_changelog.pop()
-        log.debug(f"Restoring {codeline_to_be_restored}")
+        # The new file is swapped in by a rename, which never writes to the inode of the old file. Hence, a file
+        # hardlinked to other build trees (see ``BuildSandbox``) is left intact
+        new_source = tempfile.NamedTemporaryFile('w', dir=self.asm_file.parent, prefix=f".{self.asm_file.name}.",
+                                                 delete=False)
+        new_file = pathlib.Path(new_source.name)
 
-        # The candidates that have a lineno >= to the line
-        # to be restored must get a +1 to their lineno at-
-        # ribute in order to be aligned with the  original
-        # assembly source file line numbers.
-        for chunk in self.candidates:
+        try:
 
-            for chunk_codeline in chunk:
+            with open(self.asm_file) as source, new_source:
 
-                # If codeline is not removed from the self.candidates
-                # then be careful not to modify it. Skip it as it 'll
-                # not affect the rest of the code. Otherwise    there
-                # will be an off-by-one error on the insertion point.
-                if chunk_codeline is codeline_to_be_restored:
+                new_lineno = 0
+                for lineno, line in enumerate(source, start=0):
 
-                    continue
+                    if lineno in removed_linenos:
+                        continue
+
+                    while new_lineno in restored_lines:
+                        new_source.write(f"{restored_lines.pop(new_lineno)}\n")
+                        new_lineno += 1
+
+                    new_source.write(line)
+                    new_lineno += 1
+
+                # The very last lines
+                for new_lineno in sorted(restored_lines):
+                    new_source.write(f"{restored_lines[new_lineno]}\n")
+
+            # Temporary files are private to the user
+            os.chmod(new_file, stat.S_IMODE(os.stat(self.asm_file).st_mode) if self.asm_file.exists() else 0o644)
+            os.replace(new_file, self.asm_file)
+
+        except BaseException:
 
-                if chunk_codeline >= codeline_to_be_restored:
+            new_source.close()
+            new_file.unlink(missing_ok=True)
+            raise
 
-                    chunk_codeline += 1
+    def remove(self, codeline: Codeline) -> None:
+        """
+        Removes the codeline from the assembly file.
+
+        Creates a new assembly file by using the current ``self.asm_code`` as a source and skips the the line which
+        corresponds to ``codeline``'s ``lineno`` attribute. The line is then marked as removed in the ``LineIndex``
+        which implicitly reduces (-1) the ``lineno`` of all candidates below it.
 
-        with open(self.asm_file) as source, tempfile.NamedTemporaryFile('w', delete=False) as new_source:
+        Args:
+            codeline (Codeline): The ``Codeline`` to be removed from the assembly file.
 
-            line_restored = False
-            for lineno, line in enumerate(source, start=0):
+        Returns:
+            None
+        """
 
-                if codeline_to_be_restored == lineno:
-                    new_source.write(f"{codeline_to_be_restored.data}\n")
-                    line_restored = True
+        with self.edit() as transaction:
+            transaction.remove(codeline)
 
-                new_source.write(line)
+    def restore(self) -> None:
+        """
+        Re-enters the last ``Codeline`` from the changelog to the assembly file.
 
-            if not line_restored:  # its the very last line
-                new_source.write(f"{codeline_to_be_restored.data}\n")
+        The line is marked as present in the ``LineIndex`` which implicitly increases (+1) the ``lineno`` of all
+        candidates below it.
 
-            log.debug(f"Changelog entries are now {self.asm_file_changelog}")
+        Returns:
+            None
+        """
 
-            new_source.flush()
-            new_file = pathlib.Path(new_source.name)
-            shutil.move(new_file, self.asm_file)
+        with self.edit() as transaction:
+            transaction.restore()
 
     def save(self) -> str | None:
         """
@@ -0,0 +1,825 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+import collections
+import dataclasses
+import fnmatch
+import hashlib
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+import types
+
+from testcrush.utils import get_logger, compile_assembly, Command
+from typing import Any
+
+log = get_logger()
+
+
+class IncrementalCompiler:
+    """
+    Incremental cross-compilation of the assembly sources of an STL.
+
+    Each assembly source is assembled to its own object file with a user-defined command and the objects are then
+    linked with user-defined instructions. Objects are cached by the content hash of their source, hence only the
+    source that has been modified since the previous build is re-assembled. A source whose content returns to a
+    previously seen state (e.g., after a restoration) is served from the cache.
+
+    Commands may use the following placeholders:
+
+    - ``%source%``: The assembly source (assemble command).
+    - ``%object%``: The object file to be generated (assemble command).
+    - ``%objects%``: The space-separated object files to be linked (link instructions).
+    """
+
+    def __init__(self, sources: list[pathlib.Path], assemble: str, link: list[str],
+                 objects: list[str] | None = None, cache_dir: pathlib.Path = pathlib.Path(".testcrush_objects"),
+                 cache_size: int = 128) -> 'IncrementalCompiler':
+
+        self.sources: list[pathlib.Path] = [pathlib.Path(source).resolve() for source in sources]
+        self.assemble: str = assemble
+        self.link: list[str] = list(link)
+        self.extra_objects: list[str] = list(objects) if objects else list()
+
+        self.cache_dir: pathlib.Path = pathlib.Path(cache_dir).resolve()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_size: int = cache_size
+
+        # Least recently used objects come first
+        self._cache: collections.OrderedDict[str, pathlib.Path] = collections.OrderedDict()
+
+        # Current object and file signature (inode, mtime, size) per source
+        self._objects: dict[pathlib.Path, pathlib.Path] = dict()
+        self._signatures: dict[pathlib.Path, tuple[int, int, int]] = dict()
+
+    @classmethod
+    def from_settings(cls, sources: list[pathlib.Path], settings: dict) -> 'IncrementalCompiler':
+        """
+        Constructs the compiler from the ``[cross_compilation.incremental]`` TOML settings.
+
+        Args:
+            sources (list[pathlib.Path]): The assembly sources of the STL.
+            settings (dict): The incremental compilation settings.
+
+        Returns:
+            IncrementalCompiler: The compiler.
+        """
+
+        return cls(sources, settings["assemble"], settings["link"],
+                   objects=settings.get("objects"),
+                   cache_dir=pathlib.Path(settings.get("cache_dir", ".testcrush_objects")),
+                   cache_size=settings.get("cache_size", 128))
+
+    @staticmethod
+    def _signature(source: pathlib.Path) -> tuple[int, int, int]:
+
+        stat = os.stat(source)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _digest(self, source: pathlib.Path) -> str:
+        """
+        Computes the cache key of a source. The key covers the source path and the assemble command since both end up
+        in the object file (e.g., in the DWARF line table).
+        """
+
+        digest = hashlib.sha256()
+        digest.update(str(source).encode())
+        digest.update(self.assemble.encode())
+
+        with open(source, 'rb') as src:
+            digest.update(src.read())
+
+        return digest.hexdigest()
+
+    def _evict(self) -> None:
+        """Deletes the least recently used objects which exceed the cache size and are not currently linked."""
+
+        in_use = set(self._objects.values())
+
+        for digest in list(self._cache.keys()):
+
+            if len(self._cache) <= self.cache_size:
+                break
+
+            if self._cache[digest] in in_use:
+                continue
+
+            log.debug(f"Evicting {self._cache[digest]} from the object cache")
+            self._cache.pop(digest).unlink(missing_ok=True)
+
+    def _assemble(self, source: pathlib.Path) -> pathlib.Path | None:
+        """
+        Provides the object file of ``source``, either from the cache or by assembling it.
+
+        Args:
+            source (pathlib.Path): The assembly source.
+
+        Returns:
+            pathlib.Path | None: The object file or ``None`` if the assembly failed.
+        """
+
+        signature = self._signature(source)
+        digest = self._digest(source)
+        object_file = self.cache_dir / f"{source.stem}-{digest[:16]}.o"
+
+        if digest in self._cache or object_file.exists():
+
+            log.debug(f"Object cache hit for {source.name}: {object_file.name}")
+
+        else:
+
+            # Assemble to a temporary file first so that a failure
+            # never leaves a half-written object in the cache.
+            temporary = object_file.with_suffix(".tmp")
+            instruction = self.assemble.replace("%source%", str(source)).replace("%object%", str(temporary))
+
+            if not compile_assembly(instruction):
+                temporary.unlink(missing_ok=True)
+                return None
+
+            temporary.replace(object_file)
+
+        self._cache[digest] = object_file
+        self._cache.move_to_end(digest)
+
+        self._objects[source] = object_file
+        self._signatures[source] = signature
+
+        return object_file
+
+    def compile(self, *changed: pathlib.Path, exit_on_error: bool = False) -> bool:
+        """
+        Brings the object files up to date and links them.
+
+        The sources in ``changed`` are always re-hashed. Any other source is re-hashed only if its file signature
+        (inode, modification time and size) differs from the one of the last build, which covers e.g., restorations
+        that happened after the last build.
+
+        Args:
+            changed (pathlib.Path): A variadic number of assembly sources known to be modified since the last build.
+            exit_on_error (bool): If an error is encountered during compilation and this is True, then the program
+                                  terminates. Otherwise it continues.
+
+        Returns:
+            bool: True if all sources were assembled and linked successfully. False otherwise.
+
+        Raises:
+            SystemExit: if the compilation fails and ``exit_on_error`` is True.
+        """
+
+        changed = {pathlib.Path(source).resolve() for source in changed}
+
+        for source in self.sources:
+
+            if source not in changed and source in self._objects and \
+                    self._signatures[source] == self._signature(source):
+                continue
+
+            if self._assemble(source) is None:
+
+                log.debug(f"Unable to assemble {source}")
+
+                if exit_on_error:
+                    log.critical("Unrecoverable Error during compilation of assembly files. Exiting...")
+                    exit(1)
+
+                return False
+
+        self._evict()
+
+        objects = ' '.join([str(self._objects[source]) for source in self.sources] + self.extra_objects)
+
+        return compile_assembly(*[instruction.replace("%objects%", objects) for instruction in self.link],
+                                exit_on_error=exit_on_error)
+
+
+class BuildSandbox:
+    """
+    Isolated, per-worker clone of a build tree (e.g., the ``%sbst_dir%`` of the STL).
+
+    The cross-compilation instructions of the STL build in place, which makes concurrent evaluations of candidate STLs
+    impossible. A sandbox clones the build tree into a scratch directory and rewrites any instruction or setting that
+    refers to the build tree so that it points to the clone instead. Files are cloned as cheaply as the filesystem
+    allows:
+
+    - Reflinks (copy-on-write clones) are used when supported by the filesystem.
+    - Hardlinks are used for the files matching ``hardlink_patterns``. These must be files which the build never
+      modifies in place, such as sources (the ``AssemblyHandler`` swaps in a new file by a rename on every edit).
+    - Any other file is copied.
+
+    Sandboxes only hold paths and are hence picklable i.e., they can be handed to the workers of a process pool.
+    """
+
+    HARDLINK_PATTERNS = ("*.S", "*.s", "*.asm", "*.c", "*.h", "*.inc", "*.ld", "*.lds", "Makefile", "*.mk")
+
+    # ioctl(2) request code of FICLONE (Linux)
+    _FICLONE = 0x40049409
+
+    def __init__(self, build_dir: pathlib.Path, scratch_dir: pathlib.Path | None = None, name: str = "worker",
+                 hardlink_patterns: tuple[str] = HARDLINK_PATTERNS,
+                 ignore_patterns: tuple[str] = (".git", ".testcrush_objects")) -> 'BuildSandbox':
+
+        self.build_dir: pathlib.Path = pathlib.Path(build_dir)
+        self.scratch_dir: pathlib.Path | None = pathlib.Path(scratch_dir) if scratch_dir else None
+        self.name: str = name
+        self.hardlink_patterns: tuple[str] = hardlink_patterns
+        self.ignore_patterns: tuple[str] = ignore_patterns
+
+        self.root: pathlib.Path | None = None
+        self._scratch: pathlib.Path | None = None
+
+    def __enter__(self) -> 'BuildSandbox':
+
+        self.create()
+        return self
+
+    def __exit__(self, *args) -> None:
+
+        self.destroy()
+
+    @classmethod
+    def _reflink(cls, source: pathlib.Path, destination: pathlib.Path) -> bool:
+
+        try:
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), cls._FICLONE, src.fileno())
+
+        except OSError:
+
+            destination.unlink(missing_ok=True)
+            return False
+
+        shutil.copystat(source, destination)
+        return True
+
+    def _clone_file(self, source: str, destination: str) -> str:
+        """``copy_function`` of ``shutil.copytree``."""
+
+        source, destination = pathlib.Path(source), pathlib.Path(destination)
+
+        if self._reflink(source, destination):
+            return str(destination)
+
+        if any(fnmatch.fnmatch(source.name, pattern) for pattern in self.hardlink_patterns):
+
+            try:
+                os.link(source, destination)
+                return str(destination)
+            except OSError:
+                pass
+
+        return shutil.copy2(source, destination)
+
+    def create(self) -> pathlib.Path:
+        """
+        Clones the build tree into a new scratch directory.
+
+        Returns:
+            pathlib.Path: The root of the sandbox i.e., the clone of the build tree.
+        """
+
+        if self.root:
+            raise RuntimeError(f"Sandbox {self.name} already exists at {self.root}")
+
+        self._scratch = pathlib.Path(tempfile.mkdtemp(prefix=f"testcrush_{self.name}_", dir=self.scratch_dir))
+        self.root = self._scratch / self.build_dir.resolve().name
+
+        shutil.copytree(self.build_dir, self.root, symlinks=True, copy_function=self._clone_file,
+                        ignore=shutil.ignore_patterns(*self.ignore_patterns))
+
+        log.debug(f"Sandbox {self.name} of {self.build_dir} created at {self.root}")
+        return self.root
+
+    def destroy(self) -> None:
+        """Deletes the sandbox."""
+
+        if not self.root:
+            return
+
+        shutil.rmtree(self._scratch, ignore_errors=True)
+        log.debug(f"Sandbox {self.name} at {self.root} deleted")
+        self.root = None
+
+    def path(self, path: pathlib.Path | str) -> pathlib.Path:
+        """
+        Maps a path of the build tree to the corresponding path of the sandbox.
+
+        Args:
+            path (pathlib.Path | str): A path within the build tree.
+
+        Returns:
+            pathlib.Path: The path within the sandbox.
+
+        Raises:
+            ValueError: if ``path`` is not within the build tree.
+        """
+
+        if not self.root:
+            raise RuntimeError(f"Sandbox {self.name} has not been created")
+
+        return self.root / pathlib.Path(path).resolve().relative_to(self.build_dir.resolve())
+
+    def rewrite(self, item: Any) -> Any:
+        """
+        Recursively replaces any reference to the build tree within a string or strings within lists and dicts, e.g.,
+        the cross-compilation instructions, with the sandbox. Both the build tree path as given to the sandbox (which
+        is what ``%sbst_dir%`` expands to) and its resolved absolute form are replaced.
+
+        Args:
+            item (Any): A string, list, tuple, dict, read-only mapping or settings dataclass to act upon.
+
+        Returns:
+            Any: The ``item`` where all references to the build tree point to the sandbox.
+        """
+
+        if not self.root:
+            raise RuntimeError(f"Sandbox {self.name} has not been created")
+
+        if isinstance(item, Command):
+            return Command(self.rewrite(str(item)), argv=self.rewrite(item.argv), cwd=self.rewrite(item.cwd),
+                           env=self.rewrite(item.env))
+
+        elif isinstance(item, str):
+
+            forms = sorted({str(self.build_dir), str(self.build_dir.resolve())}, key=len, reverse=True)
+            pattern = re.compile('|'.join(f"(?<![\\w.-]){re.escape(form)}(?![\\w.-])" for form in forms))
+
+            return pattern.sub(lambda _: str(self.root), item)
+
+        elif isinstance(item, (list, tuple)):
+            return type(item)(self.rewrite(sub_item) for sub_item in item)
+
+        elif isinstance(item, dict):
+            return {k: self.rewrite(v) for k, v in item.items()}
+
+        elif isinstance(item, types.MappingProxyType):
+            return types.MappingProxyType({k: self.rewrite(v) for k, v in item.items()})
+
+        elif dataclasses.is_dataclass(item) and not isinstance(item, type):
+            return dataclasses.replace(item, **{field.name: self.rewrite(getattr(item, field.name))
+                                                for field in dataclasses.fields(item) if field.init})
+
+        else:
+            return item
+
+    def compile(self, *instructions: str, exit_on_error: bool = False) -> bool:
+        """
+        Executes the cross-compilation instructions within the sandbox.
+
+        Args:
+            instructions (str): A sequence of bash commands referring to the build tree.
+            exit_on_error (bool): If an error is encountered during compilation and this is True, then the program
+                                  terminates. Otherwise it continues.
+
+        Returns:
+            bool: True if the compilation succeeded. False otherwise.
+        """
+
+        return compile_assembly(*self.rewrite(list(instructions)), exit_on_error=exit_on_error)
+
+
+class ElfPatcher:
+    """
+    Patches the assembled ELF of the STL in place, replacing the instructions of an assembly line with ``nop``
+    instructions of the same total width. This allows the evaluation of a single-instruction removal without invoking
+    the cross-compiler.
+
+    Assembly lines are mapped to their address ranges through the DWARF line table of the ELF (i.e., the sources must
+    be assembled with debug information, e.g., ``-g``). A line cannot be patched if it is absent from the line table,
+    if any of its address ranges lies outside of an executable section, or if the width of a range cannot be filled by
+    the available ``nop`` encodings. The caller is expected to fall back to a source edit and a rebuild in that case.
+
+    The ``post_patch`` instructions (e.g., an ``objcopy`` to the memory image read by the testbench) are executed after
+    each patch and restoration.
+    """
+
+    # Width (bytes) -> nop encoding, per machine
+    NOPS = {
+        "EM_RISCV": {4: 0x00000013, 2: 0x0001},  # addi x0, x0, 0 | c.nop
+        "EM_X86_64": {1: 0x90},
+        "EM_386": {1: 0x90},
+    }
+
+    def __init__(self, elf_file: pathlib.Path, nops: dict[int, int] | None = None,
+                 post_patch: list[str] | None = None) -> 'ElfPatcher':
+
+        self.elf_file: pathlib.Path = pathlib.Path(elf_file)
+        self.user_nops: dict[int, int] | None = nops
+        self.post_patch: list[str] = list(post_patch) if post_patch else list()
+
+        self.nops: dict[int, bytes] = dict()
+
+        # (resolved source path, 1-based line) -> address ranges
+        self._lines: dict[tuple[pathlib.Path, int], list[tuple[int, int]]] = dict()
+
+        # Source file name -> resolved source paths with that name
+        self._sources: dict[str, set[pathlib.Path]] = dict()
+
+        # Executable sections as (start address, end address, file offset)
+        self._sections: list[tuple[int, int, int]] = list()
+
+        # Stack of patches. Each patch is a list of (file offset, original bytes)
+        self._patches: list[list[tuple[int, bytes]]] = list()
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> 'ElfPatcher':
+        """
+        Constructs the patcher from the ``[cross_compilation.elf_patching]`` TOML settings.
+
+        Args:
+            settings (dict): The ELF patching settings.
+
+        Returns:
+            ElfPatcher: The patcher.
+        """
+
+        nops = settings.get("nops")
+        if nops:
+            nops = {int(width): int(str(encoding), 16) for width, encoding in nops.items()}
+
+        return cls(pathlib.Path(settings["elf_file"]), nops=nops, post_patch=settings.get("post_patch"))
+
+    def load(self) -> None:
+        """
+        Parses the executable sections and the DWARF line table of the ELF. Must be invoked every time the ELF is
+        rebuilt. Any previous patches are forgotten.
+
+        Raises:
+            ValueError: If the ELF has no DWARF information or no ``nop`` encodings are known for its machine.
+        """
+
+        from elftools.elf.elffile import ELFFile
+        from elftools.elf.constants import SH_FLAGS
+
+        self._lines.clear()
+        self._sources.clear()
+        self._sections.clear()
+        self._patches.clear()
+
+        with open(self.elf_file, 'rb') as f:
+
+            elf = ELFFile(f)
+
+            machine = elf["e_machine"]
+            nops = self.user_nops if self.user_nops else self.NOPS.get(machine)
+            if not nops:
+                raise ValueError(f"No nop encodings known for {machine}")
+
+            byteorder = "little" if elf.little_endian else "big"
+            self.nops = {width: encoding.to_bytes(width, byteorder) for width, encoding in nops.items()}
+
+            for section in elf.iter_sections():
+
+                if section["sh_flags"] & SH_FLAGS.SHF_EXECINSTR and section["sh_type"] != "SHT_NOBITS":
+                    self._sections.append((section["sh_addr"], section["sh_addr"] + section["sh_size"],
+                                           section["sh_offset"]))
+
+            if not elf.has_dwarf_info():
+                raise ValueError(f"No DWARF info found in {self.elf_file}")
+
+            dwarf_info = elf.get_dwarf_info()
+
+            for CU in dwarf_info.iter_CUs():
+
+                line_program = dwarf_info.line_program_for_CU(CU)
+
+                if not line_program:
+                    continue
+
+                # File and directory indices are 1-based up to DWARF v4, where directory 0 is the compilation dir
+                base = 1 if line_program.header.version < 5 else 0
+                file_entries = line_program["file_entry"]
+                directories = [directory.name if hasattr(directory, "name") else directory
+                               for directory in line_program["include_directory"]]
+
+                comp_dir = CU.get_top_DIE().attributes.get("DW_AT_comp_dir")
+                comp_dir = pathlib.Path(comp_dir.value.decode('utf-8')) if comp_dir else pathlib.Path.cwd()
+
+                paths = dict()
+
+                # Each row spans up to the address of the next row of its sequence
+                previous = None
+                for entry in line_program.get_entries():
+
+                    state = entry.state
+
+                    if state is None:
+                        continue
+
+                    if previous and state.address > previous.address:
+
+                        if previous.file not in paths:
+                            paths[previous.file] = self._source_path(file_entries[previous.file - base], directories,
+                                                                     base, comp_dir)
+
+                        ranges = self._lines.setdefault((paths[previous.file], previous.line), list())
+                        ranges.append((previous.address, state.address))
+
+                    previous = None if state.end_sequence else state
+
+                for path in paths.values():
+                    self._sources.setdefault(path.name, set()).add(path)
+
+        log.debug(f"Loaded {len(self._lines)} lines from the DWARF line table of {self.elf_file}")
+
+    @staticmethod
+    def _source_path(file_entry, directories: list[bytes], base: int, comp_dir: pathlib.Path) -> pathlib.Path:
+        """Returns the resolved path of a file entry of a DWARF line program."""
+
+        path = pathlib.Path(file_entry.name.decode('utf-8'))
+
+        if not path.is_absolute() and file_entry.dir_index >= base:
+            path = pathlib.Path(directories[file_entry.dir_index - base].decode('utf-8')) / path
+
+        return (comp_dir / path).resolve()
+
+    def locate(self, source: pathlib.Path, line: int) -> list[tuple[int, int]]:
+        """
+        Returns the address ranges of an assembly line.
+
+        The source is matched against the full paths of the DWARF line table. If the path is not found (e.g., the ELF
+        was built elsewhere or with remapped debug paths) the source is matched by its file name, as long as no other
+        source of the ELF has the same name.
+
+        Args:
+            source (pathlib.Path): The assembly source.
+            line (int): The 1-based line number within ``source``, as in the DWARF line table.
+
+        Returns:
+            list[tuple[int, int]]: The [start, end) address ranges. Empty if the line is not in the line table or if
+            the source cannot be told apart from other sources of the same name.
+        """
+
+        path = pathlib.Path(source).resolve()
+
+        if path not in self._sources.get(path.name, set()):
+
+            candidates = self._sources.get(path.name, set())
+
+            if len(candidates) != 1:
+
+                if candidates:
+                    log.debug(f"{source} is ambiguous among {', '.join(sorted(map(str, candidates)))}")
+
+                return list()
+
+            path, = candidates
+
+        return self._lines.get((path, line), list())
+
+    def _offset(self, start: int, end: int) -> int | None:
+
+        for section_start, section_end, offset in self._sections:
+
+            if section_start <= start and end <= section_end:
+                return offset + start - section_start
+
+        return None
+
+    def _fill(self, width: int) -> bytes | None:
+        """Returns a sequence of nops of exactly ``width`` bytes, widest nops first."""
+
+        padding = b''
+
+        for nop_width in sorted(self.nops, reverse=True):
+            count, width = divmod(width, nop_width)
+            padding += self.nops[nop_width] * count
+
+        return None if width else padding
+
+    def _write(self, edits: list[tuple[int, bytes]]) -> bool:
+
+        with open(self.elf_file, 'r+b') as elf:
+
+            for offset, data in edits:
+                elf.seek(offset)
+                elf.write(data)
+
+        return compile_assembly(*self.post_patch) if self.post_patch else True
+
+    def patch(self, source: pathlib.Path, line: int) -> bool:
+        """
+        Replaces the instructions of an assembly line with ``nop`` instructions.
+
+        Args:
+            source (pathlib.Path): The assembly source.
+            line (int): The 1-based line number within ``source``, as in the DWARF line table.
+
+        Returns:
+            bool: True if the ELF was patched. False if the line cannot be patched, in which case the ELF is left
+            untouched.
+        """
+
+        ranges = self.locate(source, line)
+
+        if not ranges:
+            log.debug(f"Line {line} of {source} not in the line table of {self.elf_file}")
+            return False
+
+        edits = list()
+        for start, end in ranges:
+
+            offset = self._offset(start, end)
+            padding = self._fill(end - start)
+
+            if offset is None or padding is None:
+                log.debug(f"Unable to patch [{start:#x}, {end:#x}) of line {line} of {source}")
+                return False
+
+            edits.append((offset, padding))
+
+        with open(self.elf_file, 'rb') as elf:
+
+            originals = list()
+            for offset, padding in edits:
+                elf.seek(offset)
+                originals.append((offset, elf.read(len(padding))))
+
+        self._patches.append(originals)
+        log.debug(f"Patching line {line} of {source} at {[f'{start:#x}' for start, _ in ranges]}")
+
+        return self._write(edits)
+
+    def unpatch(self) -> bool:
+        """
+        Restores the instructions replaced by the most recent patch.
+
+        Returns:
+            bool: True if the restoration succeeded. False if there is nothing to restore or the post patch
+            instructions failed.
+        """
+
+        if not self._patches:
+            log.debug(f"No patches to restore in {self.elf_file}")
+            return False
+
+        return self._write(self._patches.pop())
+
+
+class MemoryImage:
+    """
+    Generates the program memory image of the STL straight from its ELF, i.e., without an ``objcopy`` invocation.
+    The image is written to the path that the testbench loads e.g., with ``$readmemh``, so that a new STL only requires
+    a re-run of the simulation and never a re-compilation or re-elaboration of the testbench.
+
+    The image comprises the allocated sections of the ELF at their load addresses. Two formats are supported:
+
+    - ``hex``: A ``$readmemh`` file with one word of ``word_width`` bytes per line. Each run of contiguous words is
+      preceded by its ``@<address>`` in words, relative to ``base_address`` i.e., the address of the memory.
+    - ``bin``: A flat binary from the lowest address of the sections, with zeros in the gaps between them.
+
+    The image is replaced atomically, hence the testbench never reads a partially written image.
+    """
+
+    FORMATS = ("hex", "bin")
+
+    def __init__(self, elf_file: pathlib.Path, image_file: pathlib.Path, format: str | None = None,
+                 word_width: int = 4, base_address: int = 0) -> 'MemoryImage':
+
+        self.elf_file: pathlib.Path = pathlib.Path(elf_file)
+        self.image_file: pathlib.Path = pathlib.Path(image_file)
+
+        # By default, inferred from the suffix of the image e.g., .hex or .bin
+        self.format: str = format if format else self.image_file.suffix.lstrip('.')
+        if self.format not in self.FORMATS:
+            raise ValueError(f"Unknown memory image format {self.format}. Expected one of {self.FORMATS}")
+
+        self.word_width: int = word_width
+        self.base_address: int = base_address
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> 'MemoryImage':
+        """
+        Constructs the memory image from the ``[cross_compilation.memory_image]`` TOML settings.
+
+        Args:
+            settings (dict): The memory image settings.
+
+        Returns:
+            MemoryImage: The memory image.
+        """
+
+        base_address = settings.get("base_address", 0)
+        if isinstance(base_address, str):
+            base_address = int(base_address, 16)
+
+        return cls(pathlib.Path(settings["elf_file"]), pathlib.Path(settings["image_file"]),
+                   format=settings.get("format"), word_width=settings.get("word_width", 4),
+                   base_address=base_address)
+
+    def segments(self) -> tuple[list[tuple[int, bytes]], str]:
+        """
+        Reads the contents of the ELF to be loaded into memory, like ``objcopy`` does. That is, the allocated sections
+        with contents at their load addresses.
+
+        Returns:
+            tuple[list[tuple[int, bytes]], str]: The (load address, contents) of each section, sorted by address, and
+            the byte order of the ELF.
+        """
+
+        from elftools.elf.elffile import ELFFile
+        from elftools.elf.constants import SH_FLAGS
+
+        with open(self.elf_file, 'rb') as f:
+
+            elf = ELFFile(f)
+
+            loadable = [segment for segment in elf.iter_segments() if segment["p_type"] == "PT_LOAD"]
+
+            segments = list()
+            for section in elf.iter_sections():
+
+                if not section["sh_flags"] & SH_FLAGS.SHF_ALLOC or section["sh_type"] == "SHT_NOBITS" \
+                        or not section["sh_size"]:
+                    continue
+
+                # The load address differs from the virtual address when the section is e.g., copied from ROM to RAM
+                address = section["sh_addr"]
+                for segment in loadable:
+
+                    if segment["p_offset"] <= section["sh_offset"] < segment["p_offset"] + segment["p_filesz"]:
+                        address = segment["p_paddr"] + section["sh_offset"] - segment["p_offset"]
+                        break
+
+                segments.append((address, section.data()))
+
+            return sorted(segments), "little" if elf.little_endian else "big"
+
+    def _hex(self, segments: list[tuple[int, bytes]], byteorder: str) -> bytes:
+
+        width = self.word_width
+
+        if segments[0][0] < self.base_address:
+            raise ValueError(f"Contents of {self.elf_file} at {segments[0][0]:#x} below the base address "
+                             f"{self.base_address:#x}")
+
+        # Address (in words) -> word contents
+        words = dict()
+        for address, data in segments:
+
+            # Aligns the segment to a word boundary
+            padding = (address - self.base_address) % width
+            data = bytes(padding) + data + bytes(-(padding + len(data)) % width)
+            first = (address - self.base_address - padding) // width
+
+            for i in range(0, len(data), width):
+
+                # Sections do not overlap but may share a word e.g., a 2-byte aligned .text followed by .rodata. The
+                # zero padding of one section is then merged with the contents of the other
+                word = int.from_bytes(data[i:i + width], byteorder)
+                words[first + i // width] = words.get(first + i // width, 0) | word
+
+        lines = list()
+        previous = None
+        for address in sorted(words):
+
+            if previous is None or address != previous + 1:
+                lines.append(f"@{address:08x}")
+
+            lines.append(f"{words[address]:0{2 * width}x}")
+            previous = address
+
+        return ('\n'.join(lines) + '\n').encode()
+
+    def _bin(self, segments: list[tuple[int, bytes]]) -> bytes:
+
+        start = min(address for address, _ in segments)
+        end = max(address + len(data) for address, data in segments)
+
+        image = bytearray(end - start)
+        for address, data in segments:
+            image[address - start:address - start + len(data)] = data
+
+        return bytes(image)
+
+    def write(self) -> None:
+        """
+        Writes the memory image of the current ELF.
+
+        Raises:
+            ValueError: If the ELF has no loadable contents or, for ``hex`` images, contents below the base address.
+        """
+
+        segments, byteorder = self.segments()
+
+        if not segments:
+            raise ValueError(f"No loadable sections found in {self.elf_file}")
+
+        image = self._hex(segments, byteorder) if self.format == "hex" else self._bin(segments)
+
+        with tempfile.NamedTemporaryFile(dir=self.image_file.parent, prefix=f".{self.image_file.name}.",
+                                         delete=False) as temporary:
+            temporary.write(image)
+
+        # Temporary files are private to the user
+        os.chmod(temporary.name, self.image_file.stat().st_mode if self.image_file.exists() else 0o644)
+        os.replace(temporary.name, self.image_file)
+        log.debug(f"Wrote the {self.format} memory image of {self.elf_file} to {self.image_file}")
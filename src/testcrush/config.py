@@ -1,9 +1,14 @@
 #!/usr/bin/python3
 # SPDX-License-Identifier: MIT
 
+import collections.abc
+import dataclasses
 import toml
 import re
 import pathlib
+import types
+
+from testcrush.utils import Command
 from typing import Any
 
 A0_KEYS = {
@@ -18,12 +23,36 @@ A0_KEYS = {
     "coverage_formula": ["fault_report", "coverage_formula"]
 }
 
+# Optional settings, i.e., not checked by sanitize_configuration()
+A0_OPTIONAL_KEYS = {
+    "incremental_compilation": ["cross_compilation", "incremental"],
+    "elf_patching": ["cross_compilation", "elf_patching"],
+    "memory_image": ["cross_compilation", "memory_image"],
+    "zoix_scheduler": ["zoix_scheduler"],
+    "zoix_sessions": ["zoix_sessions"],
+    "candidate_ordering": ["candidate_ordering"],
+    "pre_run_dependencies": ["pre_run", "dependencies"]
+}
+
 A0_PREPROCESSOR_KEYS = {
     "enabled": ["preprocessing", "enabled"],
     "processor_name": ["preprocessing", "processor_name"],
     "processor_trace": ["preprocessing", "processor_trace"],
     "zoix_to_trace": ["preprocessing", "zoix_to_trace"],
-    "elf_file": ["preprocessing", "elf_file"]
+    "elf_file": ["preprocessing", "elf_file"],
+    "pc_column": ["preprocessing", "pc_column"],
+    "cycle_column": ["preprocessing", "cycle_column"],
+    "time_column": ["preprocessing", "time_column"],
+    "time_unit": ["preprocessing", "time_unit"],
+    "trace_tokenizer": ["preprocessing", "trace_tokenizer"],
+    "ingestion_workers": ["preprocessing", "ingestion_workers"],
+    "history": ["preprocessing", "history"],
+    "trace_db": ["preprocessing", "trace_db"],
+    "trace_cache": ["preprocessing", "trace_cache"],
+    "remove_unexecuted": ["preprocessing", "remove_unexecuted"],
+    "order_by_tat": ["preprocessing", "order_by_tat"],
+    "fault_attribution": ["preprocessing", "fault_attribution"],
+    "max_unique_faults": ["preprocessing", "max_unique_faults"]
 }
 
 A1XX_KEYS = {
@@ -40,12 +69,31 @@ A1XX_KEYS = {
     "coverage_formula": ["fault_report", "coverage_formula"],
 }
 
+# Optional settings, i.e., not checked by sanitize_configuration()
+A1XX_OPTIONAL_KEYS = {
+    "incremental_compilation": ["cross_compilation", "incremental"],
+    "memory_image": ["cross_compilation", "memory_image"],
+    "zoix_scheduler": ["zoix_scheduler"],
+    "zoix_sessions": ["zoix_sessions"],
+    "pre_run_dependencies": ["pre_run", "dependencies"]
+}
+
 A1XX_PREPROCESSOR_KEYS = {
     "enabled": ["preprocessing", "enabled"],
     "processor_name": ["preprocessing", "processor_name"],
     "processor_trace": ["preprocessing", "processor_trace"],
     "zoix_to_trace": ["preprocessing", "zoix_to_trace"],
-    "elf_file": ["preprocessing", "elf_file"]
+    "elf_file": ["preprocessing", "elf_file"],
+    "pc_column": ["preprocessing", "pc_column"],
+    "cycle_column": ["preprocessing", "cycle_column"],
+    "time_column": ["preprocessing", "time_column"],
+    "time_unit": ["preprocessing", "time_unit"],
+    "trace_tokenizer": ["preprocessing", "trace_tokenizer"],
+    "ingestion_workers": ["preprocessing", "ingestion_workers"],
+    "history": ["preprocessing", "history"],
+    "trace_db": ["preprocessing", "trace_db"],
+    "trace_cache": ["preprocessing", "trace_cache"],
+    "remove_unexecuted": ["preprocessing", "remove_unexecuted"]
 }
 
 
@@ -103,21 +151,57 @@ def replace_toml_regex(item: Any, substitute: bool = False) -> dict[str, Any]:
         return item
 
 
-def sanitize_configuration(config_file: pathlib.Path, algorithm_keys: dict) -> None:
+def resolve_toml(item: Any, defines: dict[str, str], substitute: bool = False) -> Any:
+    """
+    Performs the substitutions of ``replace_toml_placeholders()`` and ``replace_toml_regex()`` in a single pass.
+
+    Args:
+        item (Any): A string, list or dict to act upon.
+        defines (dict[str, str]): The user defines.
+        substitute (bool, optional): Flag to compile the strings of ``item`` to ``re.Patterns``. Defaults to False.
+
+    Returns:
+        Any: The ``item`` where all substitutions have been performed.
+    """
+
+    if isinstance(item, str):
+
+        for key, value in defines.items():
+            item = item.replace(f"%{key}%", value)
+
+        return re.compile(item, re.DOTALL) if substitute else item
+
+    elif isinstance(item, list):
+        return [resolve_toml(sub_item, defines, substitute) for sub_item in item]
+
+    elif isinstance(item, dict):
+        return {k: resolve_toml(v, defines, "regex" in k) for k, v in item.items()}
+
+    else:
+        return item
+
+
+def sanitize_configuration(config_file: pathlib.Path, algorithm_keys: dict, config: dict | None = None) -> None:
     """Checks whether all key-value pairs have been defined in the TOML file.
 
     Args:
         config_file (pathlib.Path): The TOML configuration file.
+        algorithm_keys (dict): The mandatory settings and their TOML paths.
+        config (dict | None, optional): The TOML configuration, if already loaded. Otherwise, it is loaded from
+                                        ``config_file``.
 
     Raises:
         TomlDecodeError: if loading the file fails.
         KeyError: if a key is missing from the TOML file.
     """
 
-    try:
-        config = toml.load(config_file)
-    except toml.TomlDecodeError as e:
-        print(f"Error decoding TOML: {e}")
+    if config is None:
+
+        try:
+            config = toml.load(config_file)
+        except toml.TomlDecodeError as e:
+            print(f"Error decoding TOML: {e}")
+            raise
 
     for toml_path in algorithm_keys.values():
 
@@ -136,98 +220,261 @@ def sanitize_configuration(config_file: pathlib.Path, algorithm_keys: dict) -> N
                     raise KeyError(f"Subsection {subkey} not in {config_file}")
 
 
-def parse_a0_configuration(config_file: pathlib.Path) -> tuple[str, list, dict]:
+def freeze(item: Any) -> Any:
     """
-    Parses the TOML configuration file of A0 and returns the A0 constructor args.
+    Recursively turns the tables of a TOML entry into read-only mappings (``types.MappingProxyType``) and its arrays
+    into tuples.
 
     Args:
-        config_file (pathlib.Path): The configuration file.
+        item (Any): The TOML entry.
 
     Returns:
-        tuple: A triplet with the ISA file (str), a list of the assembly sources (strs), and a dictionary with all the
-        a0 settings.
+        Any: The read-only entry.
     """
 
-    def get_nested_value(d: dict, keys: list, default=None) -> Any:
-        """Helper function to get a nested value from a dictionary, safely."""
+    if isinstance(item, collections.abc.Mapping) and not isinstance(item, Settings):
+        return types.MappingProxyType({key: freeze(value) for key, value in item.items()})
 
-        for key in keys:
+    elif isinstance(item, (list, tuple)) and not isinstance(item, Command):
+        return tuple(freeze(sub_item) for sub_item in item)
 
-            d = d.get(key, {})
+    return item
 
-        return d if d else default
 
-    sanitize_configuration(config_file, A0_KEYS)
+def thaw(item: Any) -> Any:
+    """
+    Reverses ``freeze()``, i.e., recursively turns read-only mappings into dicts and tuples into lists.
 
-    config = toml.load(config_file)
+    Args:
+        item (Any): The read-only entry.
 
-    try:
-        user_defines = config["user_defines"]
-    except KeyError:
-        pass
+    Returns:
+        Any: The TOML entry.
+    """
 
-    if user_defines:
-        config = replace_toml_placeholders(config, user_defines)
+    if isinstance(item, types.MappingProxyType):
+        return {key: thaw(value) for key, value in item.items()}
 
-    # Change regex keys to re.Patterns
-    config = replace_toml_regex(config)
+    elif isinstance(item, tuple):
+        return [thaw(sub_item) for sub_item in item]
 
-    isa = config["isa"]["isa_file"]
-    asm_sources = config["assembly_sources"]["sources"]
+    return item
 
-    # Dynamically build the a0_settings dictionary using the defined key mappings
-    a0_settings = {setting: get_nested_value(config, path) for setting, path in A0_KEYS.items()}
 
-    a0_preprocessor_settings = {setting: get_nested_value(config, path)
-                                for setting, path in A0_PREPROCESSOR_KEYS.items()}
-    return (isa, asm_sources, a0_settings, a0_preprocessor_settings)
+class Settings(collections.abc.Mapping):
+    """
+    Base class of the frozen settings dataclasses. Besides attribute access, settings are read-only mappings of the
+    setting names to their values, hence they can be used wherever the loose dicts of settings were used e.g., with
+    ``.get()`` or ``**`` unpacking. The freeze is deep: nested tables are read-only mappings and arrays are tuples (see
+    ``freeze()``). Settings are picklable and thus cheap to hand over to worker processes.
+    """
+
+    # Settings whose values are lists of shell commands, to be tokenized once
+    _commands: tuple[str, ...] = ()
+
+    def __post_init__(self):
+
+        for name in self._commands:
+
+            commands = getattr(self, name)
+
+            if commands is not None:
+                object.__setattr__(self, name, tuple(command if isinstance(command, Command)
+                                                     else Command.from_toml(command) for command in commands))
+
+        for field in dataclasses.fields(self):
+            object.__setattr__(self, field.name, freeze(getattr(self, field.name)))
+
+    def __getstate__(self) -> dict[str, Any]:
+
+        # Read-only mappings cannot be pickled
+        return {name: thaw(value) for name, value in self.__dict__.items()}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+
+        for name, value in state.items():
+            object.__setattr__(self, name, freeze(value))
+
+    @classmethod
+    def from_toml(cls, config: dict[str, Any], keys: dict[str, list[str]]) -> 'Settings':
+        """
+        Builds the settings from a parsed TOML configuration.
+
+        Args:
+            config (dict[str, Any]): The TOML configuration, with all substitutions performed.
+            keys (dict[str, list[str]]): The TOML path of each setting.
+
+        Returns:
+            Settings: The settings. Settings which are missing, empty or false are ``None``.
+        """
+
+        def get_nested_value(d: dict, keys: list, default=None) -> Any:
+            """Helper function to get a nested value from a dictionary, safely."""
 
+            for key in keys:
 
-def parse_a1xx_configuration(config_file: pathlib.Path) -> tuple[str, list, dict]:
+                d = d.get(key, {})
+
+            return d if d else default
+
+        return cls(**{setting: get_nested_value(config, path) for setting, path in keys.items()})
+
+    def __getitem__(self, key: str) -> Any:
+
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __iter__(self):
+
+        return iter(self.__dataclass_fields__)
+
+    def __len__(self) -> int:
+
+        return len(self.__dataclass_fields__)
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class A0Settings(Settings):
+    """The settings of A0. See ``A0_KEYS`` and ``A0_OPTIONAL_KEYS``."""
+
+    _commands = ("assembly_compilation_instructions", "vcs_compilation_instructions",
+                 "vcs_logic_simulation_instructions", "zoix_fault_simulation_instructions")
+
+    compaction_policy: str | None = None
+    assembly_compilation_instructions: tuple[Command, ...] | None = None
+    vcs_compilation_instructions: tuple[Command, ...] | None = None
+    vcs_logic_simulation_instructions: tuple[Command, ...] | None = None
+    vcs_logic_simulation_control: dict[str, Any] | None = None
+    zoix_fault_simulation_instructions: tuple[Command, ...] | None = None
+    zoix_fault_simulation_control: dict[str, Any] | None = None
+    fsim_report: str | None = None
+    coverage_formula: str | None = None
+    incremental_compilation: dict[str, Any] | None = None
+    elf_patching: dict[str, Any] | None = None
+    memory_image: dict[str, Any] | None = None
+    zoix_scheduler: dict[str, Any] | None = None
+    zoix_sessions: dict[str, dict[str, Any]] | None = None
+    candidate_ordering: dict[str, Any] | None = None
+    pre_run_dependencies: dict[str, list[str]] | None = None
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class A1xxSettings(Settings):
+    """The settings of A1xx. See ``A1XX_KEYS`` and ``A1XX_OPTIONAL_KEYS``."""
+
+    _commands = A0Settings._commands
+
+    a1xx_segment_dimension: int | None = None
+    a1xx_policy: str | None = None
+    compaction_policy: str | None = None
+    assembly_compilation_instructions: tuple[Command, ...] | None = None
+    vcs_compilation_instructions: tuple[Command, ...] | None = None
+    vcs_logic_simulation_instructions: tuple[Command, ...] | None = None
+    vcs_logic_simulation_control: dict[str, Any] | None = None
+    zoix_fault_simulation_instructions: tuple[Command, ...] | None = None
+    zoix_fault_simulation_control: dict[str, Any] | None = None
+    fsim_report: str | None = None
+    coverage_formula: str | None = None
+    incremental_compilation: dict[str, Any] | None = None
+    memory_image: dict[str, Any] | None = None
+    zoix_scheduler: dict[str, Any] | None = None
+    zoix_sessions: dict[str, dict[str, Any]] | None = None
+    pre_run_dependencies: dict[str, list[str]] | None = None
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class A1xxPreprocessorSettings(Settings):
+    """The settings of the preprocessor of A1xx. See ``A1XX_PREPROCESSOR_KEYS``."""
+
+    enabled: bool | None = None
+    processor_name: str | None = None
+    processor_trace: str | None = None
+    zoix_to_trace: dict[str, str] | None = None
+    elf_file: str | None = None
+    pc_column: str | None = None
+    cycle_column: str | None = None
+    time_column: str | None = None
+    time_unit: str | None = None
+    trace_tokenizer: str | None = None
+    ingestion_workers: int | None = None
+    history: int | None = None
+    trace_db: str | None = None
+    trace_cache: str | None = None
+    remove_unexecuted: bool | None = None
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class A0PreprocessorSettings(A1xxPreprocessorSettings):
+    """The settings of the preprocessor of A0. See ``A0_PREPROCESSOR_KEYS``."""
+
+    order_by_tat: bool | None = None
+    fault_attribution: bool | None = None
+    max_unique_faults: int | None = None
+
+
+def load_configuration(config_file: pathlib.Path, algorithm_keys: dict) -> dict[str, Any]:
     """
-    Parses the TOML configuration file of A1xx and returns the A1xx constructor args.
+    Loads a TOML configuration file once, checks that the mandatory settings are defined and performs all
+    substitutions of user defines and regular expressions.
 
     Args:
         config_file (pathlib.Path): The configuration file.
+        algorithm_keys (dict): The mandatory settings and their TOML paths.
 
     Returns:
-        tuple: A triplet with the ISA file (str), a list of the assembly sources (strs), and a dictionary with all the
-        a1xx settings.
+        dict[str, Any]: The configuration.
     """
 
-    def get_nested_value(d: dict, keys: list, default=None) -> Any:
-        """Helper function to get a nested value from a dictionary, safely."""
-
-        for key in keys:
+    config = toml.load(config_file)
 
-            d = d.get(key, {})
+    sanitize_configuration(config_file, algorithm_keys, config)
 
-        return d if d else default
+    return resolve_toml(config, config.get("user_defines", dict()))
 
-    sanitize_configuration(config_file, A1XX_KEYS)
 
-    config = toml.load(config_file)
+def parse_a0_configuration(config_file: pathlib.Path) -> tuple[str, list, A0Settings, A0PreprocessorSettings]:
+    """
+    Parses the TOML configuration file of A0 and returns the A0 constructor args.
 
-    try:
-        user_defines = config["user_defines"]
-    except KeyError:
-        pass
+    Args:
+        config_file (pathlib.Path): The configuration file.
 
-    if user_defines:
-        config = replace_toml_placeholders(config, user_defines)
+    Returns:
+        tuple: The ISA file (str), a list of the assembly sources (strs), the a0 settings and the settings of the
+        preprocessor.
+    """
 
-    # Change regex keys to re.Patterns
-    config = replace_toml_regex(config)
+    config = load_configuration(config_file, A0_KEYS)
 
     isa = config["isa"]["isa_file"]
     asm_sources = config["assembly_sources"]["sources"]
 
-    # Dynamically build the a0_settings dictionary using the defined key mappings
-    a1xx_settings = {setting: get_nested_value(config, path) for setting, path in A1XX_KEYS.items()}
+    a0_settings = A0Settings.from_toml(config, A0_KEYS | A0_OPTIONAL_KEYS)
+    a0_preprocessor_settings = A0PreprocessorSettings.from_toml(config, A0_PREPROCESSOR_KEYS)
+
+    return (isa, asm_sources, a0_settings, a0_preprocessor_settings)
+
+
+def parse_a1xx_configuration(config_file: pathlib.Path) -> tuple[str, list, A1xxSettings, A1xxPreprocessorSettings]:
+    """
+    Parses the TOML configuration file of A1xx and returns the A1xx constructor args.
+
+    Args:
+        config_file (pathlib.Path): The configuration file.
+
+    Returns:
+        tuple: The ISA file (str), a list of the assembly sources (strs), the a1xx settings and the settings of the
+        preprocessor.
+    """
+
+    config = load_configuration(config_file, A1XX_KEYS)
+
+    isa = config["isa"]["isa_file"]
+    asm_sources = config["assembly_sources"]["sources"]
 
-    a1xx_preprocessor_settings = {
-        setting: get_nested_value(config, path)
-        for setting, path in A1XX_PREPROCESSOR_KEYS.items()
-    }
+    a1xx_settings = A1xxSettings.from_toml(config, A1XX_KEYS | A1XX_OPTIONAL_KEYS)
+    a1xx_preprocessor_settings = A1xxPreprocessorSettings.from_toml(config, A1XX_PREPROCESSOR_KEYS)
 
     return (isa, asm_sources, a1xx_settings, a1xx_preprocessor_settings)
@@ -0,0 +1,375 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+import collections
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from testcrush.utils import get_logger
+from typing import Any, Callable
+
+log = get_logger()
+
+
+def parse_address(address: str) -> tuple[socket.AddressFamily, str | tuple[str, int]]:
+    """
+    Parses the address of a coordinator.
+
+    Args:
+        address (str): Either ``host:port`` for TCP or the path of a Unix domain socket.
+
+    Returns:
+        tuple[socket.AddressFamily, str | tuple[str, int]]: The address family and the address as expected by
+        ``socket``.
+    """
+
+    host, separator, port = address.rpartition(":")
+
+    if separator and port.isdigit() and "/" not in address:
+        return (socket.AF_INET, (host if host else "localhost", int(port)))
+
+    return (socket.AF_UNIX, address)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+
+    daemon_threads = True
+
+
+class Coordinator:
+    """
+    Owns the candidate queue and the changelog of accepted removals of a distributed compaction.
+
+    Workers communicate with the coordinator over a TCP or Unix domain socket with newline-delimited JSON messages.
+    Each request is answered with exactly one response:
+
+    - ``{"op": "get", "version": v}``: Requests a candidate. ``v`` is the number of accepted removals the worker has
+      already applied to its sources. The response is either ``{"op": "candidate", "id": ..., "candidate": ...,
+      "version": ..., "changelog": [...]}`` with the accepted removals the worker has yet to apply, ``{"op": "wait"}``
+      if the queue is empty but candidates are still under evaluation, or ``{"op": "done"}``.
+    - ``{"op": "report", "id": ..., "result": [tat, coverage] | null, "stats": {...}}``: Reports the evaluation of a
+      candidate. The response is ``{"op": "ack", "verdict": ...}``.
+
+    A candidate is evaluated by a worker on top of the accepted removals known at the time it was handed out. If
+    another removal has been accepted in the meantime, the report is *stale* and the candidate is put back at the
+    front of the queue. Hence, every accepted removal has been evaluated against exactly the accepted state of the
+    STL, as in a sequential run. Candidates handed out to a worker which disconnects are put back too.
+    """
+
+    def __init__(self, candidates: list[Any], initial_stats: tuple[int, float],
+                 evaluate: Callable[[tuple[int, float], tuple[int, float]], bool],
+                 accept: Callable[[tuple[int, float], tuple[int, float]], tuple[int, float]],
+                 on_verdict: Callable[[Any, str, dict], None] | None = None) -> 'Coordinator':
+
+        self.queue: collections.deque = collections.deque(candidates)
+        self.stats: tuple[int, float] = tuple(initial_stats)
+        self.evaluate = evaluate
+        self.accept = accept
+        self.on_verdict = on_verdict
+
+        self.changelog: list[Any] = list()
+
+        # Job id -> (candidate, version it was handed out at)
+        self.in_flight: dict[int, tuple[Any, int]] = dict()
+        self._next_job: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        self._done: threading.Event = threading.Event()
+        self._server: socketserver.BaseServer | None = None
+
+        if not self.queue:
+            self._done.set()
+
+    def handle(self, message: dict, jobs: set[int]) -> dict:
+        """
+        Handles a request of a worker.
+
+        Args:
+            message (dict): The request.
+            jobs (set[int]): The jobs handed out through the connection of the request.
+
+        Returns:
+            dict: The response.
+        """
+
+        with self._lock:
+
+            if message["op"] == "get":
+
+                if self.queue:
+
+                    candidate = self.queue.popleft()
+                    job = self._next_job
+                    self._next_job += 1
+
+                    self.in_flight[job] = (candidate, len(self.changelog))
+                    jobs.add(job)
+
+                    return {"op": "candidate", "id": job, "candidate": candidate, "version": len(self.changelog),
+                            "changelog": self.changelog[message.get("version", 0):]}
+
+                return {"op": "wait"} if self.in_flight else {"op": "done"}
+
+            elif message["op"] == "report":
+
+                job = message["id"]
+                jobs.discard(job)
+                candidate, version = self.in_flight.pop(job)
+                result = message.get("result")
+
+                if version != len(self.changelog):
+
+                    verdict = "Stale"
+                    self.queue.appendleft(candidate)
+
+                elif result and self.evaluate(self.stats, tuple(result)):
+
+                    verdict = "Proceed"
+                    self.changelog.append(candidate)
+                    self.stats = self.accept(self.stats, tuple(result))
+
+                else:
+
+                    verdict = "Restore"
+
+                log.debug(f"Job {job} {candidate=} {result=} {verdict=}")
+
+                if self.on_verdict:
+                    self.on_verdict(candidate, verdict, message.get("stats", dict()))
+
+                if not self.queue and not self.in_flight:
+                    self._done.set()
+
+                return {"op": "ack", "verdict": verdict}
+
+            else:
+
+                raise ValueError(f"Unknown operation {message['op']}")
+
+    def requeue(self, jobs: set[int]) -> None:
+        """Puts the candidates of unfinished jobs back at the front of the queue."""
+
+        with self._lock:
+
+            for job in jobs:
+
+                if job in self.in_flight:
+
+                    candidate, _ = self.in_flight.pop(job)
+                    log.debug(f"Job {job} {candidate=} abandoned. Requeueing")
+                    self.queue.appendleft(candidate)
+
+            jobs.clear()
+
+    def start(self, address: str) -> str:
+        """
+        Starts serving the workers in a background thread.
+
+        Args:
+            address (str): Either ``host:port`` for TCP or the path of a Unix domain socket. Port 0 picks a free port.
+
+        Returns:
+            str: The address the coordinator listens to.
+        """
+
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+
+                jobs = set()
+
+                try:
+
+                    for line in self.rfile:
+
+                        response = coordinator.handle(json.loads(line), jobs)
+                        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+                except (ConnectionError, ValueError, KeyError) as e:
+
+                    log.debug(f"Dropping worker connection: {e}")
+
+                finally:
+
+                    coordinator.requeue(jobs)
+
+        family, bind_address = parse_address(address)
+
+        if family == socket.AF_UNIX:
+
+            if os.path.exists(bind_address):
+                os.unlink(bind_address)
+
+            server = _UnixServer(bind_address, Handler)
+
+        else:
+
+            server = _TCPServer(bind_address, Handler)
+            address = f"{bind_address[0]}:{server.server_address[1]}"
+
+        self._server = server
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        log.debug(f"Coordinator listening to {address}")
+
+        return address
+
+    def wait(self, timeout: float | None = None) -> list[Any]:
+        """
+        Blocks until all candidates have been evaluated and stops serving.
+
+        Args:
+            timeout (float | None, optional): Timeout in seconds. Defaults to None.
+
+        Returns:
+            list[Any]: The accepted candidates, in order of acceptance.
+
+        Raises:
+            TimeoutError: if the candidates have not been evaluated within ``timeout``.
+        """
+
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{len(self.queue)} candidates pending and {len(self.in_flight)} in flight")
+
+        return self.stop()
+
+    def stop(self) -> list[Any]:
+        """
+        Stops serving, regardless of any pending candidates.
+
+        Returns:
+            list[Any]: The accepted candidates, in order of acceptance.
+        """
+
+        if self._server:
+
+            self._server.shutdown()
+            self._server.server_close()
+
+            if isinstance(self._server, socketserver.UnixStreamServer):
+                os.unlink(self._server.server_address)
+
+            self._server = None
+
+        return self.changelog
+
+    def serve(self, address: str) -> list[Any]:
+        """
+        Serves the workers until all candidates have been evaluated.
+
+        Args:
+            address (str): Either ``host:port`` for TCP or the path of a Unix domain socket.
+
+        Returns:
+            list[Any]: The accepted candidates, in order of acceptance.
+        """
+
+        self.start(address)
+        return self.wait()
+
+
+class WorkQueueClient:
+    """Worker side of the protocol of the ``Coordinator``."""
+
+    def __init__(self, address: str, connect_timeout: float = 30.0, poll_interval: float = 0.5) -> 'WorkQueueClient':
+
+        self.address: str = address
+        self.poll_interval: float = poll_interval
+
+        family, connect_address = parse_address(address)
+
+        # The coordinator may still be starting up
+        deadline = time.monotonic() + connect_timeout
+        while True:
+
+            self._socket = socket.socket(family, socket.SOCK_STREAM)
+
+            try:
+                self._socket.connect(connect_address)
+                break
+
+            except (ConnectionRefusedError, FileNotFoundError):
+
+                self._socket.close()
+
+                if time.monotonic() > deadline:
+                    raise
+
+                time.sleep(0.1)
+
+        self._rfile = self._socket.makefile("rb")
+
+    def __enter__(self) -> 'WorkQueueClient':
+
+        return self
+
+    def __exit__(self, *args) -> None:
+
+        self.close()
+
+    def close(self) -> None:
+
+        self._rfile.close()
+        self._socket.close()
+
+    def _request(self, message: dict) -> dict:
+
+        self._socket.sendall(json.dumps(message).encode() + b'\n')
+        response = self._rfile.readline()
+
+        if not response:
+            raise ConnectionError(f"Coordinator at {self.address} closed the connection")
+
+        return json.loads(response)
+
+    def get(self, version: int) -> dict | None:
+        """
+        Requests a candidate, waiting for one to become available if needed.
+
+        Args:
+            version (int): The number of accepted removals already applied by the worker.
+
+        Returns:
+            dict | None: The job i.e., the ``"id"``, the ``"candidate"``, its ``"version"`` and the ``"changelog"``
+            of removals accepted since ``version``. ``None`` when all candidates have been evaluated.
+        """
+
+        while True:
+
+            response = self._request({"op": "get", "version": version})
+
+            if response["op"] == "candidate":
+                return response
+
+            elif response["op"] == "done":
+                return None
+
+            time.sleep(self.poll_interval)
+
+    def report(self, job: int, result: tuple[int, float] | None, stats: dict | None = None) -> str:
+        """
+        Reports the evaluation of a candidate.
+
+        Args:
+            job (int): The job id.
+            result (tuple[int, float] | None): The TaT and coverage of the STL without the candidate. ``None`` if the
+                                               evaluation failed e.g., compilation or simulation error.
+            stats (dict | None, optional): The iteration statistics to be logged by the coordinator.
+
+        Returns:
+            str: The verdict of the coordinator, i.e., ``Proceed``, ``Restore`` or ``Stale``.
+        """
+
+        return self._request({"op": "report", "id": job, "result": result, "stats": stats or dict()})["verdict"]
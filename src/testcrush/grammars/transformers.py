@@ -1,10 +1,16 @@
 #!/usr/bin/python3
 # SPDX-License-Identifier: MIT
 
+import abc
 import lark
+import csv
+import importlib
+import importlib.metadata
+import importlib.util
 import pathlib
+import re
 
-from typing import Literal, Any, Iterable
+from typing import Literal, Any, Iterable, Iterator
 from testcrush.zoix import Fault
 from testcrush.utils import get_logger
 
@@ -241,6 +247,118 @@ class FaultReportFaultListTransformer(lark.Transformer):
         return (str(attribute_name), str(attribute_value))
 
 
+class FaultReportFaultListFastParser:
+    """
+    Regex-based fast path for the ``FaultList`` segment of a Z01X txt fault report.
+
+    The vast majority of the lines of a fault list follow the fixed shape:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        < 1 1 1> ON 1 (7.52ns) { PORT "tb_top.dut.subunit_a.cell.port" } (* "test"->attr=val; *)
+
+    Such lines are matched with precompiled regular expressions and are turned into ``zoix.Fault`` objects by the
+    callbacks of a ``FaultReportFaultListTransformer``. If any line cannot be handled by the fast path, the whole
+    segment is parsed by the lark grammar instead. Both paths share the same transformer instance.
+
+    It exposes the same ``parse()`` interface as the ``lark.Lark`` parser it wraps.
+    """
+
+    _header = re.compile(r"^FaultList(?:\s+[A-Za-z_]\w*)?\s*\{$")
+
+    _site = re.compile(r'\{\s*(?:PORT|FLOP|ARRY|WIRE|PRIM|VARI)\s+"([\w.]+(?:\[\d+(?::\d+)?\])?)"\s*\}')
+
+    _attribute = re.compile(r'"[A-Za-z_]\w*"\s*->\s*([A-Za-z_]\w*)\s*=\s*'
+                            r'"?\s*([\d.]+[smunp]s|(?i:[0-9a-fx]+)|[A-Za-z_]\w*)\s*"?\s*;')
+
+    _timing = re.compile(r"\d+(?:\s*,\s*\d+)*|[\d.]+[smunp]s(?:\s*,\s*[\d.]+[smunp]s)*")
+
+    _fault_line = re.compile(rf"""
+        ^(?:<[\w\s.]*>\s*)?                                          # Optional fault info (discarded)
+        (?P<status>[A-Z]{{2}}|--)\s+                                   # Fault status
+        (?P<type>[01~RF])\s*                                          # Fault type
+        (?:\(\s*(?P<timing>{_timing.pattern})\s*\)\s*)?               # Optional timing info
+        (?P<sites>{_site.pattern}(?:\s*\+\s*{_site.pattern})*)\s*     # Fault site(s)
+        (?:\(\*(?P<attributes>(?:\s*{_attribute.pattern})+)\s*\*\))?$  # Optional attributes
+    """, re.VERBOSE)
+
+    def __init__(self, transformer: FaultReportFaultListTransformer,
+                 fallback: lark.Lark) -> 'FaultReportFaultListFastParser':
+
+        self.transformer: FaultReportFaultListTransformer = transformer
+        self.fallback: lark.Lark = fallback
+
+    def _fast_fault(self, line: str) -> Fault | None:
+        """
+        Transforms a single fault line to a ``Fault`` object using the precompiled regular expressions.
+
+        Args:
+            line (str): A stripped line of the ``FaultList`` segment.
+
+        Returns:
+            Fault | None: The generated ``Fault`` or ``None`` if the line is not supported by the fast path.
+        """
+
+        match = self._fault_line.match(line)
+
+        if not match:
+            return None
+
+        transformer = self.transformer
+
+        fault_parts = [transformer.fault_status(match["status"]),
+                       transformer.fault_type(match["type"])]
+
+        if match["timing"] is not None:
+            fault_parts.append(transformer.timing_info([x.strip() for x in match["timing"].split(',')]))
+
+        fault_parts.append(transformer.location_info(self._site.findall(match["sites"])))
+
+        if match["attributes"] is not None:
+            fault_parts.append(transformer.attributes(self._attribute.findall(match["attributes"])))
+
+        return transformer.fault(fault_parts)
+
+    def parse(self, text: str) -> list[Fault]:
+        """
+        Parses the ``FaultList`` segment and returns the fault list.
+
+        If any line is not supported by the fast path e.g., a fault whose attributes are continued on the next line,
+        then the whole segment is handed to the lark parser, since the line may only make sense along with its
+        neighbours.
+
+        Args:
+            text (str): The ``FaultList`` segment of the fault report.
+
+        Returns:
+            list[Fault]: The parsed fault list.
+        """
+
+        lines = [line.strip() for line in text.splitlines()]
+        lines = [line for line in lines if line]
+
+        if len(lines) < 3 or not self._header.match(lines[0]) or lines[-1] != '}':
+            log.debug("FaultList segment not supported by the fast path. Using the lark parser.")
+            return self.fallback.parse(text)
+
+        faults = list()
+
+        for lineno, line in enumerate(lines[1:-1], start=1):
+
+            fault = self._fast_fault(line)
+
+            if fault is None:
+                log.debug(f"FaultList line {lineno} not supported by the fast path. Using the lark parser.")
+                return self.fallback.parse(text)
+
+            faults.append(fault)
+
+        log.debug(f"FaultList parsed. {len(faults)} faults parsed by the fast path.")
+
+        return faults
+
+
 class FaultReportStatusGroupsTransformer(lark.Transformer):
     """
     This transformer is expected to act on the grammar of the ``StatusGroups`` segment of a Z01X txt fault report.
@@ -415,6 +533,213 @@ class TraceTransformerCV32E40P(lark.Transformer):
         return reg_and_mem
 
 
+class TraceTokenizer(abc.ABC):
+    """
+    Base class of the streaming trace tokenizers. A tokenizer turns the lines of a processor trace into rows of
+    strings, one per instruction, without holding the trace in memory.
+
+    Subclasses declare:
+
+    - ``columns``: The names of the columns of each row.
+    - ``sample``: A short, representative trace including its header, on which the conformance suite and the
+      benchmark of the tokenizers operate.
+
+    and implement ``tokenize()``. Tokenizers of other processors can be plugged in through the
+    ``testcrush.trace_tokenizers`` entry point group or by their module path (see ``TraceTokenizerFactory``).
+    """
+
+    columns: tuple[str, ...] = ()
+    sample: str = ""
+
+    @abc.abstractmethod
+    def tokenize(self, lines: Iterable[str]) -> Iterator[list[str]]:
+        """
+        Tokenizes a trace lazily.
+
+        Args:
+            lines (Iterable[str]): The lines of the trace, including its header e.g., an open trace file.
+
+        Yields:
+            list[str]: The values of the ``columns`` of each entry of the trace.
+        """
+
+
+class TraceTokenizerCV32E40P(TraceTokenizer):
+    """
+    Regex-based streaming tokenizer for the tracer of CV32E40P. It yields the same rows as the CSV lines of the
+    ``TraceTransformerCV32E40P``. Any entry which cannot be handled by the regular expression is parsed by the lark
+    grammar instead.
+    """
+
+    columns = ("Time", "Cycle", "PC", "Instr", "Decoded instruction", "Register and memory contents")
+
+    sample = """\
+Time          Cycle      PC       Instr    Decoded instruction Register and memory contents
+130         61 00000150 4481     c.li    x9,0        x9=0x00000000
+132         62 00000152 00008437 lui     x8,0x8      x8=0x00008000
+134         63 00000156 fff40413 addi    x8,x8,-1    x8:0x00008000  x8=0x00007fff
+    925ns              88 00000e3a 00000613 c.addi
+    975ns              93 000010f2 0d01a703 lw               x14, 208(x3)        x14=00002b20  x3:00003288  PA:00003358
+    6245ns             620 00000508 0815754b fnmsub.s         f10, f10,  f1,  f1  f10=4427827e f10:c326827d
+142         67 0000015c c622     c.swsp  x8,12(x2)   x2:0x00002000  x8:0x00000000 PA:0x0000200c store:0x00000000
+"""
+
+    _entry = re.compile(r"""
+        ^\s*(?P<time>[\d.]+(?:[smunp]s)?)
+        \s+(?P<cycle>\d+)
+        \s+(?P<pc>[0-9a-f]+)
+        \s+(?P<instr>[0-9a-f]+)
+        \s+(?P<decoded>[a-z.]+(?:\s+[-a-z0-9, ()]*?)?)
+        (?P<reg_and_mem>(?:\s+(?:[x\[0-9]+|f[0-9]+|PA|store|load)[=|:][0-9a-fx]+)*)
+        \s*$
+    """, re.VERBOSE | re.IGNORECASE)
+
+    def __init__(self) -> 'TraceTokenizerCV32E40P':
+
+        self._fallback: lark.Lark | None = None
+
+    def _parse(self, header: str, line: str) -> list[str]:
+        """
+        Parses a single entry of the trace with the lark grammar.
+
+        Args:
+            header (str): The header of the trace.
+            line (str): The entry.
+
+        Returns:
+            list[str]: The values of the columns of the entry.
+        """
+
+        if self._fallback is None:
+            self._fallback = TraceTransformerFactory()("CV32E40P")
+
+        return next(csv.reader(self._fallback.parse(f"{header}\n{line}\n")[1:]))
+
+    def tokenize(self, lines: Iterable[str]) -> Iterator[list[str]]:
+
+        header = None
+        fallback_lines = 0
+
+        for line in lines:
+
+            line = line.rstrip("\r\n")
+
+            if not line.strip():
+                continue
+
+            if header is None:
+                header = line
+                continue
+
+            match = self._entry.match(line)
+
+            if match is None:
+                fallback_lines += 1
+                yield self._parse(header, line)
+                continue
+
+            yield [match["time"], match["cycle"], match["pc"], match["instr"], ' '.join(match["decoded"].split()),
+                   ', '.join(match["reg_and_mem"].split())]
+
+        log.debug(f"Trace tokenized. {fallback_lines} entries parsed by the lark parser.")
+
+
+class TraceTokenizerFactory:
+    """
+    Registry of the streaming trace tokenizers. Besides the built-in ones, tokenizers are discovered from the
+    ``testcrush.trace_tokenizers`` entry point group, where each entry point maps a processor name to a
+    ``TraceTokenizer`` subclass e.g., in the ``pyproject.toml`` of a plugin:
+
+    .. code-block:: toml
+
+        [project.entry-points."testcrush.trace_tokenizers"]
+        CV32E20 = "my_plugin.tokenizers:TraceTokenizerCV32E20"
+
+    To be used as:
+
+    .. code-block:: python
+
+        factory = TraceTokenizerFactory()
+        tokenizer = factory("ProcessorString")
+
+        # Or directly from a module path, regardless of the processor name
+        tokenizer = factory("ProcessorString", "my_plugin.tokenizers:TraceTokenizerCV32E20")
+        tokenizer = factory("ProcessorString", "path/to/tokenizers.py:TraceTokenizerCV32E20")
+    """
+
+    _entry_point_group = "testcrush.trace_tokenizers"
+    _tokenizers: dict[str, type[TraceTokenizer]] = {
+        "CV32E40P": TraceTokenizerCV32E40P
+    }
+
+    @classmethod
+    def available(cls) -> dict[str, type[TraceTokenizer]]:
+        """
+        Returns:
+            dict[str, type[TraceTokenizer]]: The built-in and plugged-in tokenizers per processor name. Built-in
+            tokenizers take precedence.
+        """
+
+        tokenizers = dict()
+
+        for entry_point in importlib.metadata.entry_points(group=cls._entry_point_group):
+
+            try:
+                tokenizers[entry_point.name] = entry_point.load()
+            except Exception as exception:
+                log.warning(f"Unable to load trace tokenizer {entry_point.name} ({entry_point.value}): {exception}")
+
+        return tokenizers | cls._tokenizers
+
+    @staticmethod
+    def load(path: str) -> type[TraceTokenizer]:
+        """
+        Imports a tokenizer from its module path.
+
+        Args:
+            path (str): ``module:Class`` or ``path/to/file.py:Class``.
+
+        Returns:
+            type[TraceTokenizer]: The tokenizer class.
+
+        Raises:
+            ValueError: If the path is malformed or the class is not a ``TraceTokenizer``.
+        """
+
+        module_name, _, class_name = path.rpartition(':')
+
+        if not module_name or not class_name:
+            raise ValueError(f"Trace tokenizer {path} is not of the form module:Class")
+
+        if module_name.endswith(".py"):
+
+            spec = importlib.util.spec_from_file_location(pathlib.Path(module_name).stem, module_name)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+
+        else:
+            module = importlib.import_module(module_name)
+
+        tokenizer = getattr(module, class_name)
+
+        if not (isinstance(tokenizer, type) and issubclass(tokenizer, TraceTokenizer)):
+            raise ValueError(f"{path} is not a TraceTokenizer")
+
+        return tokenizer
+
+    def __call__(self, processor_type: str, path: str | None = None) -> TraceTokenizer:
+
+        if path:
+            return self.load(path)()
+
+        tokenizer = self._tokenizers.get(processor_type) or self.available().get(processor_type)
+
+        if not tokenizer:
+            raise KeyError(f"Tokenizer for {processor_type} not found")
+
+        return tokenizer()
+
+
 class TraceTransformerFactory:
     """
     Factory pattern for trace transformers and the corresponding grammars.
@@ -456,6 +781,8 @@ class FaultReportTransformerFactory:
         factory = FaultReportTransformerFactory()
         parser = factory("FaultReportSectionString")
 
+    When ``fast=True`` is requested and a regex-based fast path exists for the section (see ``_fast_parsers``), then
+    the fast parser is returned instead, wrapping the lark parser as its fallback.
     """
     _current_directory = pathlib.Path(__file__).parent
     _transformers = {
@@ -463,8 +790,11 @@ class FaultReportTransformerFactory:
         "StatusGroups": (FaultReportStatusGroupsTransformer, _current_directory / "frpt_status_groups.lark"),
         "Coverage": (FaultReportCoverageTransformer, _current_directory / "frpt_coverage.lark")
     }
+    _fast_parsers = {
+        "FaultList": FaultReportFaultListFastParser
+    }
 
-    def __call__(self, section_string: str) -> lark.Lark:
+    def __call__(self, section_string: str, fast: bool = False) -> lark.Lark | FaultReportFaultListFastParser:
 
         transformer, grammar = self._transformers.get(section_string, (None, None))
 
@@ -474,4 +804,10 @@ class FaultReportTransformerFactory:
         with open(grammar) as src:
             lark_grammar = src.read()
 
-        return lark.Lark(grammar=lark_grammar, start="start", parser="lalr", transformer=transformer())
+        transformer = transformer()
+        parser = lark.Lark(grammar=lark_grammar, start="start", parser="lalr", transformer=transformer)
+
+        if fast and section_string in self._fast_parsers:
+            return self._fast_parsers[section_string](transformer, parser)
+
+        return parser
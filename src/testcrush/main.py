@@ -2,47 +2,108 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+import os
 import pathlib
 
 from testcrush import config
 from testcrush import utils
 from testcrush import a0
 from testcrush import a1xx
+from testcrush import build
+from testcrush.preprocessor import BackgroundPreprocessor
 
 log = utils.get_logger()
 
 
-def execute_a0(configuration: pathlib.Path):
+def execute_a0_worker(configuration: pathlib.Path, coordinator: str, sandboxes: list[pathlib.Path]):
+
+    ISA, asm_src, a0_settings, _ = config.parse_a0_configuration(configuration)
+
+    # Isolate the build and simulation directories from other workers running on the same host
+    sandboxes = [build.BuildSandbox(directory, name=f"worker{os.getpid()}") for directory in sandboxes]
+
+    for sandbox in sandboxes:
+
+        sandbox.create()
+        ISA, asm_src, a0_settings = sandbox.rewrite([ISA, asm_src, a0_settings])
+
+    try:
+
+        A0 = a0.A0(pathlib.Path(ISA), asm_src, a0_settings)
+
+        with utils.Timer():
+            evaluated = A0.work(coordinator)
+
+        log.info(f"Worker evaluated {evaluated} candidates.")
+        A0.post_run()
+
+    finally:
+
+        for sandbox in sandboxes:
+            sandbox.destroy()
+
+
+def execute_a0(configuration: pathlib.Path, coordinator: str | None = None):
 
     ISA, asm_src, a0_settings, a0_preprocessor_settings = config.parse_a0_configuration(configuration)
 
     A0 = a0.A0(pathlib.Path(ISA), asm_src, a0_settings)
 
+    # The trace DB and the line table do not depend on the fault list. They are built in the background, overlapping
+    # the initial fault simulation.
+    background = BackgroundPreprocessor(a0.PreprocessorA0, **a0_preprocessor_settings) \
+        if a0_preprocessor_settings["enabled"] else None
+
     # 1. Initial run for original STL for TaT and Coverage computation
-    init_tat, init_cov = A0.pre_run()
+    init_tat, init_cov = A0.pre_run(after_lsim=background.start if background else None)
     log.info(f"Initial STL stats are: TaT = {init_tat}, Coverage = {init_cov}.")
 
+    preprocessor = None
     if a0_preprocessor_settings["enabled"]:
         log.info("Preprocessor phase:")
 
         # This is after pre_run, which means that the fault list
         # has been computed for the golden run and is available.
-        preprocessor = a0.PreprocessorA0(A0.fsim_report.fault_list, **a0_preprocessor_settings)
+        preprocessor = background.result(A0.fsim_report.fault_list)
 
         before_preprocessing = len(A0.all_instructions)
-        preprocessor.prune_candidates(A0.all_instructions, A0.path_to_id)
+
+        # Fault attribution supersedes the pruning of every line which detects a fault
+        if a0_preprocessor_settings["fault_attribution"]:
+
+            attributed = preprocessor.attribute_faults()
+            log.info(f"Attributed {attributed} detected faults to the lines which detect them.")
+
+            A0.attribute_candidates(preprocessor.fault_attribution(), a0_preprocessor_settings["max_unique_faults"])
+
+        else:
+            preprocessor.prune_candidates(A0.all_instructions, A0.path_to_id)
+
         after_preprocessing = len(A0.all_instructions)
         percentage = round(((before_preprocessing - after_preprocessing) / before_preprocessing) * 100, 4)
 
         log.info(f"""Preprocessor finished, from {before_preprocessing} to {after_preprocessing} lines.
                  Search space reduced by {percentage}%.""")
 
+        if a0_preprocessor_settings["remove_unexecuted"] or a0_preprocessor_settings["order_by_tat"]:
+
+            A0.profile_candidates(preprocessor.line_profile(),
+                                  order_by_tat=bool(a0_preprocessor_settings["order_by_tat"]),
+                                  remove_unexecuted=bool(a0_preprocessor_settings["remove_unexecuted"]))
+
     else:
         log.info("Preprocessor phase skipped")
 
+    if A0.candidate_ordering:
+        log.info("Ordering candidates by their likelihood of removal.")
+        A0.order_candidates(preprocessor)
+
     # 2. Execution of A0
     with utils.Timer():
-        A0.run((init_tat, init_cov))
+        if coordinator:
+            A0.serve((init_tat, init_cov), coordinator)
+        else:
+            A0.run((init_tat, init_cov))
 
     # 3. Cleanup. Reapping stopped processes.
     A0.post_run()
@@ -54,8 +115,13 @@ def execute_a1xx(configuration: pathlib.Path):
 
     A1xx = a1xx.A1xx(pathlib.Path(ISA), asm_src, a1xx_settings)
 
+    # The trace DB and the line table do not depend on the fault list. They are built in the background, overlapping
+    # the initial fault simulation.
+    background = BackgroundPreprocessor(a1xx.PreprocessorA1xx, **a1xx_preprocessor_settings) \
+        if a1xx_preprocessor_settings['enabled'] else None
+
     # 1. Initial run for original STL for TaT and Coverage computation
-    init_tat, init_cov = A1xx.pre_run()
+    init_tat, init_cov = A1xx.pre_run(after_lsim=background.start if background else None)
     log.info(f"Initial STL stats are: TaT = {init_tat}, Coverage = {init_cov}.")
 
     if a1xx_preprocessor_settings['enabled']:
@@ -63,7 +129,7 @@ def execute_a1xx(configuration: pathlib.Path):
 
         # This is after pre_run, which means that the fault list
         # has been computed for the golden run and is available.
-        preprocessor = a1xx.PreprocessorA1xx(A1xx.fsim_report.fault_list, **a1xx_preprocessor_settings)
+        preprocessor = background.result(A1xx.fsim_report.fault_list)
 
         before_preprocessing = len(A1xx.all_instructions)
         A1xx.all_code_chunks = preprocessor.prune_candidates(A1xx.all_instructions,
@@ -76,6 +142,9 @@ def execute_a1xx(configuration: pathlib.Path):
         log.info(f"""Preprocessor finished, from {before_preprocessing} to {after_preprocessing} lines.
                  Search space reduced by {percentage}%.""")
 
+        if a1xx_preprocessor_settings["remove_unexecuted"]:
+            A1xx.profile_candidates(preprocessor.line_profile(), remove_unexecuted=True)
+
     else:
         log.info("Preprocessor phase skipped")
 
@@ -99,13 +168,25 @@ def main():
                         help="Increase verbosity level. Use -v for INFO, -vv for DEBUG, and -vvv for TRACE.")
     parser.add_argument("-l", "--logfile", action="store", default=None, required=False,
                         help="Specify a filename to store all >=DEBUG lvl messages.")
+    parser.add_argument("--coordinator", action="store", default=None, required=False, metavar="ADDRESS",
+                        help="Distributed A0. Serve the candidates to workers at ADDRESS (host:port or unix socket).")
+    parser.add_argument("--worker", action="store", default=None, required=False, metavar="ADDRESS",
+                        help="Distributed A0. Evaluate candidates served by the coordinator at ADDRESS.")
+    parser.add_argument("--sandbox", action="append", type=pathlib.Path, default=[], required=False,
+                        help="Worker only. Directory to be cloned into a private scratch directory e.g., the STL and "
+                             "simulation directories. Can be specified multiple times.")
 
     args = parser.parse_args()
 
     utils.setup_logger(args.verbose, args.logfile)
 
-    if args.compaction_mode == "A0":
-        execute_a0(args.configuration)
+    if (args.coordinator or args.worker) and args.compaction_mode != "A0":
+        parser.error("Distributed compaction is only supported for A0")
+
+    if args.worker:
+        execute_a0_worker(args.configuration, args.worker, args.sandbox)
+    elif args.compaction_mode == "A0":
+        execute_a0(args.configuration, args.coordinator)
     elif args.compaction_mode == "A1xx":
         execute_a1xx(args.configuration)
 
@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+import collections
+import csv
+import math
+import pathlib
+import re
+
+from testcrush.utils import get_logger
+from typing import Any, Hashable
+
+log = get_logger()
+
+# A signature is the tuple of (feature name, feature value) pairs of a candidate
+Signature = tuple[tuple[str, Hashable], ...]
+
+
+def bucket(count: int) -> int:
+    """
+    Logarithmic bucketing of counts i.e., 0, 1, 2-3, 4-7, ... map to 0, 1, 2, 3, ... respectively.
+
+    Args:
+        count (int): A non-negative count.
+
+    Returns:
+        int: The bucket of the count. At most 16.
+    """
+
+    return min(int(count).bit_length(), 16)
+
+
+def previous_verdicts(*statistics: pathlib.Path) -> dict[tuple[str, str], list[str]]:
+    """
+    Collects the verdicts of previous compactions from their statistics CSV files. Since line numbers change as lines
+    are removed, codelines are identified by their text.
+
+    Args:
+        statistics (pathlib.Path): A variadic number of statistics CSV files.
+
+    Returns:
+        dict[tuple[str, str], list[str]]: The ``Proceed`` or ``Restore`` verdicts, in order of appearance, per assembly
+        source name and codeline text.
+    """
+
+    verdicts = collections.defaultdict(list)
+
+    for csv_path in statistics:
+
+        with open(csv_path) as csv_file:
+
+            for row in csv.DictReader(csv_file):
+
+                match = re.match(r"\[#\d+\]: (.*)", row.get("removed_codeline") or "")
+
+                if match and row.get("verdict") in ("Proceed", "Restore"):
+                    verdicts[(row["asm_source"], match.group(1))].append(row["verdict"])
+
+    log.debug(f"Loaded the verdicts of {len(verdicts)} codelines from {statistics}")
+
+    return dict(verdicts)
+
+
+class CandidateRanker:
+    """
+    Orders the candidates of a compaction by their likelihood of being removable.
+
+    Each candidate is described by a signature of cheap, categorical features e.g., its mnemonic or (bucketed) number
+    of faults detected at its program counter during the golden run. The likelihood of removal is estimated by a naive
+    Bayes model whose counts are updated online with each verdict. Candidates sharing a signature share a score, hence
+    they are kept in per-signature queues and selecting the best candidate costs one score computation per distinct
+    signature. Ties are broken by insertion order, so shuffling the candidates beforehand preserves the randomness of
+    the original algorithm.
+    """
+
+    def __init__(self, smoothing: float = 1.0) -> 'CandidateRanker':
+
+        self.smoothing: float = smoothing
+
+        # Accepted / rejected removals, in total and per (feature, value)
+        self.totals: list[int] = [0, 0]
+        self.counts: dict[tuple[str, Hashable], list[int]] = collections.defaultdict(lambda: [0, 0])
+
+        # Distinct values of each feature
+        self.values: dict[str, set[Hashable]] = collections.defaultdict(set)
+
+        self._queues: dict[Signature, collections.deque] = dict()
+        self._pushed: int = 0
+        self._size: int = 0
+
+    def __len__(self) -> int:
+
+        return self._size
+
+    def push(self, candidate: Any, signature: Signature) -> None:
+        """
+        Adds a candidate.
+
+        Args:
+            candidate (Any): The candidate.
+            signature (Signature): The features of the candidate.
+
+        Returns:
+            None
+        """
+
+        for feature, value in signature:
+            self.values[feature].add(value)
+
+        self._queues.setdefault(signature, collections.deque()).append((self._pushed, candidate))
+        self._pushed += 1
+        self._size += 1
+
+    def score(self, signature: Signature) -> float:
+        """
+        Computes the log-odds of a removal being accepted.
+
+        Args:
+            signature (Signature): The features of the candidate.
+
+        Returns:
+            float: The log-odds. Positive if acceptance is more likely than rejection.
+        """
+
+        alpha = self.smoothing
+        accepted, rejected = self.totals
+
+        score = math.log((accepted + alpha) / (rejected + alpha))
+
+        for feature, value in signature:
+
+            k = alpha * len(self.values[feature])
+            value_accepted, value_rejected = self.counts.get((feature, value), (0, 0))
+
+            score += math.log((value_accepted + alpha) / (accepted + k)) - \
+                math.log((value_rejected + alpha) / (rejected + k))
+
+        return score
+
+    def pop(self) -> tuple[Any, Signature]:
+        """
+        Removes and returns the candidate most likely to be removable.
+
+        Returns:
+            tuple[Any, Signature]: The candidate and its signature.
+
+        Raises:
+            IndexError: If there are no candidates left.
+        """
+
+        if not self._size:
+            raise IndexError("pop from an empty CandidateRanker")
+
+        best = max(self._queues.items(), key=lambda item: (self.score(item[0]), -item[1][0][0]))[0]
+
+        queue = self._queues[best]
+        _, candidate = queue.popleft()
+
+        if not queue:
+            del self._queues[best]
+
+        self._size -= 1
+
+        return candidate, best
+
+    def drain(self) -> list[Any]:
+        """
+        Removes and returns all candidates, best first, without any updates in between.
+
+        Returns:
+            list[Any]: The candidates.
+        """
+
+        return [self.pop()[0] for _ in range(self._size)]
+
+    def update(self, signature: Signature, accepted: bool) -> None:
+        """
+        Updates the model with the verdict of a candidate.
+
+        Args:
+            signature (Signature): The features of the evaluated candidate.
+            accepted (bool): Whether the removal of the candidate was accepted.
+
+        Returns:
+            None
+        """
+
+        index = 0 if accepted else 1
+
+        self.totals[index] += 1
+
+        for feature, value in signature:
+
+            self.values[feature].add(value)
+            self.counts[(feature, value)][index] += 1
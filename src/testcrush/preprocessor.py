@@ -2,71 +2,320 @@
 # SPDX-License-Identifier: MIT
 
 import pathlib
-import csv
-import sqlite3
+import collections
+import concurrent.futures
+import contextlib
+import fractions
+import bz2
+import functools
+import gzip
+import hashlib
 import io
+import itertools
+import lzma
+import os
+import sqlite3
+import time
+import re
+import numpy
 
 import testcrush.grammars.transformers as transformers
-from testcrush.utils import get_logger, Singleton
+from testcrush.utils import get_logger, Singleton, addr2line_table
 from testcrush import zoix
+from typing import Any, Callable, Iterator
 
 log = get_logger()
 
+# Picoseconds per time unit
+_TIME_UNITS = {"fs": fractions.Fraction(1, 1000), "ps": 1, "ns": 10**3, "us": 10**6, "ms": 10**9, "s": 10**12}
+
+# Compression formats of trace files by magic bytes
+_MAGIC_BYTES = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz"}
+
+
+def to_picoseconds(value: str | int, unit: str = "ns") -> int:
+    """
+    Normalises a simulation time to an integer number of picoseconds e.g., ``"   10ns"``, ``"1.5 us"`` or ``"130"``
+    (in ``unit``).
+
+    Args:
+        value (str | int): The simulation time, with or without a unit.
+        unit (str, optional): The unit of unitless values. Defaults to "ns".
+
+    Returns:
+        int: The simulation time in picoseconds.
+
+    Raises:
+        ValueError: If the value is not a time or its unit is unknown.
+    """
+
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([a-z]*)\s*", str(value))
+
+    if not match or (match.group(2) or unit) not in _TIME_UNITS:
+        raise ValueError(f"Invalid simulation time {value!r}")
+
+    number, suffix = match.groups()
+
+    return round(fractions.Fraction(number) * _TIME_UNITS[suffix or unit])
+
+
+def to_address(value: str | int) -> int:
+    """
+    Normalises a hexadecimal program counter e.g., ``"0000015c"`` or ``"0x15c"`` to an integer.
+
+    Args:
+        value (str | int): The program counter.
+
+    Returns:
+        int: The program counter.
+
+    Raises:
+        ValueError: If the value is not hexadecimal.
+    """
+
+    return value if isinstance(value, int) else int(value.strip(), 16)
+
 
 class Preprocessor(metaclass=Singleton):
     """Superclass: Creates trace database and utils to query it"""
 
     _trace_db = ".trace.db"
+    _ingestion_chunksize = 64 << 20
 
     def __init__(self, fault_list: list[zoix.Fault], **kwargs) -> 'Preprocessor':
 
-        factory = transformers.TraceTransformerFactory()
-        parser = factory(kwargs.get("processor_name"))
-        processor_trace = kwargs.get("processor_trace")
+        self.processor_name: str = kwargs.get("processor_name")
+        self.processor_trace: str = kwargs.get("processor_trace")
 
-        with open(processor_trace) as src:
-            trace_raw = src.read()
-
-        self.trace = parser.parse(trace_raw)
         self.fault_list: list[zoix.Fault] = fault_list
         self.elf = kwargs.get("elf_file")
         self.zoix2trace = kwargs.get("zoix_to_trace")
+        self.pc_column: str = kwargs.get("pc_column") or "PC"
+        self.cycle_column: str = kwargs.get("cycle_column") or "Cycle"
+        self.history: int = kwargs.get("history") or 4
+        self.time_column: str = kwargs.get("time_column") or "Time"
+        self.time_unit: str = kwargs.get("time_unit") or "ns"
+
+        # Module path of a third-party trace tokenizer. Otherwise, the tokenizer of the processor is used
+        self.trace_tokenizer: str | None = kwargs.get("trace_tokenizer")
 
-        self._create_trace_db()
+        # Worker processes tokenizing chunks of the trace in parallel. The trace is tokenized sequentially by default
+        self.ingestion_workers: int = kwargs.get("ingestion_workers") or 1
+
+        # Typed columns, normalised on ingestion and in queries. The rest are stored as text
+        self._types: dict[str, Callable[[str], int]] = {
+            self.time_column: functools.partial(to_picoseconds, unit=self.time_unit),
+            self.pc_column: to_address,
+            self.cycle_column: int
+        }
+
+        # Trace columns loaded by trace_column() and (column names) -> (values) -> row indices lookups
+        self._columns: dict[str, numpy.ndarray] = dict()
+        self._rows: dict[tuple[str, ...], dict[tuple[str, ...], list[int]]] = dict()
+
+        # Address-to-line mapping of the ELF file, built by line_table()
+        self._lines: dict[int, tuple[str, int]] | None = None
+
+        # The database is either rebuilt on every run (default), kept in memory (":memory:") or, with a cache
+        # directory, reused by every run on the same trace.
+        self.trace_cache: pathlib.Path | None = pathlib.Path(kwargs["trace_cache"]) if kwargs.get("trace_cache") \
+            else None
+        self.trace_db: str = kwargs.get("trace_db") or self._trace_db
+
+        if self.trace_cache:
+
+            digest = trace_digest(self.processor_trace, self.processor_name, self.trace_tokenizer, self.time_column,
+                                  self.time_unit, self.pc_column, self.cycle_column)
+            self.trace_db = str(self.trace_cache / f"trace_{digest}.db")
+
+        self._con: sqlite3.Connection | None = None
+
+        if self.trace_cache and pathlib.Path(self.trace_db).exists():
+
+            log.debug(f"Reusing database {self.trace_db} of {self.processor_trace}.")
+            self._con = sqlite3.connect(self.trace_db, check_same_thread=False)
+
+        else:
+
+            self._create_trace_db()
 
     def _create_trace_db(self):
         """
-        Transforms the trace of the DUT to a SQLite database of a single table. The header of the CSV is mapped to the
-        DB column names and then the CSV body is transformed into DB row entries.
+        Transforms the trace of the DUT to a SQLite database of a single table. The columns of the trace tokenizer are
+        mapped to the DB column names and then the tokenized trace is streamed into DB row entries.
         """
 
-        # If pre-existent db is found, delete it.
-        db = pathlib.Path(self._trace_db)
-        if db.exists():
-            log.debug(f"Database {self._trace_db} exists. Overwritting it.")
-            db.unlink()
+        tokenizer = transformers.TraceTokenizerFactory()(self.processor_name, self.trace_tokenizer)
+
+        if self.trace_db == ":memory:":
+
+            con = sqlite3.connect(":memory:", check_same_thread=False)
+            self._ingest(con, tokenizer)
+
+        else:
+
+            db = pathlib.Path(self.trace_db)
+
+            # Cached databases are built aside so that an interrupted ingestion is never reused
+            staging = db.with_name(f"{db.name}.tmp") if self.trace_cache else db
+
+            if self.trace_cache:
+                db.parent.mkdir(parents=True, exist_ok=True)
+
+            # If pre-existent db is found, delete it.
+            if staging.exists():
+                log.debug(f"Database {staging} exists. Overwritting it.")
+                staging.unlink()
+
+            con = sqlite3.connect(staging)
+            self._ingest(con, tokenizer)
+            con.close()
+
+            if staging != db:
+                staging.replace(db)
+
+            con = sqlite3.connect(db, check_same_thread=False)
+
+        self._con = con
+
+        log.debug(f"Database {self.trace_db} created.")
+
+        self._columns = dict()
+        self._rows = dict()
+
+    def _typed(self, column: str, value: Any) -> Any:
+        """
+        Normalises a value of a column e.g., a simulation time to picoseconds. Values of untyped columns are returned
+        as-is and values which cannot be normalised as ``None``.
+
+        Args:
+            column (str): The column name.
+            value (Any): The value.
+
+        Returns:
+            Any: The normalised value.
+        """
+
+        convert = self._types.get(column)
+
+        return value if convert is None else _convert(convert, value)
+
+    def _ingest(self, con: sqlite3.Connection, tokenizer: transformers.TraceTokenizer) -> None:
+        """
+        Creates the trace table and inserts the rows of the tokenized trace, without loading the trace in memory. The
+        time, program counter and cycle columns are normalised to integers and stored with ``INTEGER`` affinity. The
+        time and program counter columns are indexed.
+
+        With more than one ``ingestion_workers``, the trace is split at line boundaries into chunks which are
+        tokenized and normalised by a pool of worker processes, into columnar batches. The batches are inserted in
+        trace order.
+
+        Args:
+            con (sqlite3.Connection): The connection to the database.
+            tokenizer (transformers.TraceTokenizer): The tokenizer of the trace.
+
+        Returns:
+            None
+        """
 
-        con = sqlite3.connect(self._trace_db)
         cursor = con.cursor()
 
-        header: list[str] = self.trace[0].split(',')
-        header = list(map(lambda column_name: f"\"{column_name}\"", header))
-        header = ", ".join(header)
+        # The database is rebuilt from scratch if interrupted, hence no need for a rollback journal
+        cursor.execute("PRAGMA journal_mode = OFF")
+        cursor.execute("PRAGMA synchronous = OFF")
+
+        header: list[str] = list(tokenizer.columns)
+        columns = [f"\"{column}\" INTEGER" if column in self._types else f"\"{column}\"" for column in header]
 
-        cursor.execute(f"CREATE TABLE trace({header})")
+        cursor.execute(f"CREATE TABLE trace({', '.join(columns)})")
 
-        body: list[str] = self.trace[1:]
+        insert = f"INSERT INTO trace VALUES ({', '.join(['?'] * len(header))})"
 
-        with io.StringIO('\n'.join(body)) as source:
+        if self.ingestion_workers > 1:
 
-            for row in csv.reader(source):
+            converters = [(index, self._types[column]) for index, column in enumerate(header) if column in self._types]
 
-                cursor.execute(f"INSERT INTO trace VALUES ({', '.join(['?'] * len(row))})", row)
+            for batch in self._tokenize_parallel(converters):
+                cursor.executemany(insert, zip(*batch))
+
+        else:
+
+            typed = [(index, column) for index, column in enumerate(header) if column in self._types]
+
+            def rows(tokens: Iterator[list[str]]):
+
+                for row in tokens:
+
+                    for index, column in typed:
+                        row[index] = self._typed(column, row[index])
+
+                    yield row
+
+            with open_trace(self.processor_trace) as source:
+                cursor.executemany(insert, rows(tokenizer.tokenize(source)))
+
+        # Fault attributes are looked up by <time,pc>
+        if self.time_column in header and self.pc_column in header:
+            cursor.execute(f'CREATE INDEX trace_time_pc ON trace("{self.time_column}", "{self.pc_column}")')
 
         con.commit()
-        con.close()
 
-        log.debug(f"Database {self._trace_db} created.")
+    def _tokenize_parallel(self, converters: list[tuple[int, Callable[[str], Any]]]) -> Iterator[list[list[Any]]]:
+        """
+        Tokenizes the chunks of the trace in worker processes. At most two chunks per worker are in flight, so that
+        the memory footprint is bound by the chunk size rather than by the size of the trace. Plain traces are split
+        into byte ranges which the workers read on their own. Compressed traces are decompressed as a stream and their
+        lines are sent to the workers instead.
+
+        Args:
+            converters (list[tuple[int, Callable[[str], Any]]]): The index and normaliser of each typed column.
+
+        Yields:
+            list[list[Any]]: The columns of the rows of each chunk, in trace order.
+        """
+
+        with contextlib.ExitStack() as stack:
+
+            if trace_compression(self.processor_trace):
+
+                source = stack.enter_context(open_trace(self.processor_trace))
+
+                header = next((line for line in source if line.strip()), "")
+                chunks = iter(functools.partial(source.readlines, self._ingestion_chunksize), [])
+
+            else:
+                header, chunks = trace_chunks(self.processor_trace, self._ingestion_chunksize)
+
+            tokenize = functools.partial(_tokenize_chunk, self.processor_trace, header,
+                                         (self.processor_name, self.trace_tokenizer), converters)
+
+            executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(self.ingestion_workers))
+
+            pending = collections.deque()
+
+            for chunk in chunks:
+
+                pending.append(executor.submit(tokenize, chunk))
+
+                if len(pending) >= 2 * self.ingestion_workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns:
+            sqlite3.Connection: The connection to the trace database.
+
+        Raises:
+            FileNotFoundError: If the trace database has not been created.
+        """
+
+        if self._con is None:
+            raise FileNotFoundError("Trace DB not found")
+
+        return self._con
 
     def query_trace_db(self, select: str, where: dict[str, str],
                        history: int = 5, allow_multiple: bool = False) -> list[tuple[str, ...]]:
@@ -101,10 +350,6 @@ class Preprocessor(metaclass=Singleton):
             list[tuple[str, ...]: A list of query results (tuples of strings) matching the criteria.
         """
 
-        db = pathlib.Path(self._trace_db)
-        if not db.exists():
-            raise FileNotFoundError("Trace DB not found")
-
         columns = where.keys()
 
         query = f"""
@@ -113,8 +358,8 @@ class Preprocessor(metaclass=Singleton):
             WHERE {' AND '.join([f'{x} = ?' for x in columns])}
         """
 
-        values = where.values()
-        with sqlite3.connect(db) as con:
+        values = [self._typed(column, value) for column, value in where.items()]
+        with self._connection() as con:
 
             cursor = con.cursor()
 
@@ -128,17 +373,597 @@ class Preprocessor(metaclass=Singleton):
                 raise ValueError(f"Query resulted in multiple ROWIDs for \
 {', '.join([f'{k}={v}' for k, v in where.items()])}")
 
+            query_with_history = f"""
+                SELECT {'"'+select+'"' if select != '*' else select} FROM trace
+                WHERE ROWID <= ?
+                ORDER BY ROWID DESC
+                LIMIT ?
+            """
+
             result = list()
             for rowid, in rowids:
 
-                query_with_history = f"""
-                    SELECT {'"'+select+'"' if select != '*' else select} FROM trace
-                    WHERE ROWID <= ?
-                    ORDER BY ROWID DESC
-                    LIMIT ?
-                """
-
-            cursor.execute(query_with_history, (rowid, history))
-            result += cursor.fetchall()[::-1]
+                cursor.execute(query_with_history, (rowid, history))
+                result += cursor.fetchall()[::-1]
 
             return result
+
+    def line_table(self) -> dict[int, tuple[str, int]]:
+        """
+        Builds the address-to-line mapping of the ELF file once and caches it.
+
+        Returns:
+            dict[int, tuple[str, int]]: The mapping of program counters to assembly source names and line numbers.
+        """
+
+        if self._lines is None:
+
+            self._lines = addr2line_table(self.elf)
+
+            if not self._lines:
+                log.warning(f"No line table found in {self.elf}.")
+
+        return self._lines
+
+    def index(self) -> None:
+        """
+        Builds everything which is independent of the fault list i.e., the line table of the ELF file and the trace
+        columns of the program counter and of the fault attributes, which are looked up by the instruction windows.
+        """
+
+        self.line_table()
+
+        for column in {self.pc_column} | set((self.zoix2trace or dict()).values()):
+            self.trace_column(column)
+
+    def trace_column(self, column: str) -> numpy.ndarray:
+        """
+        Loads a column of the trace, in trace order. Columns are loaded once and cached.
+
+        Args:
+            column (str): The column name.
+
+        Returns:
+            numpy.ndarray: The values of the column.
+        """
+
+        if column not in self._columns:
+
+            with self._connection() as con:
+
+                cursor = con.cursor()
+                cursor.execute(f'SELECT "{column}" FROM trace ORDER BY ROWID')
+
+                values = [value for (value,) in cursor.fetchall()]
+                self._columns[column] = numpy.array(values, dtype=None if column in self._types else str)
+
+            log.debug(f"Loaded column {column} of the trace ({len(self._columns[column])} rows)")
+
+        return self._columns[column]
+
+    def query_trace_windows(self, where: list[dict[str, str]], history: int | None = None,
+                            select: str | None = None) -> set[Any]:
+        """
+        Vectorized counterpart of ``query_trace_db()`` for many queries at once. The ``select`` column is loaded once
+        and the window of every row matching any of the ``where`` conditions is extracted by array slicing. Rows
+        matching multiple times are all considered.
+
+        Args:
+            where (list[dict[str, str]]): The conditions. Each one is a mapping of column names to values.
+            history (int | None, optional): The size of each window i.e., the matching row and the ``history - 1``
+                                            rows before it. Defaults to ``self.history``.
+            select (str | None, optional): The column of the windows. Defaults to ``self.pc_column``.
+
+        Returns:
+            set[Any]: The distinct values of ``select`` within the windows e.g., integer program counters.
+        """
+
+        history = history or self.history
+        values = self.trace_column(select or self.pc_column)
+
+        hits = list()
+        for entry in where:
+
+            columns = tuple(entry.keys())
+
+            if columns not in self._rows:
+
+                lookup = dict()
+                for index, key in enumerate(zip(*[self.trace_column(column).tolist() for column in columns])):
+                    lookup.setdefault(key, list()).append(index)
+
+                self._rows[columns] = lookup
+
+            rows = self._rows[columns].get(tuple(self._typed(column, value) for column, value in entry.items()))
+
+            if not rows:
+                log.debug(f"No row found for {', '.join([f'{k}={v}' for k, v in entry.items()])}")
+                continue
+
+            hits += rows
+
+        if not hits:
+            return set()
+
+        # (hits, history) matrix of row indices, from each hit backwards
+        windows = numpy.array(hits)[:, None] - numpy.arange(history)[None, :]
+
+        # Values which could not be normalised are not part of any window
+        return set(values[windows[windows >= 0]].tolist()) - {None}
+
+    def execution_counts(self, column: str = "PC") -> dict[Any, int]:
+        """
+        Counts the occurrences of each value of a column of the trace e.g., the execution count of each program counter.
+
+        Args:
+            column (str, optional): The column name. Defaults to "PC".
+
+        Returns:
+            dict[Any, int]: The number of rows of the trace for each value of ``column``.
+        """
+
+        with self._connection() as con:
+
+            cursor = con.cursor()
+            cursor.execute(f'SELECT "{column}", COUNT(*) FROM trace GROUP BY "{column}"')
+
+            return dict(cursor.fetchall())
+
+    def cycle_contributions(self, column: str = "PC", cycle_column: str = "Cycle") -> dict[Any, int]:
+        """
+        Sums the cycles spent on each value of a column of the trace e.g., the cycles contributed to the test
+        application time by each program counter. The cycles of a row are those elapsed until the next row i.e.,
+        until the next instruction retires. The last row contributes a single cycle.
+
+        Args:
+            column (str, optional): The column name. Defaults to "PC".
+            cycle_column (str, optional): The column name of the clock cycle count. Defaults to "Cycle".
+
+        Returns:
+            dict[Any, int]: The number of cycles for each value of ``column``.
+        """
+
+        query = f"""
+            SELECT "{column}", SUM(cycles) FROM (
+                SELECT "{column}",
+                       COALESCE(LEAD("{cycle_column}") OVER (ORDER BY ROWID) - "{cycle_column}", 1) AS cycles
+                FROM trace
+            )
+            GROUP BY "{column}"
+        """
+
+        with self._connection() as con:
+
+            cursor = con.cursor()
+            cursor.execute(query)
+
+            return dict(cursor.fetchall())
+
+    def line_profile(self) -> dict[tuple[str, int], tuple[int, int]]:
+        """
+        Maps the execution counts and cycle contributions of the program counters of the trace to the lines of the
+        assembly sources through the DWARF line table of the ELF file.
+
+        Returns:
+            dict[tuple[str, int], tuple[int, int]]: The execution count (index-0) and cycles (index-1) for each
+            assembly source name and 1-based line number. Lines which are never executed are omitted.
+        """
+
+        lines = self.line_table()
+
+        executions = self.execution_counts(self.pc_column)
+        cycles = self.cycle_contributions(self.pc_column, self.cycle_column)
+
+        profile = dict()
+        for pc, count in executions.items():
+
+            line = lines.get(pc)
+
+            if line is None:
+                log.debug(f"Program counter {pc} not found in the line table of {self.elf}")
+                continue
+
+            previous_count, previous_cycles = profile.get(line, (0, 0))
+            profile[line] = (previous_count + count, previous_cycles + cycles.get(pc, 0))
+
+        return profile
+
+    def attribute_faults(self, history: int | None = None) -> int:
+        """
+        Attributes each detected fault of the fault list to the lines of the assembly sources which detect it. That
+        is, the window of ``history`` instructions which retired up to the fault's <time,pc> attributes (see
+        ``query_trace_windows()``), mapped to lines through the DWARF line table of the ELF file. The attribution is
+        stored in the ``attribution(fault, source, line)`` table of the trace DB, indexed by both fault and line.
+        Faults without attributes, whose attributes are not found in the trace or whose window maps to no line are not
+        attributed.
+
+        Args:
+            history (int | None, optional): The size of the instruction window of each fault. Defaults to
+                                            ``self.history``.
+
+        Returns:
+            int: The number of attributed faults.
+        """
+
+        lines = self.line_table()
+
+        # Faults sharing the same <time,pc> attributes share the same window
+        windows = dict()
+        rows = list()
+        for index, fault in enumerate(self.fault_list):
+
+            if not hasattr(fault, "fault_attributes"):
+                continue
+
+            entry = {self.zoix2trace[k]: fault.fault_attributes[k] for k in self.zoix2trace.keys()}
+            key = tuple(entry.items())
+
+            if key not in windows:
+
+                window = set()
+                for pc in self.query_trace_windows([entry], history):
+
+                    line = lines.get(pc)
+
+                    if line is not None:
+                        window.add(line)
+
+                windows[key] = window
+
+            rows += [(index, source, line) for source, line in windows[key]]
+
+        with self._connection() as con:
+
+            cursor = con.cursor()
+            cursor.execute("DROP TABLE IF EXISTS attribution")
+            cursor.execute("CREATE TABLE attribution(fault INTEGER, source TEXT, line INTEGER)")
+            cursor.executemany("INSERT INTO attribution VALUES (?, ?, ?)", rows)
+            cursor.execute("CREATE INDEX attribution_fault ON attribution(fault)")
+            cursor.execute("CREATE INDEX attribution_line ON attribution(source, line)")
+
+            cursor.execute("SELECT COUNT(DISTINCT fault) FROM attribution")
+            attributed, = cursor.fetchone()
+
+        log.debug(f"Attributed {attributed} faults to {len(rows)} (fault, line) pairs")
+
+        return attributed
+
+    def attributed_faults(self, source: str, line: int, unique: bool = False) -> list[int]:
+        """
+        Queries the fault attribution (see ``attribute_faults()``) for the faults detected by a line.
+
+        Args:
+            source (str): The assembly source name.
+            line (int): The 1-based line number.
+            unique (bool, optional): Whether to only return the faults detected by no other line. Defaults to False.
+
+        Returns:
+            list[int]: The indices of the faults in the fault list.
+        """
+
+        query = "SELECT fault FROM attribution AS a WHERE source = ? AND line = ?"
+
+        if unique:
+            query += """ AND NOT EXISTS (
+                SELECT 1 FROM attribution AS b
+                WHERE b.fault = a.fault AND (b.source != a.source OR b.line != a.line)
+            )"""
+
+        with self._connection() as con:
+
+            cursor = con.cursor()
+            cursor.execute(query + " ORDER BY fault", (source, line))
+
+            return [fault for (fault,) in cursor.fetchall()]
+
+    def fault_attribution(self) -> dict[tuple[str, int], tuple[int, int]]:
+        """
+        Summarizes the fault attribution (see ``attribute_faults()``) per line.
+
+        Returns:
+            dict[tuple[str, int], tuple[int, int]]: The number of attributed faults (index-0) and of uniquely detected
+            faults (index-1) for each assembly source name and 1-based line number. Lines without any attributed
+            faults are omitted.
+        """
+
+        query = """
+            SELECT source, line, COUNT(*), SUM(detectors = 1)
+            FROM attribution JOIN (
+                SELECT fault, COUNT(*) AS detectors FROM attribution GROUP BY fault
+            ) USING (fault)
+            GROUP BY source, line
+        """
+
+        with self._connection() as con:
+
+            cursor = con.cursor()
+            cursor.execute(query)
+
+            return {(source, line): (faults, unique) for source, line, faults, unique in cursor.fetchall()}
+
+
+class BackgroundPreprocessor:
+    """
+    Builds a preprocessor in a background thread. The trace DB and the line table of the ELF file do not depend on the
+    fault report, hence they can be built while the baseline fault simulation is running. Only the fault list is
+    handed over once available.
+
+    To be used as:
+
+    .. code-block:: python
+
+        background = BackgroundPreprocessor(PreprocessorA0, **preprocessor_settings)
+
+        # As soon as the trace and the ELF file of the STL exist e.g., after the initial logic simulation
+        background.start()
+
+        # Waits for the trace DB and the line table
+        preprocessor = background.result(fault_list)
+    """
+
+    def __init__(self, preprocessor: type[Preprocessor], **settings) -> 'BackgroundPreprocessor':
+
+        self.preprocessor = preprocessor
+        self.settings = settings
+
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._future: concurrent.futures.Future | None = None
+
+    def _build(self) -> Preprocessor:
+
+        start = time.perf_counter()
+
+        preprocessor = self.preprocessor([], **self.settings)
+        preprocessor.index()
+
+        log.debug(f"Preprocessor built in the background in {time.perf_counter() - start:.2f}s.")
+
+        return preprocessor
+
+    def start(self) -> None:
+        """Starts building the preprocessor. Subsequent calls have no effect."""
+
+        if self._future is not None:
+            return
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="preprocessor")
+        self._future = self._executor.submit(self._build)
+
+    def result(self, fault_list: list[zoix.Fault]) -> Preprocessor:
+        """
+        Waits for the preprocessor, which is built in the foreground if it has never been started.
+
+        Args:
+            fault_list (list[zoix.Fault]): The fault list of the baseline fault simulation.
+
+        Returns:
+            Preprocessor: The preprocessor of the fault list.
+
+        Raises:
+            Exception: Any exception raised while building the preprocessor.
+        """
+
+        self.start()
+
+        start = time.perf_counter()
+
+        try:
+            preprocessor = self._future.result()
+        finally:
+            self._executor.shutdown()
+
+        log.debug(f"Waited {time.perf_counter() - start:.2f}s for the preprocessor.")
+
+        preprocessor.fault_list = fault_list
+
+        return preprocessor
+
+
+def trace_digest(processor_trace: str | pathlib.Path, *settings: Any, chunksize: int = 1 << 20) -> str:
+    """
+    Computes the digest which identifies the database of a trace.
+
+    Args:
+        processor_trace (str | pathlib.Path): The trace file.
+        settings (Any): A variadic number of settings which affect the database e.g., the processor name i.e., the
+                        trace tokenizer, or the names of the typed columns.
+        chunksize (int, optional): The number of bytes hashed at a time. Defaults to 1MiB.
+
+    Returns:
+        str: The SHA-256 hex digest of the settings and of the contents of the trace.
+    """
+
+    digest = hashlib.sha256('\n'.join(str(setting) for setting in settings + ("",)).encode())
+
+    with open(processor_trace, "rb") as src:
+
+        while chunk := src.read(chunksize):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def trace_compression(processor_trace: str | pathlib.Path) -> str | None:
+    """
+    Detects the compression format of a trace file by its magic bytes, regardless of its extension.
+
+    Args:
+        processor_trace (str | pathlib.Path): The trace file.
+
+    Returns:
+        str | None: ``"gzip"``, ``"zstd"``, ``"bz2"``, ``"xz"`` or ``None`` if the trace is not compressed.
+    """
+
+    with open(processor_trace, "rb") as src:
+        magic = src.read(max(len(magic) for magic in _MAGIC_BYTES))
+
+    return next((compression for prefix, compression in _MAGIC_BYTES.items() if magic.startswith(prefix)), None)
+
+
+def open_trace(processor_trace: str | pathlib.Path) -> io.TextIOBase:
+    """
+    Opens a trace file for reading in text mode. Compressed traces are decompressed on the fly, as they are read.
+    Zstandard requires the optional ``zstandard`` package.
+
+    Args:
+        processor_trace (str | pathlib.Path): The trace file, plain or compressed.
+
+    Returns:
+        io.TextIOBase: The trace, line by line.
+
+    Raises:
+        ModuleNotFoundError: If the trace is compressed with Zstandard and ``zstandard`` is not installed.
+    """
+
+    compression = trace_compression(processor_trace)
+
+    match compression:
+
+        case "gzip":
+            return gzip.open(processor_trace, "rt")
+
+        case "bz2":
+            return bz2.open(processor_trace, "rt")
+
+        case "xz":
+            return lzma.open(processor_trace, "rt")
+
+        case "zstd":
+
+            try:
+                import zstandard
+            except ModuleNotFoundError as error:
+                raise ModuleNotFoundError(f"{processor_trace} is compressed with Zstandard. Install zstandard "
+                                          "(pip install testcrush[zstd]) to read it.") from error
+
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(processor_trace, "rb"),
+                                                                               closefd=True))
+
+    return open(processor_trace)
+
+
+def trace_chunks(processor_trace: str | pathlib.Path, chunksize: int) -> tuple[str, Iterator[tuple[int, int]]]:
+    """
+    Splits a trace file into byte ranges of about ``chunksize`` bytes, at line boundaries. The header i.e., the first
+    non-blank line, is not part of any range.
+
+    Args:
+        processor_trace (str | pathlib.Path): The trace file.
+        chunksize (int): The size of each range in bytes. Ranges end at the first newline after it.
+
+    Returns:
+        tuple[str, Iterator[tuple[int, int]]]: The header and the (start, end) offsets of the ranges.
+    """
+
+    size = os.path.getsize(processor_trace)
+
+    with open(processor_trace, "rb") as src:
+
+        header = src.readline()
+        while header and not header.strip():
+            header = src.readline()
+
+        start = src.tell()
+
+    def chunks() -> Iterator[tuple[int, int]]:
+
+        nonlocal start
+
+        with open(processor_trace, "rb") as src:
+
+            while start < size:
+
+                src.seek(min(start + chunksize, size))
+                src.readline()
+
+                end = src.tell()
+                yield start, end
+                start = end
+
+    return header.decode(), chunks()
+
+
+def _tokenize_chunk(processor_trace: str | pathlib.Path, header: str, tokenizer: tuple[str, str | None],
+                    converters: list[tuple[int, Callable[[str], Any]]],
+                    chunk: tuple[int, int] | list[str]) -> list[list[Any]]:
+    """
+    Tokenizes and normalises a byte range or the lines of a trace in a worker process.
+
+    Args:
+        processor_trace (str | pathlib.Path): The trace file.
+        header (str): The header of the trace.
+        tokenizer (tuple[str, str | None]): The processor name and the module path of the trace tokenizer.
+        converters (list[tuple[int, Callable[[str], Any]]]): The index and normaliser of each typed column.
+        chunk (tuple[int, int] | list[str]): The (start, end) offsets of the range or the lines themselves.
+
+    Returns:
+        list[list[Any]]: The columns of the rows of the range.
+    """
+
+    tokenizer = transformers.TraceTokenizerFactory()(*tokenizer)
+
+    if isinstance(chunk, list):
+        lines = chunk
+
+    else:
+
+        start, end = chunk
+
+        with open(processor_trace, "rb") as src:
+
+            src.seek(start)
+            lines = src.read(end - start).decode().splitlines(keepends=True)
+
+    rows = list(tokenizer.tokenize(itertools.chain([header], lines)))
+    columns = [list(column) for column in zip(*rows)] if rows else [list() for _ in tokenizer.columns]
+
+    for index, convert in converters:
+        columns[index] = [_convert(convert, value) for value in columns[index]]
+
+    return columns
+
+
+def _convert(convert: Callable[[str], Any], value: Any) -> Any:
+    """
+    Args:
+        convert (Callable[[str], Any]): The normaliser of a typed column.
+        value (Any): The value.
+
+    Returns:
+        Any: The normalised value or ``None`` if it cannot be normalised.
+    """
+
+    try:
+        return convert(value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def bisect_removal(batch: list[Any], attempt: Callable[[list[Any]], bool]) -> list[Any]:
+    """
+    Removes as many candidates of a batch as possible with as few evaluations as possible. The whole batch is
+    attempted first. If its removal is rejected, each half is attempted recursively, down to single candidates.
+
+    Args:
+        batch (list[Any]): The candidates.
+        attempt (Callable[[list[Any]], bool]): Removes a part of the batch and evaluates the STL. The removal must be
+                                               kept if accepted and reverted otherwise. Returns whether it was
+                                               accepted.
+
+    Returns:
+        list[Any]: The removed candidates.
+    """
+
+    if not batch:
+        return list()
+
+    if attempt(batch):
+        return list(batch)
+
+    if len(batch) == 1:
+        return list()
+
+    middle = len(batch) // 2
+
+    # The second half is attempted on top of the accepted part of the first one
+    return bisect_removal(batch[:middle], attempt) + bisect_removal(batch[middle:], attempt)
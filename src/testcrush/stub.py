@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+import pathlib
+import random
+import re
+
+from testcrush import zoix
+from testcrush.utils import get_logger
+
+log = get_logger()
+
+# Mnemonic -> cycles
+CYCLES = {"addi": 1, "xori": 1, "ori": 1, "andi": 1, "slli": 1, "srli": 1, "lui": 1, "add": 1, "sub": 1, "xor": 1,
+          "and": 1, "or": 1, "sll": 1, "lw": 2, "sw": 2, "mul": 3, "mulh": 3, "div": 35, "rem": 35}
+
+
+def generate_stl(lines: int, seed: int = 0) -> list[str]:
+    """
+    Generates the lines of a synthetic, straight-line RISC-V STL. Every instruction is unique, hence it can be
+    identified by its text alone.
+
+    Args:
+        lines (int): Number of instructions.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        list[str]: The instructions.
+    """
+
+    rng = random.Random(seed)
+
+    register_register = ["add", "sub", "xor", "and", "or", "sll", "mul", "mulh", "div", "rem"]
+    register_immediate = ["addi", "xori", "ori", "andi"]
+
+    stl = list()
+    seen = set()
+
+    while len(stl) < lines:
+
+        kind = rng.random()
+        rd, rs1, rs2 = (rng.randint(1, 31) for _ in range(3))
+
+        if kind < 0.4:
+            line = f"{rng.choice(register_immediate)} x{rd}, x{rs1}, {rng.randint(-2048, 2047)}"
+        elif kind < 0.7:
+            line = f"{rng.choice(register_register)} x{rd}, x{rs1}, x{rs2}"
+        elif kind < 0.8:
+            line = f"{rng.choice(['slli', 'srli'])} x{rd}, x{rs1}, {rng.randint(0, 31)}"
+        elif kind < 0.9:
+            line = f"lui x{rd}, {rng.randint(0, 0xfffff)}"
+        else:
+            line = f"{rng.choice(['lw', 'sw'])} x{rd}, {4 * rng.randint(-512, 511)}(x{rs1})"
+
+        if line not in seen:
+            seen.add(line)
+            stl.append(line)
+
+    return stl
+
+
+class SyntheticFaultModel:
+    """
+    Deterministic fault model of an STL.
+
+    Each fault is detected by a small random set of instructions (its *detectors*). A fault is detected by the STL if
+    any of its detectors is present. Hence, the sole detector of a fault is essential i.e., its removal decreases the
+    coverage. The test application time of the STL is the sum of the cycles of its instructions.
+    """
+
+    def __init__(self, stl: list[str], faults: int | None = None, max_detectors: int = 3,
+                 seed: int = 0) -> 'SyntheticFaultModel':
+
+        rng = random.Random(seed)
+
+        self.lines: dict[str, int] = {line: i for i, line in enumerate(stl)}
+        self.cycles: list[int] = [CYCLES.get(line.split()[0], 1) for line in stl]
+
+        faults = faults if faults is not None else 2 * len(stl)
+
+        # Faults are detected by instructions in the vicinity of each other
+        self.detectors: list[list[int]] = list()
+        for _ in range(faults):
+
+            first = rng.randrange(len(stl))
+            self.detectors.append(sorted({min(first + rng.randrange(16), len(stl) - 1)
+                                          for _ in range(rng.randint(1, max_detectors))}))
+
+    def present(self, *sources: pathlib.Path) -> set[int]:
+        """
+        Returns the instructions of the model which are present in the assembly sources.
+
+        Args:
+            sources (pathlib.Path): The assembly sources.
+
+        Returns:
+            set[int]: The indices of the present instructions.
+        """
+
+        present = set()
+
+        for source in sources:
+
+            with open(source) as asm_file:
+
+                for line in asm_file:
+
+                    index = self.lines.get(re.sub(r'\s+', ' ', line.strip()))
+
+                    if index is not None:
+                        present.add(index)
+
+        return present
+
+    def test_application_time(self, present: set[int]) -> int:
+
+        return sum(self.cycles[i] for i in present)
+
+    def detected(self, present: set[int]) -> list[bool]:
+
+        return [any(i in present for i in detectors) for detectors in self.detectors]
+
+
+class StubZoixInvoker(zoix.ZoixInvoker):
+    """
+    Deterministic stand-in of VCS/Z01X driven by a ``SyntheticFaultModel``.
+
+    Instead of executing the instructions of the configuration file, the stub reads the current assembly sources,
+    prints the test application time on logic simulation and writes a Z01X-format fault report on fault simulation.
+    Everything else i.e., the scheduling, the parsing of the simulator output and of the fault report, is the actual
+    ``ZoixInvoker`` and ``TxtFaultReport`` code. Errors and timeouts can be injected by listing instructions in
+    ``failures``.
+    """
+
+    def __init__(self, model: SyntheticFaultModel, sources: list[pathlib.Path], fault_report: pathlib.Path,
+                 scheduler: zoix.JobScheduler | None = None) -> 'StubZoixInvoker':
+
+        super().__init__(scheduler)
+
+        self.model: SyntheticFaultModel = model
+        self.sources: list[pathlib.Path] = [pathlib.Path(source) for source in sources]
+        self.fault_report: pathlib.Path = pathlib.Path(fault_report)
+
+        # instruction -> (stdout, stderr) to be returned instead of simulating
+        self.failures: dict[str, tuple[str, str]] = dict()
+
+        self.invocations: dict[str, int] = dict.fromkeys(zoix.JobScheduler.KINDS, 0)
+
+    def _lsim(self) -> tuple[str, str]:
+
+        tat = self.model.test_application_time(self.model.present(*self.sources))
+
+        return (f"test application time = {tat}\nEXIT SUCCESS\n", "")
+
+    def _fsim(self) -> tuple[str, str]:
+
+        detected = self.model.detected(self.model.present(*self.sources))
+
+        lines = ['StatusGroups {',
+                 '    DT "Detected" (ON);',
+                 '    NO "Not Observed" (NO);',
+                 '}',
+                 'Coverage {',
+                 '    "Fault Coverage" = "DT/(DT + NO)";',
+                 '}',
+                 'FaultList SAF {']
+
+        for fault, is_detected in enumerate(detected):
+
+            site = f'{{PORT "tb_top.dut.U{fault // 2}.{"AZ"[fault % 2]}"}}'
+
+            if is_detected:
+                lines.append(f'    <  1> ON {fault % 2} {site}(* "test1"->PC_ID={4 * fault:08x}; '
+                             f'"test1"->sim_time="{10 * fault:>7}ns"; *)')
+            else:
+                lines.append(f'    <  1> NO {fault % 2} {site}')
+
+        lines.append('}')
+
+        with open(self.fault_report, 'w') as report:
+            report.write('\n'.join(lines) + '\n')
+
+        return ("", "")
+
+    def _execute(self, kind: str, instruction: str, timeout: float = None) -> tuple[str, str]:
+
+        def simulate(instruction: str, timeout: float = None) -> tuple[str, str]:
+
+            self.invocations[kind] += 1
+
+            if instruction in self.failures:
+                return self.failures[instruction]
+
+            if kind == "lsim":
+                return self._lsim()
+
+            elif kind == "fsim":
+                return self._fsim()
+
+            return ("", "")
+
+        return self.scheduler.run(kind, simulate, instruction, timeout=timeout)
@@ -3,6 +3,10 @@
 
 import time
 import re
+import shlex
+import collections.abc
+import concurrent.futures
+import graphlib
 import logging
 import sys
 import shutil
@@ -12,6 +16,8 @@ import zipfile
 import os
 import psutil
 
+from typing import Any
+
 # # # # # # # # # # # # # # # # # # # # # #
 #    __                   _               #
 #   / /  ___   __ _  __ _(_)_ __   __ _   #
@@ -100,8 +106,8 @@ def to_snake_case(name: str) -> str:
 
 def compile_assembly(*instructions, exit_on_error: bool = False) -> bool:
     """
-    Executes a sequence of bash instructions to compile the `self.asm_file`. Uses subprocess for each instruction and
-    optionally exits on error.
+    Executes a sequence of instructions to compile the `self.asm_file`. Uses a subprocess for each instruction (see
+    ``spawn()``) and optionally exits on error.
 
     Args:
         exit_on_error (bool): If an error is encountered during compilation and this is True, then the program
@@ -121,9 +127,7 @@ def compile_assembly(*instructions, exit_on_error: bool = False) -> bool:
 
         log.debug(f"Executing instruction \"{cmd}\".")
 
-        with subprocess.Popen(["/bin/bash", "-c", cmd],
-                              stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-                              stderr=subprocess.PIPE, text=True) as process:
+        with spawn(cmd) as process:
 
             stdout, stderr = process.communicate()
 
@@ -227,6 +231,55 @@ def addr2line(elf_file: pathlib.Path, pc_address: str) -> tuple[str, int] | None
     return (None, None)
 
 
+def addr2line_table(elf_file: pathlib.Path) -> dict[int, tuple[str, int]]:
+    """
+    Builds the complete address-to-line mapping of an ELF file from its DWARF line table. Unlike ``addr2line()`` the
+    ELF is parsed only once, hence this is the function of choice when many program counters are to be resolved.
+
+    Args:
+        elf_file (pathlib.Path): The elf file.
+
+    Returns:
+        dict[int, tuple[str, int]]: A mapping of addresses to file-line pairs. The file (index-0) is the name of the
+        source (i.e., without its directory) and the line (index-1) is the 1-based line number within the source.
+    """
+
+    from elftools.elf.elffile import ELFFile
+
+    table = dict()
+
+    with open(elf_file, 'rb') as f:
+        elf = ELFFile(f)
+
+        if not elf.has_dwarf_info():
+            log.debug(f"No DWARF info found in {elf_file}")
+            return table
+
+        dwarf_info = elf.get_dwarf_info()
+
+        for CU in dwarf_info.iter_CUs():
+
+            line_program = dwarf_info.line_program_for_CU(CU)
+
+            if not line_program:
+                continue
+
+            # File indices are 1-based up to DWARF v4
+            base = 1 if line_program.header.version < 5 else 0
+            file_entries = line_program["file_entry"]
+
+            for entry in line_program.get_entries():
+
+                state = entry.state
+
+                if state and not state.end_sequence:
+
+                    file_name = pathlib.Path(file_entries[state.file - base].name.decode('utf-8')).name
+                    table[state.address] = (file_name, int(state.line))
+
+    return table
+
+
 def reap_process_tree(pid: int, timeout: float = 5.0) -> None:
     """Gracefully terminate and reap the process tree for a given PID.
 
@@ -266,6 +319,72 @@ def reap_process_tree(pid: int, timeout: float = 5.0) -> None:
         log.info(f"Some processes could not be terminated: {[p.pid for p in alive]}")
 
 
+# The steps of the initial run of the STL (i.e., pre_run) named after their TOML sections, with their default
+# dependencies i.e., strictly sequential.
+PRE_RUN_DEPENDENCIES: dict[str, list[str]] = {
+    "cross_compilation": [],
+    "vcs_hdl_compilation": ["cross_compilation"],
+    "vcs_logic_simulation": ["vcs_hdl_compilation"],
+    "zoix_fault_simulation": ["vcs_logic_simulation"]
+}
+
+
+def run_steps(steps: dict[str, callable], dependencies: dict[str, list[str]]) -> dict[str, Any]:
+    """
+    Runs a set of steps concurrently, in threads. Each step starts as soon as all of its dependencies have completed.
+
+    If a step raises, no more steps are started and the exception is raised once the running steps have completed.
+
+    Args:
+        steps (dict[str, callable]): The steps by name.
+        dependencies (dict[str, list[str]]): The names of the steps which must complete before each step. Steps
+                                             without dependencies may be omitted.
+
+    Returns:
+        dict[str, Any]: The return value of each step.
+
+    Raises:
+        ValueError: If a dependency is not a step or if the dependencies are cyclic.
+    """
+
+    for step, requirements in dependencies.items():
+
+        unknown = ({step} | set(requirements)) - set(steps)
+
+        if unknown:
+            raise ValueError(f"Unknown steps {sorted(unknown)} in the dependencies of {step}")
+
+    sorter = graphlib.TopologicalSorter({step: dependencies.get(step, []) for step in steps})
+
+    try:
+        sorter.prepare()
+    except graphlib.CycleError as error:
+        raise ValueError(f"Cyclic dependencies between steps {error.args[1]}") from error
+
+    results = dict()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(steps), 1)) as executor:
+
+        running = dict()
+
+        while sorter.is_active():
+
+            for step in sorter.get_ready():
+
+                log.debug(f"Starting step {step}")
+                running[executor.submit(steps[step])] = step
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+
+                step = running.pop(future)
+                results[step] = future.result()
+                sorter.done(step)
+
+    return results
+
+
 # # # # # # # # # # # # # # # # # # #
 #    ___ _                          #
 #   / __\ | __ _ ___ ___  ___  ___  #
@@ -313,3 +432,132 @@ class Singleton(type):
             cls._instances[cls] = instance
 
         return cls._instances[cls]
+
+
+class Command(str):
+    """
+    A shell command, tokenized once. It is a ``str`` and can be used as one e.g., executed with ``bash -c``. The
+    ``argv`` attribute holds the tokens of the command if it is a simple command i.e., a program and its arguments.
+    Commands which need a shell e.g., due to pipes, redirections, globs, variables or shell builtins, have no ``argv``.
+    Commands may also carry their own working directory (``cwd``) and environment variables (``env``), which are set on
+    top of the environment of TestCrush.
+    """
+
+    # Unquoted, any of these characters may have a special meaning to the shell
+    _metacharacters = re.compile(r"[|&;<>()$`\\*?\[\]{}~#!\n]")
+    _builtins = frozenset({".", ":", "alias", "cd", "eval", "exec", "exit", "export", "set", "shift", "source", "trap",
+                           "ulimit", "umask", "unset", "wait"})
+
+    def __new__(cls, command: str, argv: tuple[str, ...] | None = None, cwd: str | None = None,
+                env: dict[str, str] | None = None) -> 'Command':
+
+        instance = super().__new__(cls, command)
+        instance.argv = tuple(argv) if argv else cls.tokenize(command)
+        instance.cwd = cwd
+        instance.env = env
+
+        return instance
+
+    def __reduce__(self):
+
+        return (self.__class__, (str(self), self.argv, self.cwd, self.env))
+
+    @classmethod
+    def from_toml(cls, item: 'str | list[str] | dict[str, Any]') -> 'Command':
+        """
+        Creates a command from an entry of the instructions of the TOML configuration, which is either:
+
+        - a string, e.g., ``'make -C %root_dir% vcs/sim/gate/shell'``.
+        - an argv list, e.g., ``['%root_dir%/simv', '+firmware=sbst.hex']``, executed without a shell.
+        - a table with either a ``command`` string or an ``argv`` list, and optionally a ``cwd`` and an ``env`` table,
+          e.g., ``{argv = ['./simv'], cwd = '%root_dir%/run', env = {LM_LICENSE_FILE = '27000@server'}}``.
+
+        Args:
+            item (str | list[str] | dict[str, Any]): The TOML entry.
+
+        Returns:
+            Command: The command.
+
+        Raises:
+            ValueError: if the entry is none of the above.
+        """
+
+        if isinstance(item, str):
+            return cls(item)
+
+        elif isinstance(item, (list, tuple)) and item and all(isinstance(token, str) for token in item):
+            return cls(shlex.join(item), argv=item)
+
+        elif isinstance(item, collections.abc.Mapping) and ("command" in item) != ("argv" in item):
+
+            argv = item.get("argv")
+            env = {key: str(value) for key, value in item["env"].items()} if item.get("env") else None
+
+            return cls(item["command"] if "command" in item else shlex.join(argv), argv=argv, cwd=item.get("cwd"),
+                       env=env)
+
+        raise ValueError(f"Invalid instruction {item}. Expected a string, an argv list or a table with either a "
+                         "command or an argv.")
+
+    @classmethod
+    def tokenize(cls, command: str) -> tuple[str, ...] | None:
+        """
+        Args:
+            command (str): A shell command.
+
+        Returns:
+            tuple[str, ...] | None: The tokens of the command or ``None`` if it needs a shell.
+        """
+
+        if cls._metacharacters.search(command):
+            return None
+
+        try:
+            argv = tuple(shlex.split(command))
+        except ValueError:
+            return None
+
+        if not argv or argv[0] in cls._builtins or '=' in argv[0]:
+            return None
+
+        return argv
+
+
+def spawn(command: str) -> subprocess.Popen:
+    """
+    Starts a command with its ``stdin``, ``stdout`` and ``stderr`` piped as text. Simple commands (see ``Command``)
+    are executed directly. Then, the interpreter uses ``posix_spawn`` unless the command has its own ``cwd``, which
+    falls back to ``vfork``. The rest are executed with ``/bin/bash -c``, as is a program which is not found, so that
+    the error is reported on ``stderr`` as usual.
+
+    Args:
+        command (str): The command. Strings are tokenized on the fly.
+
+    Returns:
+        subprocess.Popen: The process.
+    """
+
+    if not isinstance(command, Command):
+        command = Command(command)
+
+    env = os.environ | command.env if command.env else None
+    pipes = dict(stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+    if command.argv:
+
+        program = command.argv[0]
+
+        if os.sep in program:
+            executable = os.path.abspath(os.path.join(command.cwd or os.curdir, program))
+            executable = executable if os.access(executable, os.X_OK) else None
+        else:
+            executable = shutil.which(program, path=(env or os.environ).get("PATH"))
+
+        if executable:
+
+            # posix_spawn requires an absolute executable and the inheritance of file descriptors. The descriptors
+            # opened by Python are not inheritable anyway (PEP 446).
+            return subprocess.Popen(command.argv, executable=executable, cwd=command.cwd, env=env, close_fds=False,
+                                    **pipes)
+
+    return subprocess.Popen(["/bin/bash", "-c", command], cwd=command.cwd, env=env, **pipes)
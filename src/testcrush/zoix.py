@@ -5,8 +5,12 @@ import subprocess
 import re
 import enum
 import pathlib
+import queue
+import random
+import threading
+import time
 
-from testcrush.utils import get_logger, to_snake_case
+from testcrush.utils import get_logger, to_snake_case, spawn, Command
 from typing import Any
 
 log = get_logger()
@@ -170,7 +174,7 @@ class TxtFaultReport:
 
         factory = FaultReportTransformerFactory()
         for section in ["StatusGroups", "Coverage", "FaultList"]:
-            parser = factory(section)
+            parser = factory(section, fast=True)
 
             try:
                 raw_section = self.extract(section)
@@ -305,18 +309,339 @@ class TxtFaultReport:
         return dict(retval)[requested_formula] if requested_formula else dict(retval)
 
 
+class JobScheduler:
+    """
+    License-aware scheduler of VCS/Z01X invocations.
+
+    Each kind of job (``compile``, ``lsim``, ``fsim``) has its own concurrency limit, i.e., the number of licenses
+    that may be checked out at the same time. A job which fails due to an unavailable license (its ``stdout`` or
+    ``stderr`` matches the license error regex) releases its slot and is retried after an exponential backoff with
+    jitter. The time spent by each job waiting for a slot and backing off is recorded.
+
+    The limits apply to the invocations of a single process (e.g., concurrent threads). Concurrency across processes
+    and hosts is controlled by the number of workers in the distributed mode.
+    """
+
+    KINDS = ("compile", "lsim", "fsim")
+
+    def __init__(self, limits: dict[str, int | None] | None = None, license_error_regex: re.Pattern | None = None,
+                 backoff: float = 30.0, max_backoff: float = 600.0, max_retries: int = 10) -> "JobScheduler":
+
+        limits = limits if limits else dict()
+
+        self.limits: dict[str, int | None] = {kind: limits.get(kind) for kind in self.KINDS}
+        self.license_error_regex: re.Pattern | None = license_error_regex
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.max_retries: int = max_retries
+
+        self._slots: dict[str, threading.BoundedSemaphore | None] = \
+            {kind: threading.BoundedSemaphore(limit) if limit else None for kind, limit in self.limits.items()}
+
+        self._lock: threading.Lock = threading.Lock()
+        self._statistics: dict[str, dict[str, float]] = {kind: dict(jobs=0, retries=0, wait=0.0, max_wait=0.0,
+                                                                    backoff=0.0) for kind in self.KINDS}
+
+    @classmethod
+    def from_settings(cls, settings: dict[str, Any]) -> "JobScheduler":
+        """
+        Constructs the scheduler from the ``[zoix_scheduler]`` TOML settings.
+
+        Args:
+            settings (dict[str, Any]): The scheduler settings.
+
+        Returns:
+            JobScheduler: The scheduler.
+        """
+
+        return cls(limits={kind: settings.get(f"{kind}_limit") for kind in cls.KINDS},
+                   license_error_regex=settings.get("license_error_regex"),
+                   backoff=settings.get("backoff", 30.0),
+                   max_backoff=settings.get("max_backoff", 600.0),
+                   max_retries=settings.get("max_retries", 10))
+
+    def _license_error(self, stdout: str, stderr: str) -> bool:
+
+        if not self.license_error_regex:
+            return False
+
+        return bool(self.license_error_regex.search(stderr) or self.license_error_regex.search(stdout))
+
+    def run(self, kind: str, execute: callable, instruction: str, timeout: float = None) -> tuple[str, str]:
+        """
+        Executes an instruction as soon as a slot of its kind is available, retrying it on license errors.
+
+        Args:
+            kind (str): The kind of the job i.e., ``compile``, ``lsim`` or ``fsim``.
+            execute (callable): The function which executes the instruction and returns the ``stdout`` and ``stderr``.
+            instruction (str): The instruction.
+            timeout (float, optional): The timeout of **each** execution attempt in seconds.
+
+        Returns:
+            tuple(str, str): The stdout (index 0) and the stderr (index 1) of the last attempt.
+        """
+
+        slot = self._slots[kind]
+        waited = 0.0
+        backed_off = 0.0
+        attempt = 0
+
+        while True:
+
+            start = time.perf_counter()
+            if slot:
+                slot.acquire()
+            waited += time.perf_counter() - start
+
+            try:
+                stdout, stderr = execute(instruction, timeout=timeout)
+            finally:
+                if slot:
+                    slot.release()
+
+            if not self._license_error(stdout, stderr) or attempt == self.max_retries:
+                break
+
+            attempt += 1
+            delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff) * random.uniform(0.5, 1.0)
+            log.debug(f"License unavailable for {kind} job. Retry {attempt}/{self.max_retries} in {delay:.1f}s")
+
+            time.sleep(delay)
+            backed_off += delay
+
+        with self._lock:
+
+            statistics = self._statistics[kind]
+            statistics["jobs"] += 1
+            statistics["retries"] += attempt
+            statistics["wait"] += waited
+            statistics["max_wait"] = max(statistics["max_wait"], waited + backed_off)
+            statistics["backoff"] += backed_off
+
+        return stdout, stderr
+
+    def statistics(self) -> dict[str, dict[str, float]]:
+        """
+        Returns the statistics per kind of job.
+
+        Returns:
+            dict[str, dict[str, float]]: For each kind, the number of ``jobs``, the number of license ``retries``, the
+            total time spent waiting for a slot (``wait``) and backing off (``backoff``), and the longest time a single
+            job has waited in total (``max_wait``). Times are in seconds.
+        """
+
+        with self._lock:
+            return {kind: dict(statistics) for kind, statistics in self._statistics.items()}
+
+
+class SimulatorSession:
+    """
+    A long-lived simulator process (server), which pays its start-up e.g., the loading of the ``simv`` image, the SDF
+    back-annotation and the set-up of the fault database, once rather than in every iteration. Instructions are sent to
+    the server over its ``stdin`` instead of being executed in a new process. The server must speak the following line
+    protocol:
+
+    - Once started, it writes a ``ready`` line to its ``stdout``.
+    - Each request is a single line i.e., the instruction, e.g., ``run /path/to/sbst.hex``. It is up to the server to
+      interpret it e.g., to load the new firmware image and re-run the simulation.
+    - It answers each request with any number of ``stdout <text>`` and ``stderr <text>`` lines, which are the output of
+      the run, followed by a ``done`` line. Any other line is taken as ``stdout``.
+    - It exits on a ``quit`` line or at the end of its ``stdin``.
+
+    Anything the server writes to its own ``stderr`` is only logged. The session is started on its first request and
+    restarted on the next request after a timeout or an unexpected exit of the server.
+    """
+
+    READY = "ready"
+    DONE = "done"
+    QUIT = "quit"
+
+    def __init__(self, command: str, startup_timeout: float | None = None) -> "SimulatorSession":
+
+        self.command: Command = command if isinstance(command, Command) else Command.from_toml(command)
+        self.startup_timeout: float | None = startup_timeout
+
+        # Number of times the server has been started
+        self.starts: int = 0
+
+        self._process: subprocess.Popen | None = None
+        self._lines: queue.Queue | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: dict[str, Any]) -> "SimulatorSession":
+        """
+        Constructs the session from a ``[zoix_sessions.<kind>]`` TOML table.
+
+        Args:
+            settings (dict[str, Any]): The session settings.
+
+        Returns:
+            SimulatorSession: The session.
+        """
+
+        return cls(settings["command"], startup_timeout=settings.get("startup_timeout"))
+
+    @staticmethod
+    def _read(stream: Any, sink: callable) -> None:
+        """Forwards the lines of a stream to ``sink`` and then ``None``, at the end of the stream."""
+
+        for line in stream:
+            sink(line.rstrip("\n"))
+
+        sink(None)
+
+    @staticmethod
+    def _log(line: str | None) -> None:
+
+        if line is not None:
+            log.debug(f"Simulator session: {line}")
+
+    def _readline(self, deadline: float | None) -> str | None:
+        """Returns the next line of the server, or ``None`` if it has exited. Raises ``TimeoutError``."""
+
+        try:
+            return self._lines.get(timeout=max(0.0, deadline - time.monotonic()) if deadline else None)
+        except queue.Empty:
+            raise TimeoutError
+
+    def _start(self) -> None:
+
+        log.debug(f"Starting simulator session {self.command}")
+
+        self._process = spawn(self.command)
+        self._lines = queue.Queue()
+        self.starts += 1
+
+        threading.Thread(target=self._read, args=(self._process.stdout, self._lines.put), daemon=True).start()
+        threading.Thread(target=self._read, args=(self._process.stderr, self._log), daemon=True).start()
+
+        deadline = time.monotonic() + self.startup_timeout if self.startup_timeout else None
+
+        while (line := self._readline(deadline)) != self.READY:
+
+            if line is None:
+                raise EOFError
+
+            self._log(line)
+
+    def _kill(self) -> None:
+
+        if self._process:
+
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def execute(self, instruction: str, timeout: float = None) -> tuple[str, str]:
+        """
+        Sends an instruction to the server and returns its ``stdout`` and ``stderr`` responses as a tuple, like
+        ``ZoixInvoker.execute()``.
+
+        Args:
+            instruction (str): The instruction i.e., the request line.
+            timeout (float, optional): A timeout in seconds for the request, excluding the start-up of the server.
+
+        Returns:
+            tuple(str, str): The stdout (index 0) and the stderr (index 1) as strings.
+        """
+
+        with self._lock:
+
+            if not self._process or self._process.poll() is not None:
+
+                try:
+                    self._start()
+
+                except (TimeoutError, EOFError):
+
+                    self._kill()
+                    return "", f"Simulator session {self.command} failed to start\n"
+
+            log.debug(f"Requesting {instruction}...")
+
+            stdout, stderr = list(), list()
+            deadline = time.monotonic() + timeout if timeout else None
+
+            try:
+
+                self._process.stdin.write(f"{instruction}\n")
+                self._process.stdin.flush()
+
+                while (line := self._readline(deadline)) != self.DONE:
+
+                    if line is None:
+                        raise EOFError
+
+                    stream, _, text = line.partition(" ")
+                    (stderr if stream == "stderr" else stdout).append(text if stream in ("stdout", "stderr") else line)
+
+            except TimeoutError:
+
+                log.debug(f"TIMEOUT during the execution of:\n\t{instruction}")
+                self._kill()
+                return "TimeoutExpired", "TimeoutExpired"
+
+            except (EOFError, BrokenPipeError):
+
+                self._kill()
+                stderr.append(f"Simulator session {self.command} exited unexpectedly")
+
+            return (''.join(f"{line}\n" for line in stdout), ''.join(f"{line}\n" for line in stderr))
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Asks the server to quit and kills it if it does not within ``timeout`` seconds.
+        """
+
+        with self._lock:
+
+            if not self._process:
+                return
+
+            try:
+
+                self._process.stdin.write(f"{self.QUIT}\n")
+                self._process.stdin.close()
+                self._process.wait(timeout=timeout)
+                self._process = None
+
+            except (BrokenPipeError, subprocess.TimeoutExpired):
+                self._kill()
+
+
 class ZoixInvoker:
     """A wrapper class to be used in handling calls to VCS-Z01X."""
-    def __init__(self) -> "ZoixInvoker":
-        ...
+    def __init__(self, scheduler: JobScheduler | None = None,
+                 sessions: dict[str, SimulatorSession] | None = None) -> "ZoixInvoker":
+
+        self.scheduler: JobScheduler = scheduler if scheduler else JobScheduler()
+
+        self.sessions: dict[str, SimulatorSession] = sessions if sessions else dict()
+        if set(self.sessions) - set(JobScheduler.KINDS):
+            raise ValueError(f"Simulator sessions must be one of {JobScheduler.KINDS}. Got {list(self.sessions)}")
+
+    def _execute(self, kind: str, instruction: str, timeout: float = None) -> tuple[str, str]:
+        """Executes an instruction through the scheduler, within the simulator session of its kind if there is one."""
+
+        session = self.sessions.get(kind)
+
+        return self.scheduler.run(kind, session.execute if session else self.execute, instruction, timeout=timeout)
+
+    def close(self) -> None:
+        """Closes the simulator sessions."""
+
+        for session in self.sessions.values():
+            session.close()
 
     @staticmethod
     def execute(instruction: str, timeout: float = None) -> tuple[str, str]:
         """
-        Executes a **bash** instruction and returns the ``stdout`` and ``stderr`` responses as a tuple.
+        Executes an instruction and returns the ``stdout`` and ``stderr`` responses as a tuple. Simple commands are
+        executed directly and the rest with **bash** (see ``utils.spawn()``).
 
         Args:
-            instruction (str): The bash instruction to be executed.
+            instruction (str): The instruction to be executed.
 
         Returns:
             tuple(str, str): The stdout (index 0) and the stderr (index 1)
@@ -325,9 +650,7 @@ class ZoixInvoker:
 
         log.debug(f"Executing {instruction}...")
 
-        with subprocess.Popen(["/bin/bash", "-c", instruction],
-                              stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-                              stderr=subprocess.PIPE, text=True) as process:
+        with spawn(instruction) as process:
 
             try:
 
@@ -358,7 +681,7 @@ class ZoixInvoker:
 
         for cmd in instructions:
 
-            stdout, stderr = self.execute(cmd)
+            stdout, stderr = self._execute("compile", cmd)
 
             if stderr:
 
@@ -457,7 +780,7 @@ class ZoixInvoker:
 
         for cmd in instructions:
 
-            stdout, stderr = self.execute(cmd, timeout=timeout)
+            stdout, stderr = self._execute("lsim", cmd, timeout=timeout)
 
             if stderr and stderr != "TimeoutExpired":
 
@@ -547,7 +870,7 @@ expression '{tat_regexp}' ?")
 
         for cmd in instructions:
 
-            stdout, stderr = self.execute(cmd, timeout=timeout)
+            stdout, stderr = self._execute("fsim", cmd, timeout=timeout)
 
             if stderr and stderr != "TimeoutExpired":
 
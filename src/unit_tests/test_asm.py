@@ -18,7 +18,10 @@ import pathlib
 import os
 import copy
 import shutil
+import stat
+import tempfile
 import random
+import re
 import sys
 
 class CodelineTest(unittest.TestCase):
@@ -439,6 +442,59 @@ class ISATest(unittest.TestCase):
         self.reset_isa_singleton(test_obj)
 
 
+class LineIndexTest(unittest.TestCase):
+
+    def test_rank_and_select(self):
+
+        test_obj = asm.LineIndex(10)
+
+        self.assertEqual(len(test_obj), 10)
+        self.assertEqual([test_obj.rank(line) for line in range(10)], list(range(10)))
+        self.assertEqual([test_obj.select(lineno) for lineno in range(10)], list(range(10)))
+
+        test_obj.remove(3)
+        test_obj.remove(7)
+        test_obj.remove(7)  # idempotent
+
+        self.assertEqual(len(test_obj), 8)
+        self.assertEqual([test_obj.rank(line) for line in range(10)], [0, 1, 2, 3, 3, 4, 5, 6, 6, 7])
+        self.assertEqual([test_obj.select(lineno) for lineno in range(8)], [0, 1, 2, 4, 5, 6, 8, 9])
+
+        test_obj.restore(3)
+
+        self.assertEqual(len(test_obj), 9)
+        self.assertEqual([test_obj.select(lineno) for lineno in range(9)], [0, 1, 2, 3, 4, 5, 6, 8, 9])
+
+        with self.assertRaises(LookupError):
+            test_obj.select(9)
+
+        with self.assertRaises(LookupError):
+            test_obj.select(-1)
+
+    def test_random_sequence(self):
+
+        lines = random.randint(1, 500)
+        test_obj = asm.LineIndex(lines)
+        present = [True] * lines
+
+        for _ in range(1000):
+
+            line = random.randint(0, lines - 1)
+
+            if random.random() < 0.5:
+                test_obj.remove(line)
+                present[line] = False
+            else:
+                test_obj.restore(line)
+                present[line] = True
+
+        expected = [line for line in range(lines) if present[line]]
+
+        self.assertEqual(len(test_obj), len(expected))
+        self.assertEqual([test_obj.select(lineno) for lineno in range(len(expected))], expected)
+        self.assertEqual([test_obj.rank(line) for line in expected], list(range(len(expected))))
+
+
 class AssemblyHandlerTest(unittest.TestCase):
 
     RISCV_ISALANG = r"""\
@@ -709,6 +765,12 @@ test1:
 
         del singleton_metaclass._instances[isa_class]
 
+    def tearDown(self):
+
+        # Temporary files of the handler, in case a rewrite failed
+        for path in [*pathlib.Path().glob(".mock_riscv_file.*"), *pathlib.Path().glob(".temp_asm.S.*")]:
+            path.unlink()
+
     def test_constructor(self):
 
         with mock.patch("builtins.open", mock.mock_open(read_data=self.RISCV_ISALANG)) as mocked_open:
@@ -950,3 +1012,339 @@ test1:
             expected_filename.unlink()
 
         pathlib.Path("temp_asm.S").unlink()
+
+    def test_managed_lineno(self):
+
+        test_obj = self.gen_rv_handler()
+
+        candidate = test_obj.get_candidate(10)
+
+        # Standalone Codelines are freely modified
+        # but managed ones are read-only.
+        with self.assertRaises(AttributeError):
+            candidate -= 1
+
+        self.assertEqual(candidate.lineno, 10)
+
+        self.reset_isa_singleton(test_obj)
+
+    def test_remove_restore_random_sequence(self):
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        test_obj = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+        candidates = test_obj.get_code()
+
+        def is_removed(codeline):
+            return any(codeline is removed for removed in test_obj.asm_file_changelog)
+
+        for _ in range(50):
+
+            remaining = [x for x in candidates if not is_removed(x)]
+
+            if not remaining or (test_obj.asm_file_changelog and random.random() < 0.4):
+                test_obj.restore()
+            else:
+                test_obj.remove(random.choice(remaining))
+
+            with open("temp_asm.S") as source:
+                lines = [re.sub(r'\s+', ' ', line.strip()) for line in source]
+
+            # Every candidate still in the file must
+            # point to its current line in the file.
+            for codeline in candidates:
+
+                if is_removed(codeline):
+                    continue
+
+                self.assertEqual(lines[codeline.lineno], codeline.data)
+                self.assertIs(test_obj.get_candidate(codeline.lineno), codeline)
+
+        while test_obj.asm_file_changelog:
+            test_obj.restore()
+
+        # Restored lines have their whitespace normalized
+        with open("temp_asm.S") as source:
+            self.assertEqual([re.sub(r'\s+', ' ', line.strip()) for line in source],
+                             [re.sub(r'\s+', ' ', line.strip()) for line in self.RISCV_SNIPPET.splitlines()])
+
+        self.reset_isa_singleton(test_obj)
+        pathlib.Path("temp_asm.S").unlink()
+
+    def test_get_random_candidate_exhaustion(self):
+
+        test_obj = self.gen_rv_handler(chunksize=2)
+
+        popped = [test_obj.get_random_candidate() for _ in range(len(self.EXPECTED_CODE))]
+
+        self.assertEqual(sorted(x.lineno for x in popped), [x.lineno for x in self.EXPECTED_CODE])
+        self.assertEqual(test_obj.get_code(), [])
+        self.assertEqual(test_obj.get_code_chunks(), [])
+
+        with self.assertRaises(LookupError):
+            test_obj.get_candidate(self.EXPECTED_CODE[0].lineno)
+
+        self.reset_isa_singleton(test_obj)
+
+    def test_get_code_chunks_order(self):
+
+        test_obj = self.gen_rv_handler(chunksize=1)
+
+        for _ in range(len(self.EXPECTED_CODE) // 2 + 1):
+            test_obj.get_random_candidate()
+
+        chunks = test_obj.get_code_chunks()
+        flattened = [x.lineno for chunk in chunks for x in chunk]
+
+        self.assertTrue(all(chunks))
+        self.assertEqual(flattened, sorted(flattened))
+        self.assertEqual(test_obj.get_code(), [x for chunk in chunks for x in chunk])
+
+        self.reset_isa_singleton(test_obj)
+
+    def test_edit_transaction(self):
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        # Reference: sequential removals
+        reference = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+        codelines = random.sample(reference.get_code(), 5)
+        linenos = [x.lineno for x in codelines]
+
+        for codeline in codelines:
+            reference.remove(codeline)
+
+        with open("temp_asm.S") as source:
+            expected_source = source.read()
+
+        expected_code = [(x.lineno, x.data) for x in reference.get_code()]
+        self.reset_isa_singleton(reference)
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        test_obj = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+        codelines = [test_obj.get_candidate(lineno) for lineno in linenos]
+
+        with mock.patch("testcrush.asm.os.replace", wraps=os.replace) as mocked_move:
+
+            with test_obj.edit() as transaction:
+                transaction.remove(*codelines)
+
+            # Single rewrite of the file
+            mocked_move.assert_called_once()
+
+        with open("temp_asm.S") as source:
+            self.assertEqual(source.read(), expected_source)
+
+        self.assertEqual([(x.lineno, x.data) for x in test_obj.get_code()], expected_code)
+        self.assertEqual(test_obj.asm_file_changelog, codelines)
+
+        # Batch restoration, again with a single rewrite
+        with mock.patch("testcrush.asm.os.replace", wraps=os.replace) as mocked_move:
+
+            with test_obj.edit() as transaction:
+                transaction.restore(len(codelines))
+
+            mocked_move.assert_called_once()
+
+        self.assertEqual(test_obj.asm_file_changelog, [])
+        self.assertEqual([x.lineno for x in test_obj.get_code()], [x.lineno for x in self.EXPECTED_CODE])
+
+        with open("temp_asm.S") as source:
+            lines = [re.sub(r'\s+', ' ', line.strip()) for line in source]
+
+        self.assertEqual([lines[x.lineno] for x in test_obj.get_code()], [x.data for x in self.EXPECTED_CODE])
+
+        self.reset_isa_singleton(test_obj)
+        pathlib.Path("temp_asm.S").unlink()
+
+    def test_edit_transaction_discarded(self):
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        test_obj = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+
+        with self.assertRaises(RuntimeError):
+
+            with test_obj.edit() as transaction:
+                transaction.remove(*test_obj.get_code()[:3])
+                raise RuntimeError
+
+        self.assertEqual(test_obj.asm_file_changelog, [])
+        self.assertEqual(test_obj.get_code(), self.EXPECTED_CODE)
+
+        with open("temp_asm.S") as source:
+            self.assertEqual(source.read(), self.RISCV_SNIPPET)
+
+        self.reset_isa_singleton(test_obj)
+        pathlib.Path("temp_asm.S").unlink()
+
+    def test_edit_hardlinked_source(self):
+
+        with tempfile.TemporaryDirectory() as tmp:
+
+            # E.g., the original build tree and a sandbox
+            original = pathlib.Path(tmp) / "original.S"
+            original.write_text(self.RISCV_SNIPPET)
+            os.link(original, pathlib.Path(tmp) / "temp_asm.S")
+
+            test_obj = self.gen_rv_handler(pathlib.Path(tmp) / "temp_asm.S")
+            test_obj.remove(test_obj.get_code()[0])
+
+            self.assertEqual(original.read_text(), self.RISCV_SNIPPET)
+            self.assertNotEqual((pathlib.Path(tmp) / "temp_asm.S").read_text(), self.RISCV_SNIPPET)
+
+            # No temporary files are left behind
+            self.assertEqual(sorted(path.name for path in pathlib.Path(tmp).iterdir()), ["original.S", "temp_asm.S"])
+
+            self.reset_isa_singleton(test_obj)
+
+    def test_edit_file_mode(self):
+
+        with tempfile.TemporaryDirectory() as tmp:
+
+            source = pathlib.Path(tmp) / "temp_asm.S"
+            source.write_text(self.RISCV_SNIPPET)
+            source.chmod(0o664)
+
+            test_obj = self.gen_rv_handler(source)
+            test_obj.remove(test_obj.get_code()[0])
+
+            self.assertEqual(stat.S_IMODE(source.stat().st_mode), 0o664)
+            self.assertEqual([path.name for path in pathlib.Path(tmp).iterdir()], ["temp_asm.S"])
+
+            # A failed rewrite leaves the file as it was and no temporary files behind
+            expected_source = source.read_text()
+
+            with mock.patch("testcrush.asm.os.replace", side_effect=OSError):
+                with self.assertRaises(OSError):
+                    test_obj.remove(test_obj.get_code()[1])
+
+            self.assertEqual(source.read_text(), expected_source)
+            self.assertEqual([path.name for path in pathlib.Path(tmp).iterdir()], ["temp_asm.S"])
+
+            self.reset_isa_singleton(test_obj)
+
+    def test_edit_transaction_mixed(self):
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        test_obj = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+        first, second, third, last = [test_obj.get_code()[i] for i in (0, 4, 5, -1)]
+
+        test_obj.remove(first)
+
+        # Restores the first, removes the rest and restores
+        # the last one which results in a no-op for its line
+        with test_obj.edit() as transaction:
+            transaction.restore()
+            transaction.remove(second, third, last)
+            transaction.restore()
+
+        self.assertEqual(test_obj.asm_file_changelog, [second, third])
+
+        with open("temp_asm.S") as source:
+            lines = [re.sub(r'\s+', ' ', line.strip()) for line in source]
+
+        self.assertNotIn(second.data, lines)
+        self.assertNotIn(third.data, lines)
+        self.assertEqual(lines[first.lineno], first.data)
+        self.assertEqual(lines[last.lineno], last.data)
+        self.assertEqual(last.lineno, len(lines) - 1)
+
+        self.reset_isa_singleton(test_obj)
+        pathlib.Path("temp_asm.S").unlink()
+
+    def test_edit_removed_codelines(self):
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        test_obj = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+        first, second = [test_obj.get_code()[i] for i in (0, 4)]
+
+        # Duplicate codeline within a transaction
+        with test_obj.edit() as transaction:
+            transaction.remove(first, first)
+
+        self.assertEqual(test_obj.asm_file_changelog, [first])
+
+        # Codeline removed by an earlier transaction
+        with test_obj.edit() as transaction:
+            transaction.remove(second, first)
+
+        self.assertEqual(test_obj.asm_file_changelog, [first, second])
+
+        with open("temp_asm.S") as source:
+            lines = [re.sub(r'\s+', ' ', line.strip()) for line in source]
+
+        self.assertNotIn(first.data, lines)
+        self.assertNotIn(second.data, lines)
+
+        # Each restoration brings back exactly one line
+        test_obj.restore()
+        test_obj.restore()
+
+        self.assertEqual(test_obj.asm_file_changelog, [])
+        self.assertEqual(test_obj.get_code(), self.EXPECTED_CODE)
+
+        with open("temp_asm.S") as source:
+            lines = [re.sub(r'\s+', ' ', line.strip()) for line in source]
+
+        self.assertEqual(len(lines), len(self.RISCV_SNIPPET.splitlines()))
+        self.assertEqual([lines[x.lineno] for x in test_obj.get_code()], [x.data for x in self.EXPECTED_CODE])
+
+        self.reset_isa_singleton(test_obj)
+        pathlib.Path("temp_asm.S").unlink()
+
+    def test_get_lineno_at(self):
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        test_obj = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+        first, second, third = [test_obj.get_code()[i] for i in (1, 4, 7)]
+        linenos = [x.lineno for x in (first, second, third)]
+
+        test_obj.remove(first)
+        snapshot = test_obj.snapshot()
+
+        test_obj.remove(second)
+        test_obj.remove(third)
+
+        # Line numbers as of the snapshot, i.e., only the first one removed
+        self.assertEqual(test_obj.get_lineno_at(first, snapshot), linenos[0])
+        self.assertEqual(test_obj.get_lineno_at(second, snapshot), linenos[1] - 1)
+        self.assertEqual(test_obj.get_lineno_at(third, snapshot), linenos[2] - 1)
+
+        # Line numbers as of now
+        self.assertEqual(test_obj.get_lineno_at(third, test_obj.snapshot()), linenos[2] - 2)
+
+        self.reset_isa_singleton(test_obj)
+        pathlib.Path("temp_asm.S").unlink()
+
+    def test_get_original_lineno(self):
+
+        with open("temp_asm.S", 'w') as outf:
+            outf.write(self.RISCV_SNIPPET)
+
+        test_obj = self.gen_rv_handler(pathlib.Path("temp_asm.S"))
+        first, second = [test_obj.get_code()[i] for i in (1, 4)]
+        linenos = [x.lineno for x in (first, second)]
+
+        test_obj.remove(first)
+
+        self.assertEqual(second.lineno, linenos[1] - 1)
+        self.assertEqual(test_obj.get_original_lineno(second), linenos[1])
+        self.assertEqual(test_obj.get_original_lineno(first), linenos[0])
+
+        test_obj.restore()
+        self.assertEqual(test_obj.get_original_lineno(second), linenos[1])
+
+        self.reset_isa_singleton(test_obj)
+        pathlib.Path("temp_asm.S").unlink()
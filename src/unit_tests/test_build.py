@@ -0,0 +1,438 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+try:
+
+    from testcrush import build
+    from testcrush import config
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import build
+    from testcrush import config
+
+import unittest
+import unittest.mock as mock
+import concurrent.futures
+import pathlib
+import platform
+import os
+import shutil
+import tempfile
+
+
+class IncrementalCompilerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+        self.sources = [self.workdir / f"test{i}.S" for i in range(3)]
+
+        for i, source in enumerate(self.sources):
+            source.write_text(f"addi x{i}, x{i}, {i}\n")
+
+        # "Assemble" by copying and "link" by concatenating
+        self.test_obj = build.IncrementalCompiler(self.sources,
+                                                  assemble="cp %source% %object%",
+                                                  link=[f"cat %objects% > {self.workdir}/sbst.elf"],
+                                                  cache_dir=self.workdir / "objects",
+                                                  cache_size=4)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.workdir)
+
+    def assembled_sources(self, mocked_compile: mock.MagicMock) -> list[str]:
+
+        return [call.args[0].split()[1] for call in mocked_compile.call_args_list if call.args[0].startswith("cp")]
+
+    def test_compile(self):
+
+        with mock.patch("testcrush.build.compile_assembly", wraps=build.compile_assembly) as mocked_compile:
+
+            # Initial build: everything is assembled
+            self.assertTrue(self.test_obj.compile())
+            self.assertEqual(self.assembled_sources(mocked_compile), [str(x.resolve()) for x in self.sources])
+            self.assertEqual((self.workdir / "sbst.elf").read_text(),
+                             "addi x0, x0, 0\naddi x1, x1, 1\naddi x2, x2, 2\n")
+
+            # Nothing changed: only linking
+            mocked_compile.reset_mock()
+            self.assertTrue(self.test_obj.compile())
+            self.assertEqual(self.assembled_sources(mocked_compile), [])
+            self.assertEqual(mocked_compile.call_count, 1)
+
+            # Only the modified source is assembled
+            mocked_compile.reset_mock()
+            original = self.sources[1].read_text()
+            self.sources[1].write_text("nop\n")
+
+            self.assertTrue(self.test_obj.compile(self.sources[1]))
+            self.assertEqual(self.assembled_sources(mocked_compile), [str(self.sources[1].resolve())])
+            self.assertEqual((self.workdir / "sbst.elf").read_text(), "addi x0, x0, 0\nnop\naddi x2, x2, 2\n")
+
+            # Restored content is served from the cache even
+            # if the caller does not report it as modified.
+            mocked_compile.reset_mock()
+            tmp = self.workdir / "tmp.S"
+            tmp.write_text(original)
+            tmp.replace(self.sources[1])
+
+            self.assertTrue(self.test_obj.compile())
+            self.assertEqual(self.assembled_sources(mocked_compile), [])
+            self.assertEqual((self.workdir / "sbst.elf").read_text(),
+                             "addi x0, x0, 0\naddi x1, x1, 1\naddi x2, x2, 2\n")
+
+    def test_compile_error(self):
+
+        self.assertTrue(self.test_obj.compile())
+
+        self.test_obj.assemble = "cp %source% %object% && echo 'Error: bad instruction' >&2"
+        self.sources[0].write_text("bad\n")
+
+        self.assertFalse(self.test_obj.compile(self.sources[0]))
+        self.assertEqual(list((self.workdir / "objects").glob("*.tmp")), [])
+
+        with self.assertRaises(SystemExit):
+            self.test_obj.compile(self.sources[0], exit_on_error=True)
+
+    def test_cache_eviction(self):
+
+        self.assertTrue(self.test_obj.compile())
+
+        for i in range(10):
+            self.sources[0].write_text(f"addi x0, x0, {i + 100}\n")
+            self.assertTrue(self.test_obj.compile(self.sources[0]))
+
+        objects = list((self.workdir / "objects").glob("*.o"))
+        self.assertEqual(len(objects), 4)
+
+        # Objects currently linked are never evicted
+        for source in self.sources:
+            self.assertTrue(self.test_obj._objects[source.resolve()].exists())
+
+
+def compile_in_sandbox(sandbox: build.BuildSandbox, instructions: list[str]) -> tuple[bool, str]:
+
+    return sandbox.compile(*instructions), sandbox.path(sandbox.build_dir / "sbst.elf").read_text()
+
+
+class BuildSandboxTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+        self.sbst_dir = self.workdir / "sbst"
+        (self.sbst_dir / "tests").mkdir(parents=True)
+        (self.sbst_dir / ".git").mkdir()
+
+        (self.sbst_dir / "tests" / "test0.S").write_text("addi x0, x0, 0\n")
+        (self.sbst_dir / "tests" / "test1.S").write_text("addi x1, x1, 1\n")
+        (self.sbst_dir / "sbst.elf").write_text("original\n")
+
+        # As expanded from %sbst_dir%
+        self.instructions = [f"cat {self.sbst_dir}/tests/*.S > {self.sbst_dir}/sbst.elf"]
+
+    def tearDown(self):
+
+        shutil.rmtree(self.workdir)
+
+    def test_create_and_destroy(self):
+
+        with build.BuildSandbox(self.sbst_dir, scratch_dir=self.workdir) as sandbox:
+
+            root = sandbox.root
+            self.assertEqual(root.name, "sbst")
+            self.assertTrue(root.is_relative_to(self.workdir))
+            self.assertEqual(sorted(x.relative_to(root).as_posix() for x in root.rglob("*")),
+                             ["sbst.elf", "tests", "tests/test0.S", "tests/test1.S"])
+
+            with self.assertRaises(RuntimeError):
+                sandbox.create()
+
+        self.assertFalse(root.exists())
+        self.assertIsNone(sandbox.root)
+
+        with self.assertRaises(RuntimeError):
+            sandbox.path(self.sbst_dir)
+
+    def test_rewrite(self):
+
+        relative = pathlib.Path(os.path.relpath(self.sbst_dir))
+
+        with build.BuildSandbox(relative) as sandbox:
+
+            root = str(sandbox.root)
+
+            self.assertEqual(sandbox.rewrite({"instructions": [f"make -C {relative} all",
+                                                               f"make -C {self.sbst_dir} all"],
+                                              "cache_size": 128,
+                                              "other": f"{relative}_other/{relative}.S"}),
+                             {"instructions": [f"make -C {root} all", f"make -C {root} all"],
+                              "cache_size": 128,
+                              "other": f"{relative}_other/{relative}.S"})
+
+            settings = sandbox.rewrite(config.A0Settings(assembly_compilation_instructions=[f"make -C {relative} all"],
+                                                         fsim_report=f"{relative}/fsim_attr"))
+
+            self.assertEqual(settings.assembly_compilation_instructions, (f"make -C {root} all",))
+            self.assertEqual(settings.assembly_compilation_instructions[0].argv, ("make", "-C", root, "all"))
+            self.assertEqual(settings.fsim_report, f"{root}/fsim_attr")
+
+            command = sandbox.rewrite(config.A0Settings(vcs_logic_simulation_instructions=[
+                {"argv": ["./simv"], "cwd": f"{relative}/run"}]).vcs_logic_simulation_instructions[0])
+
+            self.assertEqual((command.argv, command.cwd), (("./simv",), f"{root}/run"))
+
+            self.assertEqual(sandbox.path(relative / "tests" / "test0.S"), sandbox.root / "tests" / "test0.S")
+
+            with self.assertRaises(ValueError):
+                sandbox.path(self.workdir)
+
+    def test_isolation(self):
+
+        with build.BuildSandbox(self.sbst_dir, scratch_dir=self.workdir) as sandbox:
+
+            source = sandbox.path(self.sbst_dir / "tests" / "test0.S")
+
+            # Replace the source, as the AssemblyHandler does
+            with tempfile.NamedTemporaryFile("w", dir=self.workdir, delete=False) as tmp:
+                tmp.write("nop\n")
+            shutil.move(tmp.name, source)
+
+            self.assertTrue(sandbox.compile(*self.instructions))
+
+            self.assertEqual(sandbox.path(self.sbst_dir / "sbst.elf").read_text(), "nop\naddi x1, x1, 1\n")
+            self.assertEqual((self.sbst_dir / "tests" / "test0.S").read_text(), "addi x0, x0, 0\n")
+            self.assertEqual((self.sbst_dir / "sbst.elf").read_text(), "original\n")
+
+    def test_hardlinks(self):
+
+        with mock.patch.object(build.BuildSandbox, "_reflink", return_value=False):
+
+            with build.BuildSandbox(self.sbst_dir, scratch_dir=self.workdir) as sandbox:
+
+                # Sources are hardlinked, build artifacts are copied
+                self.assertTrue(os.path.samefile(sandbox.path(self.sbst_dir / "tests" / "test1.S"),
+                                                 self.sbst_dir / "tests" / "test1.S"))
+                self.assertFalse(os.path.samefile(sandbox.path(self.sbst_dir / "sbst.elf"),
+                                                  self.sbst_dir / "sbst.elf"))
+
+                self.assertTrue(sandbox.compile(*self.instructions))
+                self.assertEqual((self.sbst_dir / "sbst.elf").read_text(), "original\n")
+
+    def test_concurrent_compilation(self):
+
+        sandboxes = [build.BuildSandbox(self.sbst_dir, scratch_dir=self.workdir, name=f"worker{i}") for i in range(4)]
+
+        for i, sandbox in enumerate(sandboxes):
+            sandbox.create()
+            sandbox.path(self.sbst_dir / "tests" / "test1.S").unlink()
+            sandbox.path(self.sbst_dir / "tests" / "test1.S").write_text(f"addi x{i}, x{i}, {i}\n")
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(compile_in_sandbox, sandboxes, [self.instructions] * 4))
+
+        self.assertEqual(results, [(True, f"addi x0, x0, 0\naddi x{i}, x{i}, {i}\n") for i in range(4)])
+        self.assertEqual((self.sbst_dir / "sbst.elf").read_text(), "original\n")
+
+        for sandbox in sandboxes:
+            sandbox.destroy()
+
+
+@unittest.skipUnless(shutil.which("as") and shutil.which("ld") and platform.machine() == "x86_64",
+                     "Requires the x86-64 GNU assembler and linker")
+class ElfPatcherTest(unittest.TestCase):
+
+    ASM = """\
+.global _start
+.text
+_start:
+    mov $1, %eax
+    add %ebx, %ecx
+    movabs $0x1122334455667788, %rax
+    jmp _start
+.data
+value: .word 5
+"""
+
+    def setUp(self):
+
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+        self.source = self.workdir / "test.S"
+        self.source.write_text(self.ASM)
+        self.elf = self.workdir / "test.elf"
+
+        self.assertTrue(build.compile_assembly(f"as -g -o {self.workdir}/test.o {self.source}",
+                                               f"ld -o {self.elf} {self.workdir}/test.o"))
+
+        self.original = self.elf.read_bytes()
+        self.test_obj = build.ElfPatcher(self.elf, post_patch=[f"cp {self.elf} {self.workdir}/test.hex"])
+        self.test_obj.load()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.workdir)
+
+    def text(self, elf: bytes) -> bytes:
+
+        start, end, offset = self.test_obj._sections[0]
+        return elf[offset:offset + end - start]
+
+    def test_locate(self):
+
+        start = self.test_obj._sections[0][0]
+
+        self.assertEqual(self.test_obj.locate(self.source, 4), [(start, start + 5)])
+        self.assertEqual(self.test_obj.locate(self.source, 5), [(start + 5, start + 7)])
+        self.assertEqual(self.test_obj.locate(self.source, 6), [(start + 7, start + 17)])
+        self.assertEqual(self.test_obj.locate(self.source, 7), [(start + 17, start + 19)])
+
+        self.assertEqual(self.test_obj.locate(self.source, 3), [])
+        self.assertEqual(self.test_obj.locate(self.workdir / "other.S", 4), [])
+
+    def test_locate_same_name(self):
+
+        for directory, instruction in [("a", "nop"), ("b", "ret")]:
+
+            (self.workdir / directory).mkdir()
+            (self.workdir / directory / "init.S").write_text(f".text\n{directory}_init:\n    {instruction}\n")
+
+            self.assertTrue(build.compile_assembly(f"as -g -o {self.workdir}/{directory}.o "
+                                                   f"{self.workdir}/{directory}/init.S"))
+
+        self.assertTrue(build.compile_assembly(f"ld -o {self.elf} {self.workdir}/test.o {self.workdir}/a.o "
+                                               f"{self.workdir}/b.o"))
+        self.test_obj.load()
+
+        a_ranges = self.test_obj.locate(self.workdir / "a" / "init.S", 3)
+        b_ranges = self.test_obj.locate(self.workdir / "b" / "init.S", 3)
+
+        self.assertTrue(a_ranges)
+        self.assertTrue(b_ranges)
+        self.assertNotEqual(a_ranges, b_ranges)
+
+        # Not in the line table by path. Matched by name only when that name is unique
+        self.assertEqual(self.test_obj.locate(self.workdir / "c" / "init.S", 3), [])
+        self.assertEqual(self.test_obj.locate(self.workdir / "c" / "test.S", 4), self.test_obj.locate(self.source, 4))
+
+    def test_patch_and_unpatch(self):
+
+        original_text = self.text(self.original)
+
+        self.assertTrue(self.test_obj.patch(self.source, 6))
+        self.assertTrue(self.test_obj.patch(self.source, 4))
+
+        self.assertEqual(self.text(self.elf.read_bytes()),
+                         b'\x90' * 5 + original_text[5:7] + b'\x90' * 10 + original_text[17:])
+        self.assertEqual((self.workdir / "test.hex").read_bytes(), self.elf.read_bytes())
+
+        self.assertTrue(self.test_obj.unpatch())
+        self.assertEqual(self.text(self.elf.read_bytes()), original_text[:7] + b'\x90' * 10 + original_text[17:])
+
+        self.assertTrue(self.test_obj.unpatch())
+        self.assertEqual(self.elf.read_bytes(), self.original)
+        self.assertEqual((self.workdir / "test.hex").read_bytes(), self.original)
+
+        self.assertFalse(self.test_obj.unpatch())
+
+    def test_unpatchable(self):
+
+        # Not in the line table
+        self.assertFalse(self.test_obj.patch(self.source, 9))
+
+        # Width of 2 bytes cannot be filled with 4-byte nops
+        self.test_obj.user_nops = {4: 0x0f1f4000}
+        self.test_obj.load()
+
+        self.assertFalse(self.test_obj.patch(self.source, 5))
+        self.assertFalse(self.test_obj.patch(self.source, 4))
+
+        self.assertEqual(self.elf.read_bytes(), self.original)
+        self.assertFalse(self.test_obj.unpatch())
+
+    def test_from_settings(self):
+
+        patcher = build.ElfPatcher.from_settings({"enabled": True,
+                                                  "elf_file": str(self.elf),
+                                                  "nops": {"4": "00000013", "2": "0x0001"}})
+
+        self.assertEqual(patcher.user_nops, {4: 0x13, 2: 0x1})
+        self.assertEqual(patcher.post_patch, [])
+
+
+@unittest.skipUnless(shutil.which("as") and shutil.which("ld") and shutil.which("objcopy")
+                     and platform.machine() == "x86_64", "Requires the x86-64 GNU assembler, linker and objcopy")
+class MemoryImageTest(unittest.TestCase):
+
+    ASM = """\
+.global _start
+.text
+_start:
+    mov $1, %eax
+    add %ebx, %ecx
+    jmp _start
+.data
+value: .word 5
+.byte 7
+"""
+
+    def setUp(self):
+
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+        self.elf = self.workdir / "test.elf"
+
+        (self.workdir / "test.S").write_text(self.ASM)
+
+        # Unaligned data, in a separate segment
+        self.assertTrue(build.compile_assembly(f"as -o {self.workdir}/test.o {self.workdir}/test.S",
+                                               f"ld -Ttext=0x1000 -Tdata=0x2002 -o {self.elf} {self.workdir}/test.o"))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.workdir)
+
+    def test_hex(self):
+
+        image = build.MemoryImage(self.elf, self.workdir / "test.hex", base_address=0x1000)
+        image.write()
+
+        self.assertEqual((self.workdir / "test.hex").read_text(), "@00000000\n000001b8\nebd90100\n000000f7\n"
+                                                                  "@00000400\n00050000\n00000007\n")
+
+        # Sections sharing a word are merged
+        self.assertEqual(image._hex([(0x1100, b'\x01\x02\x03\x04\x05\x06'), (0x1106, b'\x07\x08')], "little"),
+                         b"@00000040\n04030201\n08070605\n")
+        self.assertEqual(image._hex([(0x1100, b'\x01\x02\x03'), (0x1103, b'\x04')], "big"),
+                         b"@00000040\n01020304\n")
+
+        image = build.MemoryImage(self.elf, self.workdir / "test.hex", word_width=2, base_address=0x2000)
+
+        with self.assertRaises(ValueError):
+            image.write()
+
+    def test_bin(self):
+
+        self.assertTrue(build.compile_assembly(f"objcopy -O binary {self.elf} {self.workdir}/objcopy.bin"))
+
+        (self.workdir / "test.bin").write_bytes(b'stale')
+        (self.workdir / "test.bin").chmod(0o640)
+
+        build.MemoryImage(self.elf, self.workdir / "test.bin").write()
+
+        self.assertEqual((self.workdir / "test.bin").read_bytes(), (self.workdir / "objcopy.bin").read_bytes())
+        self.assertEqual((self.workdir / "test.bin").stat().st_mode & 0o777, 0o640)
+        self.assertEqual(list(self.workdir.glob(".test.bin.*")), [])
+
+    def test_from_settings(self):
+
+        image = build.MemoryImage.from_settings({"enabled": True, "elf_file": str(self.elf),
+                                                 "image_file": str(self.workdir / "test.hex"),
+                                                 "base_address": "0x80000000"})
+
+        self.assertEqual((image.format, image.word_width, image.base_address), ("hex", 4, 0x80000000))
+
+        with self.assertRaises(ValueError):
+            build.MemoryImage.from_settings({"elf_file": str(self.elf), "image_file": str(self.workdir / "test.mem")})
@@ -11,6 +11,8 @@ except ModuleNotFoundError:
     sys.path.append("..")
     from testcrush import config
 
+import dataclasses
+import pickle
 import unittest
 import unittest.mock as mock
 import pathlib
@@ -208,25 +210,125 @@ isa_ = '../../langs/riscv.isa'
         self.assertEqual(isa, "../../langs/riscv.isa")
         self.assertEqual(asm, ['../../cv32e40p/sbst/tests/test1.S'])
         self.maxDiff=None
-        self.assertEqual(settings, {'assembly_compilation_instructions': ['make -C ../../cv32e40p/sbst clean',
-                                                                           'make -C ../../cv32e40p/sbst all'],
+        self.assertEqual(settings, {'assembly_compilation_instructions': ('make -C ../../cv32e40p/sbst clean',
+                                                                           'make -C ../../cv32e40p/sbst all'),
                                      'vcs_compilation_instructions': None,
                                      'compaction_policy': 'Maximize',
-                                     'vcs_logic_simulation_instructions': ['make -C  ../../cv32e40p vcs/sim/gate/shell'],
+                                     'vcs_logic_simulation_instructions': ('make -C  ../../cv32e40p vcs/sim/gate/shell',),
                                      'vcs_logic_simulation_control': {'timeout': 60.0,
                                                                       'simulation_ok_regex': re.compile('EXIT\\sSUCCESS', re.DOTALL),
                                                                       'test_application_time_regex': re.compile('test application time = ([0-9]+)', re.DOTALL),
                                                                       'test_application_time_regex_group_no': 1},
-                                     'zoix_fault_simulation_instructions': ['make -C ../../cv32e40p vcs/fgen/saf',
-                                                                            'make -C ../../cv32e40p vcs/fsim/gate/shell'],
+                                     'zoix_fault_simulation_instructions': ('make -C ../../cv32e40p vcs/fgen/saf',
+                                                                            'make -C ../../cv32e40p vcs/fsim/gate/shell'),
                                      'zoix_fault_simulation_control': {'timeout': 360.0,
-                                                                       'allow_regexs': [re.compile('Info: Connected to started server', re.DOTALL)]},
+                                                                       'allow_regexs': (re.compile('Info: Connected to started server', re.DOTALL),)},
                                      'coverage_formula': 'Observational Coverage',
                                      'fsim_report': '../../cv32e40p/run/vc-z01x/fsim_attr',
+                                     'incremental_compilation': None,
+                                     'elf_patching': None,
+                                     'memory_image': None,
+                                     'zoix_scheduler': None,
+                                     'zoix_sessions': None,
+                                     'candidate_ordering': None,
+                                     'pre_run_dependencies': None,
                                     })
 
         self.assertEqual(preprocessor, {'enabled': True,
                                         'elf_file': '../../cv32e40p/sbst/sbst.elf',
                                         'processor_name': 'CV32E40P',
                                         'processor_trace': '../../cv32e40p/sbst/trace.log',
-                                        'zoix_to_trace': {'PC_ID': 'PC', 'sim_time': 'Time'}})
+                                        'zoix_to_trace': {'PC_ID': 'PC', 'sim_time': 'Time'},
+                                        'pc_column': None,
+                                        'cycle_column': None,
+                                        'time_column': None,
+                                        'time_unit': None,
+                                        'trace_tokenizer': None,
+                                        'ingestion_workers': None,
+                                        'history': None,
+                                        'trace_db': None,
+                                        'trace_cache': None,
+                                        'remove_unexecuted': None,
+                                        'order_by_tat': None,
+                                        'fault_attribution': None,
+                                        'max_unique_faults': None})
+
+    def test_parse_incremental_compilation(self):
+
+        incremental = r"""
+[cross_compilation.incremental]
+enabled = true
+assemble = 'riscv32-unknown-elf-gcc -c %source% -o %object%'
+link = ['riscv32-unknown-elf-gcc %objects% -T %sbst_dir%/link.ld -o %sbst_dir%/sbst.elf']
+"""
+
+        with mock.patch("io.open", mock.mock_open(read_data=self.TOML_RAW + incremental)) as mocked_open:
+
+            _, _, settings, _ = config.parse_a0_configuration("some_mocked_file")
+
+        self.assertEqual(settings["assembly_compilation_instructions"], ('make -C ../../cv32e40p/sbst clean',
+                                                                          'make -C ../../cv32e40p/sbst all'))
+        self.assertEqual(settings["incremental_compilation"], {
+            'enabled': True,
+            'assemble': 'riscv32-unknown-elf-gcc -c %source% -o %object%',
+            'link': ('riscv32-unknown-elf-gcc %objects% -T ../../cv32e40p/sbst/link.ld -o '
+                     '../../cv32e40p/sbst/sbst.elf',)
+        })
+
+    def test_settings(self):
+
+        with mock.patch("io.open", mock.mock_open(read_data=self.TOML_RAW)) as mocked_open:
+
+            _, _, settings, preprocessor = config.parse_a0_configuration("some_mocked_file")
+
+        # The TOML is loaded once
+        mocked_open.assert_called_once()
+
+        self.assertEqual(set(settings), set(config.A0_KEYS | config.A0_OPTIONAL_KEYS))
+        self.assertEqual(set(preprocessor), set(config.A0_PREPROCESSOR_KEYS))
+        self.assertEqual(settings.compaction_policy, "Maximize")
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            settings.compaction_policy = "Threshold"
+
+        # Nested tables and arrays are read-only as well
+        with self.assertRaises(TypeError):
+            settings.vcs_logic_simulation_control["timeout"] = 0.0
+
+        self.assertIsInstance(settings.zoix_fault_simulation_control["allow_regexs"], tuple)
+
+        with self.assertRaises(KeyError):
+            settings["isa_file"]
+
+        # Commands are pre-tokenized
+        self.assertEqual(settings.zoix_fault_simulation_instructions[0].argv,
+                         ("make", "-C", "../../cv32e40p", "vcs/fgen/saf"))
+
+        # ...and survive a round-trip to worker processes together with the compiled regexes
+        restored = pickle.loads(pickle.dumps(settings))
+
+        self.assertIsInstance(restored, config.A0Settings)
+        self.assertEqual(restored, settings)
+        self.assertEqual(restored.zoix_fault_simulation_instructions[0].argv,
+                         settings.zoix_fault_simulation_instructions[0].argv)
+        self.assertEqual(restored.vcs_logic_simulation_control["simulation_ok_regex"].pattern, r"EXIT\sSUCCESS")
+
+    def test_resolve_toml(self):
+
+        original_dict = {"some_regex": r"%x%[a-zA-Z]+",
+                         "some_regexs": [r"[0-9]{2}"],
+                         "some_other_field": ["%x%", 123]}
+
+        self.assertEqual(config.resolve_toml(original_dict, {"x": "abc"}),
+                         {"some_regex": re.compile(r"abc[a-zA-Z]+", re.DOTALL),
+                          "some_regexs": [re.compile(r"[0-9]{2}", re.DOTALL)],
+                          "some_other_field": ["abc", 123]})
+
+    def test_argv_instructions(self):
+
+        settings = config.A0Settings(vcs_logic_simulation_instructions=[["./simv", "+firmware=sbst.hex"],
+                                                                        {"argv": ["./simv"], "cwd": "run"}])
+
+        self.assertEqual([command.argv for command in settings.vcs_logic_simulation_instructions],
+                         [("./simv", "+firmware=sbst.hex"), ("./simv",)])
+        self.assertEqual(settings.vcs_logic_simulation_instructions[1].cwd, "run")
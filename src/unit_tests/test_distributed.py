@@ -0,0 +1,214 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+try:
+
+    from testcrush import distributed
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import distributed
+
+import unittest
+import multiprocessing
+import pathlib
+import random
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+
+def evaluate(previous_result, new_result):
+
+    return new_result[0] <= previous_result[0] and new_result[1] >= previous_result[1]
+
+
+def accept(previous_result, new_result):
+
+    return new_result
+
+
+class StubSimulator:
+    """
+    Deterministic stand-in of the compile-lsim-fsim flow. Each candidate costs ``line + 1`` cycles and every fifth
+    candidate is essential i.e., its removal decreases the coverage.
+    """
+
+    def __init__(self, candidates: list[list[int]]):
+
+        self.candidates = candidates
+        self.removed = list()
+
+    @staticmethod
+    def essential(candidate) -> bool:
+
+        return candidate[1] % 5 == 0
+
+    def stats(self, removed: list) -> tuple[int, float]:
+
+        present = [x for x in self.candidates if x not in removed]
+        essential = [x for x in self.candidates if self.essential(x)]
+
+        return (sum(x[1] + 1 for x in present), len([x for x in present if self.essential(x)]) / len(essential))
+
+    def simulate(self, candidate) -> tuple[int, float] | None:
+
+        # Removals of candidates multiple of 7 do not compile
+        if candidate[1] % 7 == 3:
+            return None
+
+        return self.stats(self.removed + [candidate])
+
+
+def stub_worker(address: str, candidates: list[list[int]], delay: float = 0.0) -> int:
+
+    simulator = StubSimulator(candidates)
+    evaluated = 0
+    version = 0
+
+    with distributed.WorkQueueClient(address, poll_interval=0.01) as client:
+
+        while (job := client.get(version)) is not None:
+
+            simulator.removed.extend(job["changelog"])
+            version = job["version"]
+
+            time.sleep(random.uniform(0, delay))
+            result = simulator.simulate(job["candidate"])
+            client.report(job["id"], result, {"compiles": "YES" if result else "NO"})
+
+            evaluated += 1
+
+    return evaluated
+
+
+class CoordinatorTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+        self.candidates = [[0, i] for i in range(40)]
+        self.simulator = StubSimulator(self.candidates)
+
+        self.verdicts = list()
+        self.test_obj = distributed.Coordinator(self.candidates, self.simulator.stats([]), evaluate, accept,
+                                                on_verdict=lambda *args: self.verdicts.append(args))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.workdir)
+
+    def expected_changelog(self) -> list[list[int]]:
+        """The outcome of a sequential run"""
+
+        simulator = StubSimulator(self.candidates)
+        stats = simulator.stats([])
+
+        for candidate in self.candidates:
+
+            result = simulator.simulate(candidate)
+
+            if result and evaluate(stats, result):
+                simulator.removed.append(candidate)
+                stats = result
+
+        return simulator.removed
+
+    def test_parse_address(self):
+
+        self.assertEqual(distributed.parse_address("localhost:5000"), (socket.AF_INET, ("localhost", 5000)))
+        self.assertEqual(distributed.parse_address(":5000"), (socket.AF_INET, ("localhost", 5000)))
+        self.assertEqual(distributed.parse_address("/tmp/testcrush.sock"), (socket.AF_UNIX, "/tmp/testcrush.sock"))
+        self.assertEqual(distributed.parse_address("./a:1"), (socket.AF_UNIX, "./a:1"))
+
+    def test_stale_report(self):
+
+        address = self.test_obj.start(str(self.workdir / "coordinator.sock"))
+
+        with distributed.WorkQueueClient(address) as first, distributed.WorkQueueClient(address) as second:
+
+            job1 = first.get(0)
+            job2 = second.get(0)
+
+            self.assertEqual((job1["candidate"], job1["version"], job1["changelog"]), ([0, 0], 0, []))
+            self.assertEqual((job2["candidate"], job2["version"], job2["changelog"]), ([0, 1], 0, []))
+
+            # Candidate 1 is removable, but candidate 0 has been accepted in the meantime
+            self.assertEqual(first.report(job1["id"], (self.simulator.stats([[0, 0]])[0], 1.0)), "Proceed")
+            self.assertEqual(second.report(job2["id"], self.simulator.stats([[0, 1]])), "Stale")
+
+            # Which is handed out again along with the accepted removal
+            job3 = second.get(0)
+            self.assertEqual((job3["candidate"], job3["version"], job3["changelog"]), ([0, 1], 1, [[0, 0]]))
+            self.assertEqual(second.report(job3["id"], None), "Restore")
+
+        self.assertEqual([verdict for _, verdict, _ in self.verdicts], ["Proceed", "Stale", "Restore"])
+
+        self.assertEqual(self.test_obj.stop(), [[0, 0]])
+        self.assertFalse((self.workdir / "coordinator.sock").exists())
+
+    def test_disconnect(self):
+
+        address = self.test_obj.start(str(self.workdir / "coordinator.sock"))
+
+        with distributed.WorkQueueClient(address) as client:
+            job = client.get(0)
+            self.assertEqual(job["candidate"], [0, 0])
+
+        # Abandoned candidate is handed out again
+        with distributed.WorkQueueClient(address) as client:
+
+            while self.test_obj.in_flight:
+                time.sleep(0.01)
+
+            job = client.get(0)
+            self.assertEqual(job["candidate"], [0, 0])
+
+        self.test_obj.stop()
+
+    def test_local_workers(self):
+
+        for address in [str(self.workdir / "coordinator.sock"), "localhost:0"]:
+
+            with self.subTest(address=address):
+
+                self.verdicts.clear()
+                coordinator = distributed.Coordinator(self.candidates, self.simulator.stats([]), evaluate, accept,
+                                                      on_verdict=lambda *args: self.verdicts.append(args))
+
+                address = coordinator.start(address)
+
+                evaluated = list()
+                workers = [threading.Thread(target=lambda: evaluated.append(stub_worker(address, self.candidates,
+                                                                                        0.005)))
+                           for _ in range(4)]
+
+                for worker in workers:
+                    worker.start()
+
+                changelog = coordinator.wait(timeout=30)
+
+                for worker in workers:
+                    worker.join()
+
+                self.assertEqual(sorted(changelog), self.expected_changelog())
+                self.assertEqual(coordinator.stats, self.simulator.stats(changelog))
+                self.assertEqual(sum(evaluated), len(self.verdicts))
+                self.assertEqual(len([v for v in self.verdicts if v[1] != "Stale"]), len(self.candidates))
+
+    def test_worker_processes(self):
+
+        address = self.test_obj.start(str(self.workdir / "coordinator.sock"))
+
+        with multiprocessing.get_context("spawn").Pool(3) as pool:
+
+            evaluated = pool.starmap_async(stub_worker, [(address, self.candidates)] * 3)
+            changelog = self.test_obj.wait(timeout=60)
+
+            self.assertEqual(sum(evaluated.get(timeout=30)), len(self.verdicts))
+
+        self.assertEqual(sorted(changelog), self.expected_changelog())
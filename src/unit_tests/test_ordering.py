@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+try:
+
+    from testcrush import ordering
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import ordering
+
+import unittest
+import pathlib
+import random
+import shutil
+import tempfile
+
+
+class CandidateRankerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.test_obj = ordering.CandidateRanker()
+
+    def test_bucket(self):
+
+        self.assertEqual([ordering.bucket(x) for x in [0, 1, 2, 3, 4, 7, 8]], [0, 1, 2, 2, 3, 3, 4])
+        self.assertEqual(ordering.bucket(2**40), 16)
+
+    def test_insertion_order(self):
+
+        # Without any verdicts, candidates are popped in insertion order
+        for i in range(10):
+            self.test_obj.push(i, (("mnemonic", "addi" if i % 2 else "lw"),))
+
+        self.assertEqual(len(self.test_obj), 10)
+        self.assertEqual(self.test_obj.drain(), list(range(10)))
+        self.assertEqual(len(self.test_obj), 0)
+
+        with self.assertRaises(IndexError):
+            self.test_obj.pop()
+
+    def test_online_updates(self):
+
+        signatures = {"addi": (("mnemonic", "addi"), ("faults", 0)),
+                      "lw": (("mnemonic", "lw"), ("faults", 3))}
+
+        for i in range(20):
+            self.test_obj.push(i, signatures["lw" if i < 10 else "addi"])
+
+        candidate, signature = self.test_obj.pop()
+        self.assertEqual((candidate, signature), (0, signatures["lw"]))
+
+        # Rejection of a load makes the remaining ones less likely to be removable
+        self.test_obj.update(signature, False)
+        self.assertLess(self.test_obj.score(signatures["lw"]), self.test_obj.score(signatures["addi"]))
+        self.assertEqual(self.test_obj.pop(), (10, signatures["addi"]))
+
+        # Feature values never seen in a verdict are neutral
+        self.assertEqual(self.test_obj.score((("mnemonic", "mul"), ("faults", 0))),
+                         self.test_obj.score((("mnemonic", "div"), ("faults", 0))))
+
+    def test_fewer_rejections(self):
+
+        # Half of the candidates are essential, those with faults detected at their program counter
+        rng = random.Random(0)
+        candidates = [(i, (("mnemonic", rng.choice(["addi", "lw", "mul"])), ("faults", i % 2))) for i in range(200)]
+        rng.shuffle(candidates)
+
+        for candidate, signature in candidates:
+            self.test_obj.push(candidate, signature)
+
+        rejections = 0
+        for _ in range(100):
+
+            candidate, signature = self.test_obj.pop()
+            accepted = candidate % 2 == 0
+
+            rejections += not accepted
+            self.test_obj.update(signature, accepted)
+
+        # A random order rejects about 50 of the first 100 candidates
+        self.assertLess(rejections, 10)
+
+    def test_previous_verdicts(self):
+
+        workdir = pathlib.Path(tempfile.mkdtemp())
+        statistics = workdir / "a0_statistics.csv"
+        statistics.write_text("""asm_source,removed_codeline,compiles,lsim_ok,tat,fsim_ok,coverage,verdict
+test1.S,[#12]: addi x1 x1 1,YES,YES,100,YES,0.9,Proceed
+test1.S,[#13]: lw x2 0(x3),NO,,,,,Restore
+test2.S,[#3]: addi x1 x1 1,YES,YES,99,YES,0.8,Restore
+test1.S,[#12]: addi x1 x1 1,YES,YES,100,YES,0.9,Stale
+test1.S,[#12]: addi x1 x1 1,YES,YES,90,YES,0.9,Restore
+""")
+
+        try:
+            verdicts = ordering.previous_verdicts(statistics)
+        finally:
+            shutil.rmtree(workdir)
+
+        self.assertEqual(verdicts, {("test1.S", "addi x1 x1 1"): ["Proceed", "Restore"],
+                                    ("test1.S", "lw x2 0(x3)"): ["Restore"],
+                                    ("test2.S", "addi x1 x1 1"): ["Restore"]})
@@ -0,0 +1,385 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+try:
+
+    from testcrush import preprocessor
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import preprocessor
+
+import unittest
+import unittest.mock as mock
+import bz2
+import gzip
+import importlib.util
+import lzma
+import os
+import pathlib
+import shutil
+import tempfile
+import types
+
+
+class PreprocessorTest(unittest.TestCase):
+
+    # A loop of two instructions (0x154, 0x158) executed three times
+    TRACE = r"""Time          Cycle      PC       Instr    Decoded instruction Register and memory contents
+130         61 00000150 4481     c.li    x9,0        x9=0x00000000
+132         62 00000154 00008437 lui     x8,0x8      x8=0x00008000
+134         63 00000158 fff40413 addi    x8,x8,-1    x8:0x00008000  x8=0x00007fff
+136         64 00000154 00008437 lui     x8,0x8      x8=0x00008000
+138         65 00000158 fff40413 addi    x8,x8,-1    x8:0x00008000  x8=0x00007fff
+140         66 00000154 00008437 lui     x8,0x8      x8=0x00008000
+142         67 00000158 fff40413 addi    x8,x8,-1    x8:0x00008000  x8=0x00007fff
+150         71 0000015c c622     c.swsp  x8,12(x2)   x2:0x00002000  x8:0x00000000 PA:0x0000200c store:0x00000000
+"""
+
+    def setUp(self):
+
+        self.cwd = os.getcwd()
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+        os.chdir(self.workdir)
+
+        (self.workdir / "trace.log").write_text(self.TRACE)
+
+        self.test_obj = preprocessor.Preprocessor([], processor_name="CV32E40P", processor_trace="trace.log",
+                                                  elf_file="sbst.elf", zoix_to_trace={"PC_ID": "PC"})
+
+    def tearDown(self):
+
+        # Preprocessor is a Singleton
+        del self.test_obj.__class__.__class__._instances[self.test_obj.__class__]
+
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir)
+
+    def recreate(self, **kwargs) -> preprocessor.Preprocessor:
+
+        del self.test_obj.__class__.__class__._instances[self.test_obj.__class__]
+
+        self.test_obj = preprocessor.Preprocessor([], processor_name="CV32E40P", processor_trace="trace.log",
+                                                  elf_file="sbst.elf", zoix_to_trace={"PC_ID": "PC"}, **kwargs)
+        return self.test_obj
+
+    def test_in_memory_db(self):
+
+        (self.workdir / ".trace.db").unlink()
+
+        self.recreate(trace_db=":memory:")
+
+        self.assertFalse((self.workdir / ".trace.db").exists())
+        self.assertEqual(self.test_obj.execution_counts()[0x154], 3)
+
+    def test_trace_cache(self):
+
+        self.recreate(trace_cache="cache")
+
+        cached = list((self.workdir / "cache").iterdir())
+        self.assertEqual(cached, [self.workdir / self.test_obj.trace_db])
+
+        # The same trace is never parsed again
+        with mock.patch("testcrush.preprocessor.transformers.TraceTokenizerFactory") as factory:
+            self.recreate(trace_cache="cache")
+
+        factory.assert_not_called()
+        self.assertEqual(self.test_obj.execution_counts()[0x154], 3)
+
+        # A different trace has a different database
+        with open("trace.log", "a") as trace:
+            trace.write(self.TRACE.splitlines()[-1] + "\n")
+
+        self.recreate(trace_cache="cache")
+
+        self.assertEqual(len(list((self.workdir / "cache").iterdir())), 2)
+        self.assertEqual(self.test_obj.execution_counts()[0x15c], 2)
+
+        # As do different typed columns
+        self.recreate(trace_cache="cache", time_unit="ps")
+
+        self.assertEqual(len(list((self.workdir / "cache").iterdir())), 3)
+
+    def test_parallel_ingestion(self):
+
+        with self.test_obj._connection() as con:
+            expected = con.execute("SELECT * FROM trace ORDER BY ROWID").fetchall()
+
+        # Chunks of about two entries each
+        with mock.patch.object(preprocessor.Preprocessor, "_ingestion_chunksize", 100):
+            self.recreate(ingestion_workers=2)
+
+        with self.test_obj._connection() as con:
+            self.assertEqual(con.execute("SELECT * FROM trace ORDER BY ROWID").fetchall(), expected)
+
+    def test_trace_chunks(self):
+
+        header, chunks = preprocessor.trace_chunks("trace.log", 100)
+        self.assertEqual(header, self.TRACE.splitlines(keepends=True)[0])
+
+        chunks = list(chunks)
+        self.assertGreater(len(chunks), 1)
+
+        # Contiguous ranges of whole lines, from the end of the header to the end of the trace
+        self.assertEqual(chunks[0][0], len(header))
+        self.assertEqual(chunks[-1][1], len(self.TRACE))
+
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+
+            self.assertEqual(end, start)
+            self.assertEqual(self.TRACE[end - 1], "\n")
+
+        # A single range if larger than the trace
+        self.assertEqual(list(preprocessor.trace_chunks("trace.log", 1 << 20)[1]), [(len(header), len(self.TRACE))])
+
+    def test_compressed_traces(self):
+
+        with self.test_obj._connection() as con:
+            expected = con.execute("SELECT * FROM trace ORDER BY ROWID").fetchall()
+
+        compressions = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+        for compression, compress in compressions.items():
+
+            # Detected by the magic bytes, regardless of the extension
+            (self.workdir / "trace.log").write_bytes(compress(self.TRACE.encode()))
+            self.assertEqual(preprocessor.trace_compression("trace.log"), compression)
+
+            for workers in [1, 2]:
+
+                with self.subTest(compression=compression, workers=workers):
+
+                    with mock.patch.object(preprocessor.Preprocessor, "_ingestion_chunksize", 100):
+                        self.recreate(ingestion_workers=workers)
+
+                    with self.test_obj._connection() as con:
+                        self.assertEqual(con.execute("SELECT * FROM trace ORDER BY ROWID").fetchall(), expected)
+
+        (self.workdir / "trace.log").write_text(self.TRACE)
+        self.assertIsNone(preprocessor.trace_compression("trace.log"))
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "zstandard is not installed")
+    def test_zstd_trace(self):
+
+        import zstandard
+
+        (self.workdir / "trace.log").write_bytes(zstandard.ZstdCompressor().compress(self.TRACE.encode()))
+        self.assertEqual(preprocessor.trace_compression("trace.log"), "zstd")
+
+        self.recreate()
+        self.assertEqual(self.test_obj.execution_counts()[0x154], 3)
+
+    def test_typed_columns(self):
+
+        with self.test_obj._connection() as con:
+
+            cursor = con.execute('SELECT typeof("Time"), typeof("Cycle"), typeof("PC"), typeof("Instr") FROM trace')
+            self.assertEqual(set(cursor.fetchall()), {("integer", "integer", "integer", "text")})
+
+            cursor = con.execute('SELECT "Time", "Cycle", "PC" FROM trace LIMIT 1')
+            self.assertEqual(cursor.fetchone(), (130000, 61, 0x150))
+
+        # Fault attributes are normalised too, regardless of their formatting
+        self.assertEqual(self.test_obj.query_trace_db(select="PC", where={"Time": "   136ns", "PC": "0x154"},
+                                                      history=1), [(0x154,)])
+        self.assertEqual(self.test_obj.query_trace_windows([{"Time": "0.136us", "PC": "154"}], history=1), {0x154})
+
+    def test_normalisation(self):
+
+        self.assertEqual(preprocessor.to_picoseconds("   10ns"), 10000)
+        self.assertEqual(preprocessor.to_picoseconds("1.5 us"), 1500000)
+        self.assertEqual(preprocessor.to_picoseconds("130"), 130000)
+        self.assertEqual(preprocessor.to_picoseconds("130", unit="ps"), 130)
+        self.assertEqual(preprocessor.to_picoseconds("500fs"), 0)
+
+        for invalid in ["ns", "10 parsecs", ""]:
+            with self.assertRaises(ValueError):
+                preprocessor.to_picoseconds(invalid)
+
+        self.assertEqual(preprocessor.to_address("0000015c"), 0x15c)
+        self.assertEqual(preprocessor.to_address("0x15C"), 0x15c)
+
+        with self.assertRaises(ValueError):
+            preprocessor.to_address("pc")
+
+    def test_query_trace_db(self):
+
+        self.assertEqual(self.test_obj.query_trace_db(select="PC", where={"Time": "136"}, history=3),
+                         [(0x154,), (0x158,), (0x154,)])
+
+        with self.assertRaises(ValueError):
+            self.test_obj.query_trace_db(select="PC", where={"PC": "00000158"}, history=2)
+
+        # A window for each of the three executions
+        self.assertEqual(self.test_obj.query_trace_db(select="PC", where={"PC": "00000158"}, history=2,
+                                                      allow_multiple=True),
+                         [(0x154,), (0x158,)] * 3)
+
+    def test_query_trace_windows(self):
+
+        self.assertEqual(self.test_obj.query_trace_windows([{"PC": "00000158"}], history=2),
+                         {0x154, 0x158})
+
+        # Windows are truncated at the beginning of the trace
+        self.assertEqual(self.test_obj.query_trace_windows([{"Time": "130", "PC": "00000150"},
+                                                            {"Time": "150", "PC": "0000015c"},
+                                                            {"Time": "999", "PC": "0000015c"}], history=3),
+                         {0x150, 0x154, 0x158, 0x15c})
+
+        self.assertEqual(self.test_obj.query_trace_windows([{"Time": "132"}], select="Time"), {130000, 132000})
+        self.assertEqual(self.test_obj.query_trace_windows([{"Time": "999"}]), set())
+
+    def test_execution_counts(self):
+
+        self.assertEqual(self.test_obj.execution_counts(), {0x150: 1, 0x154: 3, 0x158: 3, 0x15c: 1})
+
+    def test_cycle_contributions(self):
+
+        # The store retires 4 cycles after the last addi
+        self.assertEqual(self.test_obj.cycle_contributions(), {0x150: 1, 0x154: 3, 0x158: 6, 0x15c: 1})
+
+    def test_line_profile(self):
+
+        lines = {0x150: ("test.S", 10), 0x154: ("test.S", 12), 0x158: ("test.S", 13), 0x15c: ("test.S", 13)}
+
+        with mock.patch("testcrush.preprocessor.addr2line_table", return_value=lines) as table:
+            profile = self.test_obj.line_profile()
+
+        table.assert_called_once_with("sbst.elf")
+
+        # Multiple program counters may map to the same line
+        self.assertEqual(profile, {("test.S", 10): (1, 1), ("test.S", 12): (3, 3), ("test.S", 13): (4, 7)})
+
+    def test_fault_attribution(self):
+
+        lines = {0x150: ("test.S", 10), 0x154: ("test.S", 12), 0x158: ("test.S", 13), 0x15c: ("test.S", 13)}
+
+        self.test_obj.zoix2trace = {"sim_time": "Time", "PC_ID": "PC"}
+        self.test_obj.fault_list = [
+            types.SimpleNamespace(fault_attributes={"sim_time": "130", "PC_ID": "00000150"}),
+            types.SimpleNamespace(fault_attributes={"sim_time": "150", "PC_ID": "0000015c"}),
+            types.SimpleNamespace(),  # Undetected
+            types.SimpleNamespace(fault_attributes={"sim_time": "136", "PC_ID": "00000154"}),
+            types.SimpleNamespace(fault_attributes={"sim_time": "150", "PC_ID": "0000015c"}),
+            types.SimpleNamespace(fault_attributes={"sim_time": "999", "PC_ID": "00000154"})  # Not in the trace
+        ]
+
+        with mock.patch("testcrush.preprocessor.addr2line_table", return_value=lines):
+            self.assertEqual(self.test_obj.attribute_faults(history=2), 4)
+
+        self.assertEqual(self.test_obj.attributed_faults("test.S", 13), [1, 3, 4])
+        self.assertEqual(self.test_obj.attributed_faults("test.S", 13, unique=True), [1, 4])
+        self.assertEqual(self.test_obj.attributed_faults("test.S", 12, unique=True), [])
+        self.assertEqual(self.test_obj.attributed_faults("test.S", 11), [])
+
+        self.assertEqual(self.test_obj.fault_attribution(), {("test.S", 10): (1, 1), ("test.S", 12): (1, 0),
+                                                             ("test.S", 13): (3, 2)})
+
+
+class BackgroundPreprocessorTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.cwd = os.getcwd()
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+        os.chdir(self.workdir)
+
+        (self.workdir / "trace.log").write_text(PreprocessorTest.TRACE)
+
+        self.settings = {"processor_name": "CV32E40P", "processor_trace": "trace.log", "elf_file": "sbst.elf",
+                         "zoix_to_trace": {"sim_time": "Time", "PC_ID": "PC"}}
+        self.lines = {0x150: ("test.S", 10), 0x154: ("test.S", 12), 0x158: ("test.S", 13), 0x15c: ("test.S", 13)}
+
+    def tearDown(self):
+
+        # Preprocessor is a Singleton
+        preprocessor.Preprocessor.__class__._instances.pop(preprocessor.Preprocessor, None)
+
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir)
+
+    def test_background(self):
+
+        background = preprocessor.BackgroundPreprocessor(preprocessor.Preprocessor, **self.settings)
+        fault_list = [types.SimpleNamespace(fault_attributes={"sim_time": "136", "PC_ID": "00000154"})]
+
+        with mock.patch("testcrush.preprocessor.addr2line_table", return_value=self.lines) as table:
+
+            background.start()
+            background.start()
+
+            test_obj = background.result(fault_list)
+
+            self.assertIs(test_obj.fault_list, fault_list)
+
+            # The line table and the columns of the windows are built in the background
+            self.assertEqual(set(test_obj._columns), {"Time", "PC"})
+
+            self.assertEqual(test_obj.line_profile()[("test.S", 12)], (3, 3))
+            self.assertEqual(test_obj.attribute_faults(history=1), 1)
+
+        table.assert_called_once_with("sbst.elf")
+
+    def test_foreground(self):
+
+        background = preprocessor.BackgroundPreprocessor(preprocessor.Preprocessor, **self.settings)
+
+        # Never started
+        with mock.patch("testcrush.preprocessor.addr2line_table", return_value=self.lines):
+            test_obj = background.result([])
+
+        self.assertEqual(test_obj.execution_counts()[0x154], 3)
+
+    def test_exception(self):
+
+        background = preprocessor.BackgroundPreprocessor(preprocessor.Preprocessor,
+                                                         **(self.settings | {"processor_trace": "missing.log"}))
+        background.start()
+
+        with self.assertRaises(FileNotFoundError):
+            background.result([])
+
+
+class BisectRemovalTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.present = set(range(16))
+        self.attempts = list()
+
+    def attempt(self, essential: set[int]) -> callable:
+
+        def wrapper(batch: list[int]) -> bool:
+
+            self.attempts.append(list(batch))
+
+            if essential & set(batch):
+                return False
+
+            self.present -= set(batch)
+            return True
+
+        return wrapper
+
+    def test_accepted_batch(self):
+
+        self.assertEqual(preprocessor.bisect_removal(list(range(16)), self.attempt(set())), list(range(16)))
+        self.assertEqual(self.attempts, [list(range(16))])
+        self.assertEqual(self.present, set())
+
+    def test_bisection(self):
+
+        removed = preprocessor.bisect_removal(list(range(16)), self.attempt({5}))
+
+        self.assertEqual(removed, [0, 1, 2, 3, 4, 6, 7] + list(range(8, 16)))
+        self.assertEqual(self.present, {5})
+
+        # One rejection per level down to the essential candidate and one acceptance per sibling
+        self.assertEqual(len(self.attempts), 9)
+
+    def test_empty_batch(self):
+
+        self.assertEqual(preprocessor.bisect_removal(list(), self.attempt(set())), list())
+        self.assertEqual(self.attempts, list())
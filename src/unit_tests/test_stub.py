@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+try:
+
+    from testcrush import stub, zoix
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import stub, zoix
+
+import unittest
+import pathlib
+import re
+import shutil
+import tempfile
+
+
+class StubZoixInvokerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.workdir = pathlib.Path(tempfile.mkdtemp())
+
+        self.stl = stub.generate_stl(200, seed=1)
+        self.source = self.workdir / "test.S"
+        self.write(self.stl)
+
+        self.model = stub.SyntheticFaultModel(self.stl, seed=1)
+        self.test_obj = stub.StubZoixInvoker(self.model, [self.source], self.workdir / "fsim_attr")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.workdir)
+
+    def write(self, lines: list[str]):
+
+        self.source.write_text("_start:\n" + '\n'.join(f"\t{line}" for line in lines) + "\n")
+
+    def logic_simulate(self) -> tuple[zoix.LogicSimulation, list[int]]:
+
+        tat_value = list()
+        status = self.test_obj.logic_simulate("lsim", timeout=1.0,
+                                              simulation_ok_regex=re.compile(r"EXIT\sSUCCESS"),
+                                              test_application_time_regex=re.compile(r"time = ([0-9]+)"),
+                                              tat_value=tat_value)
+        return status, tat_value
+
+    def coverage(self) -> float:
+
+        self.assertEqual(self.test_obj.fault_simulate("fsim"), zoix.FaultSimulation.SUCCESS)
+
+        return zoix.TxtFaultReport(self.workdir / "fsim_attr").compute_coverage("Fault Coverage")
+
+    def test_generate_stl(self):
+
+        self.assertEqual(len(set(self.stl)), 200)
+        self.assertEqual(self.stl, stub.generate_stl(200, seed=1))
+        self.assertNotEqual(self.stl, stub.generate_stl(200, seed=2))
+
+    def test_logic_simulate(self):
+
+        status, tat_value = self.logic_simulate()
+        self.assertEqual(status, zoix.LogicSimulation.SUCCESS)
+        self.assertEqual(tat_value, [sum(self.model.cycles)])
+
+        # Removal of the first instruction
+        self.write(self.stl[1:])
+        status, tat_value = self.logic_simulate()
+        self.assertEqual(tat_value, [sum(self.model.cycles) - self.model.cycles[0]])
+
+        self.assertEqual(self.test_obj.invocations["lsim"], 2)
+
+    def test_fault_simulate(self):
+
+        self.assertEqual(self.coverage(), 1.0)
+
+        # The sole detector of a fault is essential
+        essential = next(detectors[0] for detectors in self.model.detectors if len(detectors) == 1)
+        self.write(self.stl[:essential] + self.stl[essential + 1:])
+
+        expected = sum(self.model.detected(set(range(len(self.stl))) - {essential})) / len(self.model.detectors)
+        self.assertAlmostEqual(self.coverage(), round(expected, 4))
+
+        report = zoix.TxtFaultReport(self.workdir / "fsim_attr")
+        report.update()
+        self.assertEqual(len(report.fault_list), len(self.model.detectors))
+
+    def test_failures(self):
+
+        self.test_obj.failures["lsim"] = ("TimeoutExpired", "TimeoutExpired")
+        self.assertEqual(self.logic_simulate()[0], zoix.LogicSimulation.TIMEOUT)
+
+        self.test_obj.failures["fsim"] = ("", "Error: license checkout failed")
+        self.assertEqual(self.test_obj.fault_simulate("fsim"), zoix.FaultSimulation.FSIM_ERROR)
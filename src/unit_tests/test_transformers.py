@@ -13,7 +13,13 @@ except ModuleNotFoundError:
     from testcrush import transformers
     from testcrush import zoix
 
+import collections.abc
+import csv
+import io
+import pathlib
+import tempfile
 import unittest
+import unittest.mock as mock
 import lark
 
 
@@ -146,6 +152,107 @@ class FaultReportFaultListTransformerTest(unittest.TestCase):
         self.assertEqual(fault_list, expected_faults)
 
 
+class FaultReportFaultListFastParserTest(unittest.TestCase):
+
+    FAULT_LIST_SAMPLE = r"""
+        FaultList TDF {
+            <  1> NN F (6.532ns) {PORT "tb.dut.subunit_c.U1528.CI"}
+            <  1> ON R {PORT "tb.dut.subunit_c.U1528.CO"}(* "test1"->PC_IF=00000d1c; "test1"->sim_time="   8905ns"; *)
+                  -- R (6.6123ns) {PORT "tb.dut.subunit_c.U28.A"}
+            <  1> ON 1 {PORT "tb.dut.subunit_c.U1.A"} + {WIRE "tb.dut.subunit_c.n[3:0]"}(* "test1"->PC=0000XX0c; *)
+                  -- ~ (6,4,26) {FLOP "tb.dut.subunit_d.reg_q[0]"}
+            <  1> NN 1 () {PORT "tb.dut.subunit_c.U2.A"}
+                  -- 0 {PORT "tb.dut.subunit_c.U2.B"}
+        }
+    """
+
+    def get_parsers(self):
+
+        factory = transformers.FaultReportTransformerFactory()
+        return factory("FaultList"), factory("FaultList", fast=True)
+
+    def test_factory(self):
+
+        lark_parser, fast_parser = self.get_parsers()
+
+        self.assertIsInstance(lark_parser, lark.Lark)
+        self.assertIsInstance(fast_parser, transformers.FaultReportFaultListFastParser)
+        self.assertIs(fast_parser.transformer, fast_parser.fallback.options.transformer)
+
+        # No fast path for the rest of the sections
+        factory = transformers.FaultReportTransformerFactory()
+        self.assertIsInstance(factory("Coverage", fast=True), lark.Lark)
+
+    def test_same_as_lark_parser(self):
+
+        lark_parser, fast_parser = self.get_parsers()
+
+        expected_faults = lark_parser.parse(self.FAULT_LIST_SAMPLE)
+        fault_list = fast_parser.parse(self.FAULT_LIST_SAMPLE)
+
+        self.assertEqual(fault_list, expected_faults)
+
+        for fault, expected_fault in zip(fault_list, expected_faults):
+
+            self.assertEqual(fault.equivalent_faults, expected_fault.equivalent_faults)
+            self.assertEqual(fault.equivalent_to, expected_fault.equivalent_to)
+
+    def test_fallback(self):
+
+        _, fast_parser = self.get_parsers()
+
+        # Empty timing info is not supported by the fast path
+        with mock.patch.object(fast_parser.fallback, "parse", wraps=fast_parser.fallback.parse) as mocked_parse:
+
+            fault_list = fast_parser.parse(self.FAULT_LIST_SAMPLE)
+
+            # The whole segment is handed to the lark parser
+            mocked_parse.assert_called_once_with(self.FAULT_LIST_SAMPLE)
+
+        # Including the equivalent fault which follows the unsupported line
+        self.assertEqual(fault_list[-1].fault_status, "NN")
+        self.assertIs(fault_list[-1].equivalent_to, fault_list[-2])
+        self.assertEqual(fault_list[-2].equivalent_faults, 2)
+
+        # Single-line segments go straight to the lark parser
+        with mock.patch.object(fast_parser.fallback, "parse", wraps=fast_parser.fallback.parse) as mocked_parse:
+
+            fault_list = fast_parser.parse('FaultList { <  1> NN F {PORT "tb.dut.U1.CI"} }')
+
+            mocked_parse.assert_called_once()
+
+        self.assertEqual(fault_list, [zoix.Fault(fault_status='NN', fault_type='F', fault_sites=['tb.dut.U1.CI'])])
+
+    def test_multi_line_fault(self):
+
+        lark_parser, fast_parser = self.get_parsers()
+
+        fault_list_sample = r"""
+            FaultList {
+                <  1> ON 1 {PORT "a.b.c"}
+                (* "t"->PC_ID=0000abcd; *)
+                <  1> ON 0 {PORT "a.b.d"}
+                      -- 0 {PORT "a.b.e"}
+            }
+        """
+
+        fault_list = fast_parser.parse(fault_list_sample)
+
+        self.assertEqual(fault_list, lark_parser.parse(fault_list_sample))
+        self.assertEqual(fault_list[0].fault_attributes, {"PC_ID": "0000abcd"})
+        self.assertIs(fault_list[2].equivalent_to, fault_list[1])
+        self.assertEqual(fault_list[1].equivalent_faults, 2)
+
+    def test_syntax_error(self):
+
+        _, fast_parser = self.get_parsers()
+
+        with self.assertRaises(lark.exceptions.UnexpectedInput):
+
+            fast_parser.parse(self.FAULT_LIST_SAMPLE.replace('{PORT "tb.dut.subunit_c.U2.B"}',
+                                                             '{port "tb.dut.subunit_c.U2.B"}'))
+
+
 class FaultReportStatusGroupsTransformerTest(unittest.TestCase):
 
     def get_parser(self):
@@ -392,3 +499,180 @@ class TraceTransformerCV32E40PTest(unittest.TestCase):
     ]
 
             self.assertEqual(csv_lines, expected_csv_lines)
+
+
+class TraceTokenizerConformanceTest(unittest.TestCase):
+    """Requirements of every registered trace tokenizer, including the plugged-in ones."""
+
+    def test_columns(self):
+
+        for processor, tokenizer in transformers.TraceTokenizerFactory.available().items():
+
+            with self.subTest(processor=processor):
+
+                self.assertTrue(issubclass(tokenizer, transformers.TraceTokenizer))
+                self.assertTrue(tokenizer.columns)
+                self.assertEqual(len(set(tokenizer.columns)), len(tokenizer.columns))
+                self.assertTrue(all(column and ',' not in column for column in tokenizer.columns))
+
+    def test_tokenize(self):
+
+        for processor, tokenizer in transformers.TraceTokenizerFactory.available().items():
+
+            with self.subTest(processor=processor):
+
+                tokenizer = tokenizer()
+
+                self.assertTrue(tokenizer.sample)
+
+                # Streaming i.e., rows are produced lazily from any iterable of lines
+                rows = tokenizer.tokenize(iter(tokenizer.sample.splitlines(keepends=True)))
+                self.assertIsInstance(rows, collections.abc.Iterator)
+
+                rows = list(rows)
+                self.assertTrue(rows)
+
+                for row in rows:
+
+                    self.assertEqual(len(row), len(tokenizer.columns))
+                    self.assertTrue(all(isinstance(value, str) for value in row))
+
+                # Same rows from an open file
+                self.assertEqual(list(tokenizer.tokenize(io.StringIO(tokenizer.sample))), rows)
+
+
+class TraceTokenizerFactoryTest(unittest.TestCase):
+
+    def test_builtin(self):
+
+        tokenizer = transformers.TraceTokenizerFactory()("CV32E40P")
+        self.assertIsInstance(tokenizer, transformers.TraceTokenizerCV32E40P)
+
+        with self.assertRaises(KeyError):
+            transformers.TraceTokenizerFactory()("Unknown")
+
+    def test_entry_points(self):
+
+        entry_point = mock.Mock()
+        entry_point.name = "Plugged"
+        entry_point.load.return_value = transformers.TraceTokenizerCV32E40P
+
+        with mock.patch("importlib.metadata.entry_points", return_value=[entry_point]) as entry_points:
+            tokenizer = transformers.TraceTokenizerFactory()("Plugged")
+
+        entry_points.assert_called_once_with(group="testcrush.trace_tokenizers")
+        self.assertIsInstance(tokenizer, transformers.TraceTokenizerCV32E40P)
+
+    def test_module_path(self):
+
+        tokenizer = transformers.TraceTokenizerFactory()("Unknown",
+                                                         "testcrush.grammars.transformers:TraceTokenizerCV32E40P")
+        self.assertIsInstance(tokenizer, transformers.TraceTokenizerCV32E40P)
+
+        with tempfile.TemporaryDirectory() as tmp:
+
+            plugin = pathlib.Path(tmp) / "plugin.py"
+            plugin.write_text("from testcrush.grammars import transformers\n\n"
+                              "class Tokenizer(transformers.TraceTokenizer):\n"
+                              "    columns = ('PC',)\n\n"
+                              "    def tokenize(self, lines):\n"
+                              "        return ([line.strip()] for line in lines)\n")
+
+            tokenizer = transformers.TraceTokenizerFactory()("Unknown", f"{plugin}:Tokenizer")
+            self.assertEqual(list(tokenizer.tokenize(["00000004\n"])), [["00000004"]])
+
+            # A tokenizer which does not implement tokenize() is rejected when it is instantiated
+            plugin.write_text("from testcrush.grammars import transformers\n\n"
+                              "class Incomplete(transformers.TraceTokenizer):\n"
+                              "    columns = ('PC',)\n")
+
+            with self.assertRaises(TypeError):
+                transformers.TraceTokenizerFactory()("Unknown", f"{plugin}:Incomplete")
+
+        for invalid in ["testcrush.grammars.transformers", "testcrush.grammars.transformers:TraceTransformerFactory"]:
+            with self.assertRaises(ValueError):
+                transformers.TraceTokenizerFactory()("Unknown", invalid)
+
+
+class TraceTokenizerCV32E40PTest(unittest.TestCase):
+
+    DOC_EXAMPLE = r"""Time          Cycle      PC       Instr    Decoded instruction Register and memory contents
+130         61 00000150 4481     c.li    x9,0        x9=0x00000000
+132         62 00000152 00008437 lui     x8,0x8      x8=0x00008000
+134         63 00000156 fff40413 addi    x8,x8,-1    x8:0x00008000  x8=0x00007fff
+136         64 0000015a 8c65     c.and   x8,x9       x8:0x00007fff  x9:0x00000000  x8=0x00000000
+142         67 0000015c c622     c.swsp  x8,12(x2)   x2:0x00002000  x8:0x00000000 PA:0x0000200c store:0x00000000  load:0xffffffff
+"""
+
+    NO_REG_AND_MEM = r"""Time    Cycle   PC  Instr   Decoded instruction Register and memory contents
+    905ns              86 00000e36 00a005b3 c.add            x11,  x0, x10       x11=00000e5c x10:00000e5c
+    915ns              87 00000e38 00000693 c.addi           x13,  x0, 0         x13=00000000
+    925ns              88 00000e3a 00000613 c.addi           x12,  x0, 0
+    935ns              89 00000e3c 00000513 c.addi           x10,  x0, 0
+    945ns              90 00000e3e 2b40006f c.jal             x0, 692
+    975ns              93 000010f2 0d01a703 lw               x14, 208(x3)        x14=00002b20  x3:00003288  PA:00003358
+    985ns              94 000010f6 00a00333 c.add             x6,  x0, x10        x6=00000000 x10:00000000
+    995ns              95 000010f8 14872783 lw               x15, 328(x14)       x15=00000000 x14:00002b20  PA:00002c68
+   1015ns              97 000010fc 00079563 c.bne            x15,  x0, 10        x15:00000000
+"""
+
+    NO_OPERANDS = r"""Time    Cycle   PC  Instr   Decoded instruction Register and memory contents
+    905ns              86 00000e36 00a005b3 c.add                   x11=00000e5c x10:00000e5c
+    915ns              87 00000e38 00000693 c.addi                  x13=00000000
+    925ns              88 00000e3a 00000613 c.addi
+    935ns              89 00000e3c 00000513 c.addi           x10,  x0, 0
+    945ns              90 00000e3e 2b40006f c.jal             x0, 692
+    975ns              93 000010f2 0d01a703 lw               x14, 208(x3)        x14=00002b20  x3:00003288  PA:00003358
+    985ns              94 000010f6 00a00333 c.add             x6,  x0, x10        x6=00000000 x10:00000000
+    995ns              95 000010f8 14872783 lw               x15, 328(x14)       x15=00000000 x14:00002b20  PA:00002c68
+   1015ns              97 000010fc 00079563 c.bne            x15,  x0, 10        x15:00000000
+"""
+
+    FLOAT_OPERANDS = r"""Time    Cycle   PC  Instr   Decoded instruction Register and memory contents
+    6235ns             619 00000506 00032087 flw               f1, 0(x6)           f1=40800001  x6:0000290c  PA:0000290c
+    6245ns             620 00000508 0815754b fnmsub.s         f10, f10,  f1,  f1  f10=4427827e f10:c326827d  f1:40800001  f1:40800001
+    6255ns             621 0000050a 18107153 fdiv.s            f2,  f0,  f1        f2=3f800000  f0:40800001  f1:40800001
+    6315ns             627 0000050e 18207153 fdiv.s            f2,  f0,  f2        f2=40800001  f0:40800001  f2:3f800000
+    6495ns             645 00000512 e0011553 fclass.s         x10,  f2            x10=00000040  f2:40800001
+    6505ns             646 00000516 202005d3 fsgnj.s          f11,  f0,  f2       f11=40800001  f0:40800001  f2:40800001
+    6515ns             647 0000051a 20001653 fsgnjn.s         f12,  f0,  f0       f12=c0800001  f0:40800001  f0:40800001
+    6525ns             648 0000051e 202026d3 fsgnjx.s         f13,  f0,  f2       f13=40800001  f0:40800001  f2:40800001
+    6535ns             649 00000522 182071d3 fdiv.s            f3,  f0,  f2        f3=3f800000  f0:40800001  f2:40800001
+    6595ns             655 00000526 e0019553 fclass.s         x10,  f3            x10=00000040  f3:3f800000
+    6605ns             656 0000052a 1821f253 fdiv.s            f4,  f3,  f2        f4=3e7ffffe  f3:3f800000  f2:40800001
+    6705ns             658 00000e8a fbdff06f c.jal             x0, -68      
+    """
+
+    TRACE_SAMPLES = [DOC_EXAMPLE, NO_REG_AND_MEM, NO_OPERANDS, FLOAT_OPERANDS]
+
+    def test_same_as_lark_parser(self):
+
+        parser = transformers.TraceTransformerFactory()("CV32E40P")
+        tokenizer = transformers.TraceTokenizerCV32E40P()
+
+        for trace_sample in self.TRACE_SAMPLES + [tokenizer.sample]:
+
+            with self.subTest(trace_sample=trace_sample.splitlines()[1]):
+
+                csv_lines = parser.parse(trace_sample)
+
+                self.assertEqual(list(tokenizer.columns), csv_lines[0].split(','))
+                self.assertEqual(list(tokenizer.tokenize(io.StringIO(trace_sample))),
+                                 list(csv.reader(csv_lines[1:])))
+
+        # All of them are handled by the regular expression
+        self.assertIsNone(tokenizer._fallback)
+
+    def test_fallback(self):
+
+        tokenizer = transformers.TraceTokenizerCV32E40P()
+
+        # Register and memory contents which are not separated from the operands are left to the lark parser
+        trace_sample = "Time Cycle PC Instr Decoded instruction Register and memory contents\n" \
+                       "975ns 93 000010f2 0d01a703 lw x14, 208(x3)x14=00002b20 PA:00003358\n"
+
+        with mock.patch.object(tokenizer, "_parse", wraps=tokenizer._parse) as parse:
+            rows = list(tokenizer.tokenize(io.StringIO(trace_sample)))
+
+        parse.assert_called_once()
+        self.assertEqual(rows, [["975ns", "93", "000010f2", "0d01a703", "lw x14, 208(x3)", "x14=00002b20, PA:00003358"]])
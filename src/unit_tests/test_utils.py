@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: MIT
+
+try:
+
+    from testcrush import utils
+
+except ModuleNotFoundError:
+
+    import sys
+    sys.path.append("..")
+    from testcrush import utils
+
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock as mock
+
+
+class RunStepsTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.events = list()
+        self.lock = threading.Lock()
+
+    def step(self, name: str, duration: float = 0.0, result=None, exception: BaseException | None = None) -> callable:
+
+        def wrapper():
+
+            with self.lock:
+                self.events.append(f"start {name}")
+
+            time.sleep(duration)
+
+            with self.lock:
+                self.events.append(f"end {name}")
+
+            if exception:
+                raise exception
+
+            return result
+
+        return wrapper
+
+    def test_sequential(self):
+
+        steps = {name: self.step(name, result=name.upper()) for name in utils.PRE_RUN_DEPENDENCIES}
+
+        results = utils.run_steps(steps, utils.PRE_RUN_DEPENDENCIES)
+
+        self.assertEqual(results, {name: name.upper() for name in utils.PRE_RUN_DEPENDENCIES})
+        self.assertEqual(self.events, [f"{event} {name}" for name in utils.PRE_RUN_DEPENDENCIES
+                                       for event in ("start", "end")])
+
+    def test_concurrent(self):
+
+        steps = {
+            "cross_compilation": self.step("cross_compilation"),
+            "vcs_logic_simulation": self.step("vcs_logic_simulation", 0.2),
+            "zoix_fault_simulation": self.step("zoix_fault_simulation", 0.2)
+        }
+
+        dependencies = {"vcs_logic_simulation": ["cross_compilation"], "zoix_fault_simulation": ["cross_compilation"]}
+
+        start = time.perf_counter()
+        utils.run_steps(steps, dependencies)
+        elapsed = time.perf_counter() - start
+
+        # The simulations start together once the compilation is over
+        self.assertEqual(self.events[:2], ["start cross_compilation", "end cross_compilation"])
+        self.assertEqual(set(self.events[2:4]), {"start vcs_logic_simulation", "start zoix_fault_simulation"})
+        self.assertLess(elapsed, 0.35)
+
+    def test_exception(self):
+
+        steps = {
+            "cross_compilation": self.step("cross_compilation", exception=SystemExit(1)),
+            "vcs_logic_simulation": self.step("vcs_logic_simulation")
+        }
+
+        with self.assertRaises(SystemExit):
+            utils.run_steps(steps, {"vcs_logic_simulation": ["cross_compilation"]})
+
+        # Dependent steps are never started
+        self.assertEqual(self.events, ["start cross_compilation", "end cross_compilation"])
+
+    def test_invalid_dependencies(self):
+
+        steps = {"a": self.step("a"), "b": self.step("b")}
+
+        with self.assertRaises(ValueError):
+            utils.run_steps(steps, {"a": ["c"]})
+
+        with self.assertRaises(ValueError):
+            utils.run_steps(steps, {"a": ["b"], "b": ["a"]})
+
+        self.assertEqual(self.events, list())
+
+
+class CommandTest(unittest.TestCase):
+
+    def test_simple_commands(self):
+
+        command = utils.Command("make -C '../some dir' all")
+
+        self.assertEqual(command, "make -C '../some dir' all")
+        self.assertEqual(command.argv, ("make", "-C", "../some dir", "all"))
+
+    def test_shell_commands(self):
+
+        for command in ["make all | tee log", "make all > log", "cd sbst", "CC=gcc make", "rm *.o",
+                        "echo $HOME", "make all && make clean", "make 'all"]:
+
+            with self.subTest(command=command):
+                self.assertIsNone(utils.Command(command).argv)
+
+    def test_from_toml(self):
+
+        command = utils.Command.from_toml(["./simv", "+firmware=some file.hex"])
+
+        self.assertEqual(command, "./simv '+firmware=some file.hex'")
+        self.assertEqual(command.argv, ("./simv", "+firmware=some file.hex"))
+
+        command = utils.Command.from_toml({"command": "make all | tee log", "cwd": "run", "env": {"JOBS": 4}})
+
+        self.assertIsNone(command.argv)
+        self.assertEqual((command.cwd, command.env), ("run", {"JOBS": "4"}))
+
+        for item in [[], {"cwd": "run"}, {"command": "make", "argv": ["make"]}, 42]:
+
+            with self.subTest(item=item), self.assertRaises(ValueError):
+                utils.Command.from_toml(item)
+
+    def test_pickle(self):
+
+        command = pickle.loads(pickle.dumps(utils.Command.from_toml({"argv": ["echo", "$HOME"], "cwd": "run"})))
+
+        self.assertIsInstance(command, utils.Command)
+        self.assertEqual((command.argv, command.cwd), (("echo", "$HOME"), "run"))
+
+
+class SpawnTest(unittest.TestCase):
+
+    def run_command(self, command: str) -> tuple[str, str]:
+
+        with utils.spawn(command) as process:
+            return process.communicate()
+
+    def test_direct(self):
+
+        with mock.patch("os.posix_spawn", wraps=os.posix_spawn) as posix_spawn:
+
+            # No shell expansion takes place
+            self.assertEqual(self.run_command(utils.Command.from_toml(["echo", "$HOME", "*"])), ("$HOME *\n", ""))
+
+        posix_spawn.assert_called_once()
+
+    def test_shell(self):
+
+        with mock.patch("os.posix_spawn", wraps=os.posix_spawn) as posix_spawn:
+
+            self.assertEqual(self.run_command("echo a b | tr -d ' '"), ("ab\n", ""))
+
+            # Unknown programs are reported by bash
+            stdout, stderr = self.run_command("testcrush_no_such_program")
+            self.assertIn("command not found", stderr)
+
+        posix_spawn.assert_not_called()
+
+    def test_cwd_and_env(self):
+
+        with tempfile.TemporaryDirectory() as tmp:
+
+            for command in [{"argv": ["sh", "-c", "pwd; echo $TESTCRUSH"]}, {"command": "pwd; echo $TESTCRUSH"}]:
+
+                with self.subTest(command=command):
+
+                    command = utils.Command.from_toml(command | {"cwd": tmp, "env": {"TESTCRUSH": "yes"}})
+                    stdout, _ = self.run_command(command)
+
+                    self.assertEqual(stdout.split(), [os.path.realpath(tmp), "yes"])
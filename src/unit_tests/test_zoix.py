@@ -13,8 +13,13 @@ except ModuleNotFoundError:
 
 import unittest
 import unittest.mock as mock
+import functools
 import pathlib
 import re
+import sys
+import tempfile
+import threading
+import time
 
 class FaultTest(unittest.TestCase):
 
@@ -535,3 +540,211 @@ Day Month HH:MM:SS YYYY
 
             fault_simulation = test_obj.fault_simulate("mock_fsim_instruction1", "mock_fsim_instruction2", timeout = 1)
             self.assertEqual(fault_simulation, zoix.FaultSimulation.TIMEOUT)
+
+
+class JobSchedulerTest(unittest.TestCase):
+
+    LICENSE_ERROR = ("", "Error: Failed to check out license feature 'ZOIX_FSIM'.")
+
+    def test_concurrency_limits(self):
+
+        test_obj = zoix.JobScheduler(limits={"fsim": 2})
+
+        lock = threading.Lock()
+        running = {"fsim": 0, "lsim": 0}
+        peak = {"fsim": 0, "lsim": 0}
+
+        def execute(kind, instruction, timeout=None):
+
+            with lock:
+                running[kind] += 1
+                peak[kind] = max(peak[kind], running[kind])
+
+            time.sleep(0.05)
+
+            with lock:
+                running[kind] -= 1
+
+            return ("", "")
+
+        threads = [threading.Thread(target=test_obj.run, args=(kind, functools.partial(execute, kind), "cmd"))
+                   for kind in ["fsim", "lsim"] for _ in range(6)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak["fsim"], 2)
+        self.assertEqual(peak["lsim"], 6)  # Unlimited
+
+        statistics = test_obj.statistics()
+        self.assertEqual(statistics["fsim"]["jobs"], 6)
+        self.assertEqual(statistics["lsim"]["jobs"], 6)
+        self.assertEqual(statistics["compile"]["jobs"], 0)
+
+        # 6 jobs of ~0.05s over 2 slots. Queue wait of 0.05 + 0.05 + 0.1 + 0.1 seconds
+        self.assertGreater(statistics["fsim"]["wait"], 0.2)
+        self.assertGreater(statistics["fsim"]["max_wait"], 0.08)
+
+    def test_license_backoff(self):
+
+        test_obj = zoix.JobScheduler(license_error_regex=re.compile(r"check out license"), backoff=10.0,
+                                     max_backoff=15.0, max_retries=3)
+
+        execute = mock.MagicMock(side_effect=[self.LICENSE_ERROR, self.LICENSE_ERROR, self.LICENSE_ERROR,
+                                              ("fsim done", "")])
+
+        with mock.patch("testcrush.zoix.time.sleep") as mocked_sleep:
+
+            self.assertEqual(test_obj.run("fsim", execute, "fsim_instruction", timeout=5), ("fsim done", ""))
+
+        execute.assert_called_with("fsim_instruction", timeout=5)
+        self.assertEqual(execute.call_count, 4)
+
+        # Exponential backoff with jitter, capped
+        delays = [call.args[0] for call in mocked_sleep.call_args_list]
+        self.assertEqual(len(delays), 3)
+        self.assertTrue(5.0 <= delays[0] <= 10.0)
+        self.assertTrue(7.5 <= delays[1] <= 15.0)
+        self.assertTrue(7.5 <= delays[2] <= 15.0)
+
+        statistics = test_obj.statistics()["fsim"]
+        self.assertEqual(statistics["retries"], 3)
+        self.assertAlmostEqual(statistics["backoff"], sum(delays))
+
+        # Retries exhausted
+        execute = mock.MagicMock(return_value=self.LICENSE_ERROR)
+
+        with mock.patch("testcrush.zoix.time.sleep"):
+
+            self.assertEqual(test_obj.run("fsim", execute, "fsim_instruction"), self.LICENSE_ERROR)
+
+        self.assertEqual(execute.call_count, 4)
+
+    def test_from_settings(self):
+
+        test_obj = zoix.JobScheduler.from_settings({"fsim_limit": 4, "lsim_limit": 8,
+                                                    "license_error_regex": re.compile("Licensed number of users"),
+                                                    "backoff": 5.0})
+
+        self.assertEqual(test_obj.limits, {"compile": None, "lsim": 8, "fsim": 4})
+        self.assertEqual(test_obj.license_error_regex.pattern, "Licensed number of users")
+        self.assertEqual((test_obj.backoff, test_obj.max_backoff, test_obj.max_retries), (5.0, 600.0, 10))
+
+    def test_zoix_invoker(self):
+
+        test_obj = zoix.ZoixInvoker(zoix.JobScheduler(license_error_regex=re.compile(r"check out license")))
+
+        with mock.patch("testcrush.zoix.ZoixInvoker.execute", side_effect=[self.LICENSE_ERROR, ("", "")]), \
+                mock.patch("testcrush.zoix.time.sleep") as mocked_sleep:
+
+            self.assertEqual(test_obj.fault_simulate("mock_fsim_instruction"), zoix.FaultSimulation.SUCCESS)
+            mocked_sleep.assert_called_once()
+
+        # Without a license error regex, license errors are simulation errors
+        test_obj = zoix.ZoixInvoker()
+
+        with mock.patch("testcrush.zoix.ZoixInvoker.execute", side_effect=[self.LICENSE_ERROR, ("", "")]):
+
+            self.assertEqual(test_obj.fault_simulate("mock_fsim_instruction"), zoix.FaultSimulation.FSIM_ERROR)
+
+
+class SimulatorSessionTest(unittest.TestCase):
+
+    # A stand-in simulator server which "simulates" the firmware image given in each run request
+    SERVER = r"""
+import sys, time
+
+print("Chronologic VCS simulator", flush=True)
+print("ready", flush=True)
+
+for request in sys.stdin:
+
+    command, _, argument = request.strip().partition(" ")
+
+    if command == "quit":
+        break
+    elif command == "run":
+        with open(argument) as firmware:
+            print(f"stdout EXIT SUCCESS\nstdout test application time = {len(firmware.read().split())}", flush=True)
+    elif command == "hang":
+        time.sleep(60)
+    elif command == "crash":
+        sys.exit(1)
+    else:
+        print(f"stderr Unknown command {command}", flush=True)
+
+    print("done", flush=True)
+"""
+
+    def setUp(self):
+
+        self.workdir = tempfile.TemporaryDirectory()
+        self.server = pathlib.Path(self.workdir.name) / "server.py"
+        self.server.write_text(self.SERVER)
+        self.firmware = pathlib.Path(self.workdir.name) / "sbst.hex"
+
+        self.session = zoix.SimulatorSession([sys.executable, str(self.server)], startup_timeout=10.0)
+
+    def tearDown(self):
+
+        self.session.close()
+        self.workdir.cleanup()
+
+    def test_logic_simulation(self):
+
+        test_obj = zoix.ZoixInvoker(sessions={"lsim": self.session})
+
+        for words in range(1, 4):
+
+            self.firmware.write_text("00000013 " * words)
+            tat_value = list()
+
+            self.assertEqual(test_obj.logic_simulate(f"run {self.firmware}", timeout=10.0,
+                                                     simulation_ok_regex=re.compile(r"EXIT\sSUCCESS"),
+                                                     test_application_time_regex=re.compile(r"time = ([0-9]+)"),
+                                                     tat_value=tat_value), zoix.LogicSimulation.SUCCESS)
+            self.assertEqual(tat_value, [words])
+
+        # The server has been started once for all runs
+        self.assertEqual(self.session.starts, 1)
+
+    def test_errors(self):
+
+        self.assertEqual(self.session.execute("reset"), ("", "Unknown command reset\n"))
+        self.assertEqual(self.session.execute("hang", timeout=0.2), ("TimeoutExpired", "TimeoutExpired"))
+
+        _, stderr = self.session.execute("crash")
+        self.assertIn("exited unexpectedly", stderr)
+
+        # The server is restarted after a timeout or an exit
+        self.assertEqual(self.session.starts, 2)
+
+        self.firmware.write_text("00000013")
+        self.assertEqual(self.session.execute(f"run {self.firmware}"),
+                         ("EXIT SUCCESS\ntest application time = 1\n", ""))
+        self.assertEqual(self.session.starts, 3)
+
+    def test_failed_start(self):
+
+        self.server.write_text("print('no ready line')")
+
+        _, stderr = self.session.execute("run sbst.hex")
+        self.assertIn("failed to start", stderr)
+
+    def test_close(self):
+
+        self.session.execute("reset")
+        process = self.session._process
+
+        self.session.close()
+
+        self.assertEqual(process.returncode, 0)
+        self.assertIsNone(self.session._process)
+
+    def test_invalid_kind(self):
+
+        with self.assertRaises(ValueError):
+            zoix.ZoixInvoker(sessions={"simulation": self.session})